@@ -124,7 +124,76 @@ find_feature_dir_by_prefix() {
     fi
 }
 
+# Cached get_feature_paths output, shared with scripts/python/feature_paths.py.
+# The cache is valid while it is newer than .git/HEAD, .git/refs/heads and
+# specs/; checking that needs only bash builtins, so a warm call never forks
+# git or globs specs/.
+FEATURE_PATHS_CACHE=".specify/.cache/feature-paths.env"
+
+# Locate the work tree containing $PWD without running git. Sets
+# FAST_REPO_ROOT and FAST_GIT_DIR; fails for linked worktrees (.git file)
+# so callers fall back to the git-based lookup.
+find_repo_root_fast() {
+    local dir
+    dir="$(pwd -P)"
+    while true; do
+        if [[ -d "$dir/.git" ]]; then
+            FAST_REPO_ROOT="${dir:-/}"
+            FAST_GIT_DIR="$dir/.git"
+            return 0
+        fi
+        [[ -e "$dir/.git" ]] && return 1
+        [[ -z "$dir" ]] && break
+        dir="${dir%/*}"
+    done
+
+    # Non-git repo: same fallback as get_repo_root
+    FAST_REPO_ROOT="$(CDPATH="" cd "${BASH_SOURCE[0]%/*}/../../.." && pwd)"
+    FAST_GIT_DIR=""
+}
+
+read_cached_feature_paths() {
+    local repo_root="$1"
+    local git_dir="$2"
+    local cache="$repo_root/$FEATURE_PATHS_CACHE"
+
+    [[ -f "$cache" ]] || return 1
+    if [[ -n "$git_dir" ]]; then
+        [[ "$cache" -nt "$git_dir/HEAD" ]] || return 1
+        [[ ! -e "$git_dir/refs/heads" || "$cache" -nt "$git_dir/refs/heads" ]] || return 1
+    fi
+    [[ ! -e "$repo_root/specs" || "$cache" -nt "$repo_root/specs" ]] || return 1
+
+    local line
+    local lines=()
+    while IFS= read -r line; do
+        lines+=("$line")
+    done < "$cache"
+
+    # First line records the SPECIFY_FEATURE override the paths were built with
+    [[ "${lines[0]:-}" == "# SPECIFY_FEATURE=${SPECIFY_FEATURE:-}" ]] || return 1
+    printf '%s\n' "${lines[@]:1}"
+}
+
+write_cached_feature_paths() {
+    local repo_root="$1"
+    local output="$2"
+    local cache="$repo_root/$FEATURE_PATHS_CACHE"
+
+    # Only cache inside initialised projects, and never fail the caller
+    [[ -d "$repo_root/.specify" ]] || return 0
+    mkdir -p "${cache%/*}" 2>/dev/null || return 0
+    if printf '# SPECIFY_FEATURE=%s\n%s\n' "${SPECIFY_FEATURE:-}" "$output" > "$cache.$$" 2>/dev/null; then
+        mv -f "$cache.$$" "$cache" 2>/dev/null || rm -f "$cache.$$"
+    fi
+    return 0
+}
+
 get_feature_paths() {
+    if find_repo_root_fast && read_cached_feature_paths "$FAST_REPO_ROOT" "$FAST_GIT_DIR"; then
+        return 0
+    fi
+
     local repo_root=$(get_repo_root)
     local current_branch=$(get_current_branch)
     local has_git_repo="false"
@@ -136,7 +205,8 @@ get_feature_paths() {
     # Use prefix-based lookup to support multiple branches per spec
     local feature_dir=$(find_feature_dir_by_prefix "$repo_root" "$current_branch")
 
-    cat <<EOF
+    local output
+    output=$(cat <<EOF
 REPO_ROOT='$repo_root'
 CURRENT_BRANCH='$current_branch'
 HAS_GIT='$has_git_repo'
@@ -149,6 +219,15 @@ DATA_MODEL='$feature_dir/data-model.md'
 QUICKSTART='$feature_dir/quickstart.md'
 CONTRACTS_DIR='$feature_dir/contracts'
 EOF
+)
+    echo "$output"
+
+    # Don't cache an ambiguous prefix lookup; its error must be shown every time
+    if [[ "$current_branch" =~ ^([0-9]{3})- ]]; then
+        local prefix_matches=("$repo_root/specs/${BASH_REMATCH[1]}"-*/)
+        [[ ${#prefix_matches[@]} -gt 1 ]] && return 0
+    fi
+    write_cached_feature_paths "$repo_root" "$output"
 }
 
 check_file() { [[ -f "$1" ]] && echo "  ✓ $2" || echo "  ✗ $2"; }
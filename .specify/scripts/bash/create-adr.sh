@@ -52,6 +52,8 @@ if [[ -z "$TITLE" ]]; then
 fi
 
 REPO_ROOT=$(git rev-parse --show-toplevel 2>/dev/null || pwd)
+SCRIPT_DIR="$(CDPATH="" cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ID_ALLOCATOR="$SCRIPT_DIR/../python/id_allocator.py"
 ADR_DIR="$REPO_ROOT/history/adr"
 mkdir -p "$ADR_DIR"
 
@@ -85,8 +87,15 @@ slugify() {
   echo "$1" | tr '[:upper:]' '[:lower:]' | sed 's/[^a-z0-9]/-/g; s/-\{2,\}/-/g; s/^-//; s/-$//'
 }
 
-ID=$(next_id)
 SLUG=$(slugify "$TITLE")
+
+# The allocator reserves the file under a lock, so parallel runs never share
+# an ID; set SPECIFY_ID_ALLOCATOR=bash (or lack python3) to scan instead.
+ID=""
+if [[ "${SPECIFY_ID_ALLOCATOR:-}" != "bash" ]] && command -v python3 >/dev/null 2>&1 && [[ -f "$ID_ALLOCATOR" ]]; then
+  ID=$(python3 "$ID_ALLOCATOR" --repo-root "$REPO_ROOT" reserve adr --dir "$ADR_DIR" --name "${SLUG}.md") || ID=""
+fi
+[[ -n "$ID" ]] || ID=$(next_id)
 OUTFILE="$ADR_DIR/${ID}-${SLUG}.md"
 
 # Simply copy the template (AI will fill placeholders)
@@ -159,6 +159,7 @@ clean_branch_name() {
 # to searching for repository markers so the workflow still functions in repositories that
 # were initialised with --no-git.
 SCRIPT_DIR="$(CDPATH="" cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ID_ALLOCATOR="$SCRIPT_DIR/../python/id_allocator.py"
 
 if git rev-parse --show-toplevel >/dev/null 2>&1; then
     REPO_ROOT=$(git rev-parse --show-toplevel)
@@ -234,7 +235,32 @@ else
     BRANCH_SUFFIX=$(generate_branch_name "$FEATURE_DESCRIPTION")
 fi
 
+# GitHub enforces a 244-byte limit on branch names
+# Truncate the suffix before numbering so a reserved spec directory already
+# has the final name
+MAX_BRANCH_LENGTH=244
+ORIGINAL_SUFFIX="$BRANCH_SUFFIX"
+# Account for: feature number (3) + hyphen (1) = 4 chars
+MAX_SUFFIX_LENGTH=$((MAX_BRANCH_LENGTH - 4))
+if [ ${#BRANCH_SUFFIX} -gt $MAX_SUFFIX_LENGTH ]; then
+    # Truncate suffix at word boundary if possible
+    TRUNCATED_SUFFIX=$(echo "$BRANCH_SUFFIX" | cut -c1-$MAX_SUFFIX_LENGTH)
+    # Remove trailing hyphen if truncation created one
+    BRANCH_SUFFIX=$(echo "$TRUNCATED_SUFFIX" | sed 's/-$//')
+fi
+
 # Determine branch number
+RESERVED=false
+if [ -z "$BRANCH_NUMBER" ] && [ "${SPECIFY_ID_ALLOCATOR:-}" != "bash" ] && \
+    command -v python3 >/dev/null 2>&1 && [ -f "$ID_ALLOCATOR" ]; then
+    # The allocator reserves specs/NNN-<suffix> under a lock, so parallel runs
+    # never share a number; set SPECIFY_ID_ALLOCATOR=bash to scan instead
+    if [ "$HAS_GIT" = true ]; then
+        git fetch --all --prune 2>/dev/null || true
+    fi
+    BRANCH_NUMBER=$(python3 "$ID_ALLOCATOR" --repo-root "$REPO_ROOT" reserve feature --name "$BRANCH_SUFFIX") || BRANCH_NUMBER=""
+    [ -n "$BRANCH_NUMBER" ] && RESERVED=true
+fi
 if [ -z "$BRANCH_NUMBER" ]; then
     if [ "$HAS_GIT" = true ]; then
         # Check existing branches on remotes
@@ -250,21 +276,8 @@ fi
 FEATURE_NUM=$(printf "%03d" "$((10#$BRANCH_NUMBER))")
 BRANCH_NAME="${FEATURE_NUM}-${BRANCH_SUFFIX}"
 
-# GitHub enforces a 244-byte limit on branch names
-# Validate and truncate if necessary
-MAX_BRANCH_LENGTH=244
-if [ ${#BRANCH_NAME} -gt $MAX_BRANCH_LENGTH ]; then
-    # Calculate how much we need to trim from suffix
-    # Account for: feature number (3) + hyphen (1) = 4 chars
-    MAX_SUFFIX_LENGTH=$((MAX_BRANCH_LENGTH - 4))
-    
-    # Truncate suffix at word boundary if possible
-    TRUNCATED_SUFFIX=$(echo "$BRANCH_SUFFIX" | cut -c1-$MAX_SUFFIX_LENGTH)
-    # Remove trailing hyphen if truncation created one
-    TRUNCATED_SUFFIX=$(echo "$TRUNCATED_SUFFIX" | sed 's/-$//')
-    
-    ORIGINAL_BRANCH_NAME="$BRANCH_NAME"
-    BRANCH_NAME="${FEATURE_NUM}-${TRUNCATED_SUFFIX}"
+if [ "$BRANCH_SUFFIX" != "$ORIGINAL_SUFFIX" ]; then
+    ORIGINAL_BRANCH_NAME="${FEATURE_NUM}-${ORIGINAL_SUFFIX}"
     
     >&2 echo "[specify] Warning: Branch name exceeded GitHub's 244-byte limit"
     >&2 echo "[specify] Original: $ORIGINAL_BRANCH_NAME (${#ORIGINAL_BRANCH_NAME} bytes)"
@@ -272,7 +285,13 @@ if [ ${#BRANCH_NAME} -gt $MAX_BRANCH_LENGTH ]; then
 fi
 
 if [ "$HAS_GIT" = true ]; then
-    git checkout -b "$BRANCH_NAME"
+    if ! git checkout -b "$BRANCH_NAME"; then
+        # Release the reserved number; rmdir leaves a directory with content alone
+        if [ "${RESERVED:-false}" = true ]; then
+            rmdir "$SPECS_DIR/$BRANCH_NAME" 2>/dev/null || true
+        fi
+        exit 1
+    fi
 else
     >&2 echo "[specify] Warning: Git repository not detected; skipped branch creation for $BRANCH_NAME"
 fi
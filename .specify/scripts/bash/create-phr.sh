@@ -93,6 +93,8 @@ fi
 # Get repository root
 REPO_ROOT=$(git rev-parse --show-toplevel 2>/dev/null || pwd)
 SPECS_DIR="$REPO_ROOT/specs"
+SCRIPT_DIR="$(CDPATH="" cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ID_ALLOCATOR="$SCRIPT_DIR/../python/id_allocator.py"
 
 # Check for template (try both locations)
 TEMPLATE_PATH=""
@@ -235,10 +237,18 @@ get_next_id() {
   printf '%04d' $((max_id + 1))
 }
 
-PHR_ID=$(get_next_id)
 TITLE_SLUG=$(slugify "$TITLE")
 STAGE_SLUG=$(slugify "$STAGE")
 
+# The allocator reserves the file under a lock, so parallel runs never share
+# an ID; set SPECIFY_ID_ALLOCATOR=bash (or lack python3) to scan instead.
+PHR_ID=""
+if [[ "${SPECIFY_ID_ALLOCATOR:-}" != "bash" ]] && command -v python3 >/dev/null 2>&1 && [[ -f "$ID_ALLOCATOR" ]]; then
+  PHR_ID=$(python3 "$ID_ALLOCATOR" --repo-root "$REPO_ROOT" reserve phr --dir "$PROMPTS_DIR" \
+    --name "${TITLE_SLUG}.${STAGE_SLUG}.prompt.md") || PHR_ID=""
+fi
+[[ -n "$PHR_ID" ]] || PHR_ID=$(get_next_id)
+
 # Create filename with stage extension
 OUTFILE="$PROMPTS_DIR/${PHR_ID}-${TITLE_SLUG}.${STAGE_SLUG}.prompt.md"
 
@@ -36,7 +36,8 @@
 #
 # Usage: ./update-agent-context.sh [agent_type]
 # Agent types: claude|gemini|copilot|cursor-agent|qwen|opencode|codex|windsurf|kilocode|auggie|shai|q|bob|qoder
-# Leave empty to update all existing agent files
+# Leave empty to update all existing agent files (handled by ../python/agent_context.py
+# when python3 is available; set UPDATE_AGENT_CONTEXT_ENGINE=bash to use this script)
 
 set -e
 
@@ -79,6 +80,9 @@ BOB_FILE="$REPO_ROOT/AGENTS.md"
 # Template file
 TEMPLATE_FILE="$REPO_ROOT/.specify/templates/agent-file-template.md"
 
+# Batch engine used when no agent type is given
+AGENT_CONTEXT_ENGINE="$SCRIPT_DIR/../python/agent_context.py"
+
 # Global variables for parsed plan data
 NEW_LANG=""
 NEW_FRAMEWORK=""
@@ -755,6 +759,13 @@ main() {
     # Validate environment before proceeding
     validate_environment
     
+    # Batch mode: the Python engine parses the plans once and writes each
+    # distinct file once (see .specify/scripts/python/agent_context.py)
+    if [[ -z "$AGENT_TYPE" ]] && [[ "${UPDATE_AGENT_CONTEXT_ENGINE:-}" != "bash" ]] && \
+        command -v python3 >/dev/null 2>&1 && [[ -f "$AGENT_CONTEXT_ENGINE" ]]; then
+        exec python3 "$AGENT_CONTEXT_ENGINE" --repo-root "$REPO_ROOT" --plan "$NEW_PLAN" --branch "$CURRENT_BRANCH"
+    fi
+    
     log_info "=== Updating agent context files for feature $CURRENT_BRANCH ==="
     
     # Parse the plan file to extract project information
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Batch engine for ``scripts/bash/update-agent-context.sh``.
+
+The shell script re-parses ``plan.md`` with four grep/sed pipelines for
+every agent file, and rewrites each file through a ``while read`` loop
+that forks ``echo >>`` once per line. Several agents (Codex, opencode,
+Amp, Amazon Q, IBM Bob) share ``AGENTS.md``, so that file is rewritten
+several times per run, and its Recent Changes entry is repeated each
+time. This engine:
+
+- parses every ``specs/*/plan.md`` once. "Active Technologies" aggregates
+  all of them, as the template's ``[EXTRACTED FROM ALL PLAN.MD FILES]``
+  placeholder describes, instead of only the current feature.
+- resolves the agent targets and dedupes them by path.
+- renders each file in memory in one pass, with the same section rules as
+  the script, and writes it atomically. Unchanged files are not touched,
+  and the current feature's Recent Changes entry is never repeated.
+
+With no agent argument, ``update-agent-context.sh`` hands off to this
+engine. Set ``UPDATE_AGENT_CONTEXT_ENGINE=bash`` to keep the shell path.
+
+Usage: agent_context.py [AGENT ...] [--plan PLAN] [--branch BRANCH] [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_text, specify_dir  # noqa: E402
+
+# agent type -> (path relative to the repo root, display name); same table
+# as the *_FILE variables in update-agent-context.sh
+AGENTS: Dict[str, Tuple[str, str]] = {
+    "claude": ("CLAUDE.md", "Claude Code"),
+    "gemini": ("GEMINI.md", "Gemini CLI"),
+    "copilot": (".github/agents/copilot-instructions.md", "GitHub Copilot"),
+    "cursor-agent": (".cursor/rules/specify-rules.mdc", "Cursor IDE"),
+    "qwen": ("QWEN.md", "Qwen Code"),
+    "opencode": ("AGENTS.md", "opencode"),
+    "codex": ("AGENTS.md", "Codex CLI"),
+    "windsurf": (".windsurf/rules/specify-rules.md", "Windsurf"),
+    "kilocode": (".kilocode/rules/specify-rules.md", "Kilo Code"),
+    "auggie": (".augment/rules/specify-rules.md", "Auggie CLI"),
+    "roo": (".roo/rules/specify-rules.md", "Roo Code"),
+    "codebuddy": ("CODEBUDDY.md", "CodeBuddy CLI"),
+    "qoder": ("QODER.md", "Qoder CLI"),
+    "amp": ("AGENTS.md", "Amp"),
+    "shai": ("SHAI.md", "SHAI"),
+    "q": ("AGENTS.md", "Amazon Q Developer CLI"),
+    "bob": ("AGENTS.md", "IBM Bob"),
+}
+# Order in which update_all_existing_agents() probes for existing files
+ALL_AGENTS = ["claude", "gemini", "copilot", "cursor-agent", "qwen", "codex", "windsurf", "kilocode",
+              "auggie", "roo", "codebuddy", "shai", "qoder", "q", "bob"]
+BATCH_NAMES = {"AGENTS.md": "Codex/opencode"}
+
+PLAN_FIELDS = {
+    "Language/Version": "language",
+    "Primary Dependencies": "framework",
+    "Storage": "database",
+    "Project Type": "project_type",
+}
+FIELD_RE = re.compile(r"^\*\*(%s)\*\*: (.*)$" % "|".join(re.escape(f) for f in PLAN_FIELDS), re.MULTILINE)
+DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+LAST_UPDATED_RE = re.compile(r"Last updated\**:.*[0-9]{4}-[0-9]{2}-[0-9]{2}")
+SECTION_RE = re.compile(r"^##\s")
+
+
+# -- plan parsing ------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PlanData:
+    branch: str
+    language: str = ""
+    framework: str = ""
+    database: str = ""
+    project_type: str = ""
+
+    @property
+    def tech_stack(self) -> str:
+        return " + ".join(part for part in (self.language, self.framework) if part)
+
+    @property
+    def has_database(self) -> bool:
+        return bool(self.database) and self.database not in ("N/A", "NEEDS CLARIFICATION")
+
+    def tech_entries(self) -> List[Tuple[str, str]]:
+        """``(needle, entry)`` pairs; an entry is skipped if its needle is already in the file."""
+        entries = []
+        if self.tech_stack:
+            entries.append((self.tech_stack, f"- {self.tech_stack} ({self.branch})"))
+        if self.has_database:
+            entries.append((self.database, f"- {self.database} ({self.branch})"))
+        return entries
+
+    @property
+    def change_entry(self) -> str:
+        if self.tech_stack:
+            return f"- {self.branch}: Added {self.tech_stack}"
+        if self.has_database:
+            return f"- {self.branch}: Added {self.database}"
+        return ""
+
+
+def parse_plan(path: Path, branch: str) -> PlanData:
+    """Read the plan's metadata fields in one pass (first occurrence wins)."""
+    values: Dict[str, str] = {}
+    for label, value in FIELD_RE.findall(path.read_text(encoding="utf-8")):
+        key = PLAN_FIELDS[label]
+        if key in values:
+            continue
+        value = value.strip()
+        values[key] = "" if "NEEDS CLARIFICATION" in value or value == "N/A" else value
+    return PlanData(branch=branch, **values)
+
+
+def collect_plans(repo_root: Path, current_plan: Path, branch: str) -> Tuple[PlanData, List[PlanData]]:
+    """The current feature's plan plus every ``specs/*/plan.md``, each parsed once."""
+    plans: List[PlanData] = []
+    current: Optional[PlanData] = None
+    specs = repo_root / "specs"
+    candidates = sorted(specs.glob("*/plan.md")) if specs.is_dir() else []
+    if current_plan.resolve() not in {p.resolve() for p in candidates}:
+        candidates.append(current_plan)
+    for path in candidates:
+        is_current = path.resolve() == current_plan.resolve()
+        plan = parse_plan(path, branch if is_current else path.parent.name)
+        plans.append(plan)
+        if is_current:
+            current = plan
+    assert current is not None
+    return current, plans
+
+
+# -- rendering ---------------------------------------------------------------
+
+
+def _project_structure(project_type: str) -> str:
+    return "backend/\nfrontend/\ntests/" if "web" in project_type else "src/\ntests/"
+
+
+def _commands(language: str) -> str:
+    if "Python" in language:
+        return "cd src && pytest && ruff check ."
+    if "Rust" in language:
+        return "cargo test && cargo clippy"
+    if "JavaScript" in language or "TypeScript" in language:
+        return "npm test && npm run lint"
+    return f"# Add commands for {language}"
+
+
+def render_new(template: str, project: str, today: str, current: PlanData, plans: List[PlanData]) -> str:
+    """Fill the agent-file template (``create_new_agent_file``)."""
+    technologies: List[str] = []
+    for plan in plans:
+        for _, entry in plan.tech_entries():
+            if entry not in technologies:
+                technologies.append(entry)
+    if not technologies:
+        technologies.append(f"- ({current.branch})")
+    recent = [p.change_entry or f"- {p.branch}: Added" for p in [current] + [p for p in reversed(plans) if p is not current]]
+    replacements = [
+        ("[PROJECT NAME]", project),
+        ("[DATE]", today),
+        ("[EXTRACTED FROM ALL PLAN.MD FILES]", "\n".join(technologies)),
+        ("[ACTUAL STRUCTURE FROM PLANS]", _project_structure(current.project_type)),
+        ("[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]", _commands(current.language)),
+        ("[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]", f"{current.language}: Follow standard conventions"),
+        ("[LAST 3 FEATURES AND WHAT THEY ADDED]", "\n".join(recent[:3])),
+    ]
+    for placeholder, value in replacements:
+        template = template.replace(placeholder, value)
+    return template
+
+
+def render_existing(text: str, today: str, current: PlanData, plans: List[PlanData]) -> str:
+    """Update Active Technologies, Recent Changes and the date (``update_existing_agent_file``)."""
+    new_tech: List[str] = []
+    for plan in plans:
+        for needle, entry in plan.tech_entries():
+            if needle not in text and entry not in new_tech:
+                new_tech.append(entry)
+    change = current.change_entry
+    lines = text.splitlines()
+    has_tech = any(line.startswith("## Active Technologies") for line in lines)
+    has_changes = any(line.startswith("## Recent Changes") for line in lines)
+
+    out: List[str] = []
+    in_tech = in_changes = tech_added = False
+    kept_changes = 0
+    for line in lines:
+        if line == "## Active Technologies":
+            out.append(line)
+            in_tech = True
+            continue
+        if in_tech and SECTION_RE.match(line):
+            if not tech_added:
+                out.extend(new_tech)
+                tech_added = True
+            in_tech = False
+            # fall through: the next heading may be Recent Changes
+        elif in_tech and not line:
+            if not tech_added:
+                out.extend(new_tech)
+                tech_added = True
+            out.append(line)
+            continue
+
+        if line == "## Recent Changes":
+            out.append(line)
+            if change:
+                out.append(change)
+            in_changes = True
+            continue
+        if in_changes and SECTION_RE.match(line):
+            in_changes = False
+        elif in_changes and line.startswith("- "):
+            if kept_changes < 2 and line != change:
+                out.append(line)
+                kept_changes += 1
+            continue
+
+        if LAST_UPDATED_RE.search(line):
+            line = DATE_RE.sub(today, line, count=1)
+        out.append(line)
+
+    if in_tech and not tech_added:
+        out.extend(new_tech)
+    if not has_tech and new_tech:
+        out.extend(["", "## Active Technologies", *new_tech])
+    if not has_changes and change:
+        out.extend(["", "## Recent Changes", change])
+    return "\n".join(out) + "\n"
+
+
+# -- batch -------------------------------------------------------------------
+
+
+def resolve_targets(repo_root: Path, agents: List[str]) -> List[Tuple[Path, str]]:
+    """``(path, display name)`` per distinct file; no agents means every existing file."""
+    if agents:
+        selected = [(repo_root / AGENTS[a][0], AGENTS[a][1]) for a in agents]
+    else:
+        selected = [(repo_root / AGENTS[a][0], BATCH_NAMES.get(AGENTS[a][0], AGENTS[a][1]))
+                    for a in ALL_AGENTS if (repo_root / AGENTS[a][0]).is_file()]
+        if not selected:
+            print("INFO: No existing agent files found, creating default Claude file...")
+            selected = [(repo_root / AGENTS["claude"][0], AGENTS["claude"][1])]
+    targets: Dict[str, Tuple[Path, str]] = {}
+    for path, name in selected:
+        key = os.path.realpath(path)
+        if key in targets:
+            previous = targets[key]
+            if name not in previous[1].split("/"):
+                targets[key] = (previous[0], f"{previous[1]}/{name}")
+        else:
+            targets[key] = (path, name)
+    return list(targets.values())
+
+
+def update_agent_files(repo_root: Path, plan_path: Path, branch: str, agents: List[str], dry_run: bool = False,
+                       today: Optional[str] = None) -> Tuple[List[Tuple[Path, str, str]], PlanData]:
+    """Render and write every target; returns ``(path, name, action)`` per target and the current plan."""
+    today = today or date.today().isoformat()
+    current, plans = collect_plans(repo_root, plan_path, branch)
+    template_path = specify_dir(repo_root) / "templates" / "agent-file-template.md"
+    template: Optional[str] = None
+    results = []
+    for path, name in resolve_targets(repo_root, agents):
+        if path.is_file():
+            original = path.read_text(encoding="utf-8")
+            rendered = render_existing(original, today, current, plans)
+            action = "unchanged" if rendered == original else "updated"
+        else:
+            if template is None:
+                if not template_path.is_file():
+                    raise FileNotFoundError(f"Template not found at {template_path}")
+                template = template_path.read_text(encoding="utf-8")
+            rendered = render_new(template, repo_root.name, today, current, plans)
+            action = "created"
+        if action != "unchanged" and not dry_run:
+            atomic_write_text(path, rendered)
+        results.append((path, name, action))
+    return results, current
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update all agent context files from the feature plans.")
+    parser.add_argument("agents", nargs="*", help=f"Agent types ({'|'.join(AGENTS)}); default: all existing")
+    parser.add_argument("--plan", default=None, help="Current feature's plan.md (default: from feature paths)")
+    parser.add_argument("--branch", default=None, help="Current feature name (default: from feature paths)")
+    parser.add_argument("--repo-root", default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args(argv)
+
+    unknown = [a for a in args.agents if a not in AGENTS]
+    if unknown:
+        print(f"ERROR: Unknown agent type '{unknown[0]}'", file=sys.stderr)
+        print(f"ERROR: Expected: {'|'.join(AGENTS)}", file=sys.stderr)
+        return 1
+
+    if args.plan and args.branch and args.repo_root:
+        repo_root, plan, branch = Path(args.repo_root), Path(args.plan), args.branch
+    else:
+        from feature_paths import get_feature_paths
+        paths = get_feature_paths()
+        repo_root = Path(args.repo_root or paths.REPO_ROOT)
+        plan, branch = Path(args.plan or paths.IMPL_PLAN), args.branch or paths.CURRENT_BRANCH
+    if not plan.is_file():
+        print(f"ERROR: No plan.md found at {plan}", file=sys.stderr)
+        return 1
+
+    print(f"INFO: === Updating agent context files for feature {branch} ===")
+    try:
+        results, current = update_agent_files(repo_root, plan, branch, args.agents, dry_run=args.dry_run)
+    except (OSError, UnicodeDecodeError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+    for path, name, action in results:
+        verb = {"created": "Created new", "updated": "Updated existing", "unchanged": "No changes for"}[action]
+        print(f"✓ {verb} {name} context file ({os.path.relpath(path, repo_root)})")
+
+    print()
+    print("INFO: Summary of changes:")
+    if current.language:
+        print(f"  - Added language: {current.language}")
+    if current.framework:
+        print(f"  - Added framework: {current.framework}")
+    if current.has_database:
+        print(f"  - Added database: {current.database}")
+    print()
+    print("✓ Agent context update completed successfully")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
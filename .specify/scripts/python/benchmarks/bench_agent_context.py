@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark: agent_context.py batch mode vs update-agent-context.sh.
+
+Builds a throwaway git repository on feature branch ``003-orders``, with
+``--features`` plans under ``specs/``. It has a CLAUDE.md of ``--lines``
+lines (a rendered template plus manual notes) and the same file as
+GEMINI.md and AGENTS.md. Each run starts from fresh copies and times a
+no-argument update of every existing agent file:
+
+- bash:   ``UPDATE_AGENT_CONTEXT_ENGINE=bash update-agent-context.sh``
+- script: ``update-agent-context.sh``, which hands off to the engine
+- engine: ``update_agent_files()`` in-process
+
+With a single plan (``--features 1``) the CLAUDE.md written by bash and
+by the engine must be identical, apart from the date line. Bash only
+refreshes the bold ``**Last updated**:`` form, not the plain one the
+template renders. With more plans the engine also lists
+the other features' technologies. AGENTS.md is reported separately:
+bash rewrites it once per alias.
+
+Usage: bench_agent_context.py [--lines 5000] [--features 1] [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+PY_DIR = HERE.parent
+SPECIFY_DIR = PY_DIR.parents[1]
+sys.path.insert(0, str(PY_DIR))
+
+from agent_context import LAST_UPDATED_RE, update_agent_files  # noqa: E402
+
+STACKS = [
+    ("Python 3.11", "FastAPI", "PostgreSQL"),
+    ("TypeScript 5.4", "Express, Prisma", "SQLite"),
+    ("Rust 1.75", "axum", "N/A"),
+]
+AGENT_FILES = ("CLAUDE.md", "GEMINI.md", "AGENTS.md")
+
+
+def plan_text(language: str, framework: str, storage: str) -> str:
+    return (
+        "# Implementation Plan\n\n## Technical Context\n\n"
+        f"**Language/Version**: {language}  \n**Primary Dependencies**: {framework}  \n"
+        f"**Storage**: {storage}  \n**Testing**: pytest  \n**Project Type**: web  \n"
+    )
+
+
+def agent_file(lines: int) -> str:
+    head = [
+        "# bench Development Guidelines", "",
+        "Auto-generated from all feature plans. Last updated: 2025-01-01", "",
+        "## Active Technologies", "- Go 1.22 + chi (000-seed)", "",
+        "## Project Structure", "", "```text", "src/", "tests/", "```", "",
+        "## Recent Changes", "- 002-previous: Added Go 1.22", "- 001-first: Added Go 1.22", "- 000-seed: Added Go", "",
+        "<!-- MANUAL ADDITIONS START -->",
+    ]
+    notes = [f"- Note {i}: keep handler {i} idempotent; see docs/adr/{i:04d}.md for context." for i in range(lines)]
+    return "\n".join(head + notes[: max(0, lines - len(head) - 1)] + ["<!-- MANUAL ADDITIONS END -->"]) + "\n"
+
+
+def make_repo(root: Path, features: int, lines: int) -> None:
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    shutil.copytree(SPECIFY_DIR / "scripts" / "bash", root / ".specify" / "scripts" / "bash")
+    shutil.copytree(PY_DIR, root / ".specify" / "scripts" / "python",
+                    ignore=shutil.ignore_patterns("benchmarks", "__pycache__"))
+    shutil.copytree(SPECIFY_DIR / "templates", root / ".specify" / "templates")
+    names = [f"{i:03d}-feature-{i}" for i in range(1, features)] + ["003-orders"]
+    for i, name in enumerate(names):
+        plan = root / "specs" / name / "plan.md"
+        plan.parent.mkdir(parents=True)
+        plan.write_text(plan_text(*STACKS[i % len(STACKS)]), encoding="utf-8")
+    git = ["git", "-C", str(root), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    subprocess.run(git + ["checkout", "-q", "-b", "003-orders"], check=True)
+    seed = root / ".seed"
+    seed.mkdir()
+    for name in AGENT_FILES:
+        (seed / name).write_text(agent_file(lines), encoding="utf-8")
+
+
+def reset(root: Path) -> None:
+    for name in AGENT_FILES:
+        shutil.copyfile(root / ".seed" / name, root / name)
+
+
+def run_timed(fn, root: Path, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        reset(root)
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--features", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_repo(root, args.features, args.lines)
+        script = root / ".specify" / "scripts" / "bash" / "update-agent-context.sh"
+        quiet = {"cwd": root, "check": True, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
+        bash = lambda: subprocess.run(["bash", str(script)], env=dict(os.environ, UPDATE_AGENT_CONTEXT_ENGINE="bash"), **quiet)  # noqa: E731
+        delegated = lambda: subprocess.run(["bash", str(script)], env=dict(os.environ, UPDATE_AGENT_CONTEXT_ENGINE=""), **quiet)  # noqa: E731
+        plan = root / "specs" / "003-orders" / "plan.md"
+        engine = lambda: update_agent_files(root, plan, "003-orders", [])  # noqa: E731
+
+        results = {"bash": run_timed(bash, root, args.runs)}
+        bash_out = {name: (root / name).read_text(encoding="utf-8") for name in AGENT_FILES}
+        results["script"] = run_timed(delegated, root, args.runs)
+        results["engine"] = run_timed(engine, root, args.runs)
+        engine_out = {name: (root / name).read_text(encoding="utf-8") for name in AGENT_FILES}
+
+    print(f"{args.lines} lines x {len(AGENT_FILES)} agent files, {args.features} plan(s)")
+    for label, ms in results.items():
+        print(f"  {label:<7} {ms:>9.1f} ms   ({results['bash'] / ms:.0f}x vs bash)")
+    undated = lambda text: LAST_UPDATED_RE.sub("Last updated: DATE", text)  # noqa: E731
+    same = undated(bash_out["CLAUDE.md"]) == undated(engine_out["CLAUDE.md"])
+    print(f"CLAUDE.md identical to bash output (date line masked): {'yes' if same else 'no'}")
+    repeated = bash_out["AGENTS.md"].count("- 003-orders: Added")
+    print(f"AGENTS.md Recent Changes entries for 003-orders: bash {repeated}, "
+          f"engine {engine_out['AGENTS.md'].count('- 003-orders: Added')}")
+    if args.features == 1 and not same:
+        print("ERROR: CLAUDE.md differs from the bash output", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
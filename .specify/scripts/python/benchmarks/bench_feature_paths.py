@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark: feature_paths.py vs ``get_feature_paths`` from common.sh.
+
+Builds a throwaway git repository with N ``specs/NNN-*`` directories,
+checks out a feature branch and times:
+
+- bash-cold: ``source common.sh; get_feature_paths`` with the cache removed
+             before every run, i.e. the original git/glob path
+- bash-warm: the same call replaying ``feature-paths.env``
+- py-cold:   the CLI with its caches removed before every run
+- py-warm:   the CLI with warm on-disk caches
+- lib-warm:  ``FeaturePathResolver.resolve()`` in-process (memoised)
+
+CLI timings are dominated by interpreter startup; lib-warm is what the
+other Python workflow scripts pay.
+
+Usage: bench_feature_paths.py [--sizes 10,500,5000] [--runs 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+PY_DIR = HERE.parent
+BASH_DIR = PY_DIR.parent / "bash"
+sys.path.insert(0, str(PY_DIR))
+
+from feature_paths import FeaturePathResolver  # noqa: E402
+
+
+def make_repo(root: Path, count: int) -> None:
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    scripts = root / ".specify" / "scripts"
+    shutil.copytree(BASH_DIR, scripts / "bash")
+    shutil.copytree(PY_DIR, scripts / "python", ignore=shutil.ignore_patterns("benchmarks", "__pycache__"))
+    specs = root / "specs"
+    # Past 999 the names stop matching the three-digit prefix but still have
+    # to be walked, which is what a long-lived monorepo looks like.
+    for i in range(1, count + 1):
+        (specs / f"{i:03d}-feature-{i}").mkdir(parents=True)
+    git = ["git", "-C", str(root), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    subprocess.run(git + ["checkout", "-q", "-b", "007-bench"], check=True)
+
+
+def time_cmd(cmd, cwd: Path, runs: int, before=None) -> float:
+    samples = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench(count: int, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_repo(root, count)
+        cache = root / ".specify" / ".cache"
+        resolver_cli = [sys.executable, str(root / ".specify/scripts/python/feature_paths.py")]
+        bash_cmd = ["bash", "-c", f"source '{root}/.specify/scripts/bash/common.sh'; get_feature_paths"]
+
+        clear = lambda: shutil.rmtree(cache, ignore_errors=True)  # noqa: E731
+        results = {"bash-cold": time_cmd(bash_cmd, root, runs, before=clear)}
+        time_cmd(bash_cmd, root, 1)
+        results["bash-warm"] = time_cmd(bash_cmd, root, runs)
+        results["py-cold"] = time_cmd(resolver_cli, root, runs, before=clear)
+        time_cmd(resolver_cli, root, 1)
+        results["py-warm"] = time_cmd(resolver_cli, root, runs)
+
+        resolver = FeaturePathResolver(root)
+        resolver.resolve()
+        iterations = 10000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            resolver.resolve()
+        results["lib-warm"] = (time.perf_counter() - start) / iterations * 1000
+        return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,500,5000")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.pop("SPECIFY_FEATURE", None)
+    columns = ("bash-cold", "bash-warm", "py-cold", "py-warm", "lib-warm")
+    print(f"{'features':>8}" + "".join(f"  {name + ' ms':>12}" for name in columns))
+    for size in (int(s) for s in args.sizes.split(",")):
+        r = bench(size, args.runs)
+        print(f"{size:>8}" + "".join(f"  {r[name]:>12.4f}" for name in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
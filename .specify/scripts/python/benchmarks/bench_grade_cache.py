@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Benchmark: resuming a 13-phase COMPLEX build with and without grade_cache.
+
+Builds a COMPLEX-mode project with ``--features`` features (``src/`` and
+``tests/`` per feature) and ``--components`` generated skills, agents and
+hooks. Each feature's spec, plan and tasks are written when phases 8, 9
+and 10 run, as in a real build. A stand-in grader reads every artifact and input,
+scores it (a ``TODO: fix`` marker gets it REJECTED) and sleeps
+``--grade-ms`` to stand for the Quality Gate Teacher's evaluation.
+
+1. The first run grades phases 1-7.5, the Phase 6.5 components, feature 1
+   end to end, and feature 2 up to a REJECTED IMPLEMENT. Then the session
+   dies.
+2. The resume re-runs Phase 0, which re-validates everything already
+   done. Nothing changed, so every one of these must be a cache hit, even
+   for SPEC and PLAN, which were graded before the later documents
+   existed. It then self-heals feature 2's IMPLEMENT twice: each attempt
+   fixes one file and re-grades SPEC/PLAN/TASKS/IMPLEMENT. Finally it
+   finishes the remaining features, INTEGRATION QA and DELIVER.
+
+Step 2 runs twice on identical copies of the project: once grading
+everything, and once through ``GradeCache``. Every cache hit is also
+re-graded fresh on the spot (untimed) and must give the same grade and
+status.
+
+Usage: bench_grade_cache.py [--features 3] [--components 14] [--grade-ms 200] [--files 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from grade_cache import GradeCache, phase_defaults  # noqa: E402
+
+TODO = b"TODO: fix"
+
+
+@dataclass
+class Step:
+    subject: str
+    artifacts: List[Path]
+    inputs: List[Path]
+    report: Path
+    writes: Optional[Path] = None  # document the phase produces before it is graded
+
+
+def make_project(root: Path, features: int, components: int, files: int) -> None:
+    specify = root / ".specify"
+    (specify / "memory").mkdir(parents=True)
+    (specify / "memory" / "constitution.md").write_text("# Constitution\n\n- TDD\n- 80% coverage\n", encoding="utf-8")
+    for name in ("project-analysis.json", "requirements-analysis.json", "gap-analysis.json", "features.json"):
+        (specify / name).write_text('{"generated": true}\n', encoding="utf-8")
+    (root / ".claude" / "logs").mkdir(parents=True)
+    (root / ".claude" / "settings.json").write_text("{}\n", encoding="utf-8")
+    (root / ".claude" / "logs" / "test-results.log").write_text("skill validated\n", encoding="utf-8")
+    for i in range(components):
+        kind = ("skills", "agents", "hooks")[i % 3]
+        component = root / ".claude" / kind / f"component-{i}"
+        component.mkdir(parents=True)
+        (component / "SKILL.md").write_text(f"# Component {i}\n\n" + "Guidance line.\n" * 80, encoding="utf-8")
+    for f in range(1, features + 1):
+        (specify / "features" / f"{f:03d}-feature").mkdir(parents=True)
+        for area in ("src", "tests"):
+            directory = root / area / f"feature-{f}"
+            directory.mkdir(parents=True)
+            for n in range(files):
+                body = f"export function handler{n}() {{ return {n}; }}\n" * 40
+                if f == 2 and area == "src" and n < 2:
+                    body += "// TODO: fix error handling\n"  # feature 2 IMPLEMENT is rejected until both are fixed
+                (directory / f"module{n}.ts").write_text(body, encoding="utf-8")
+
+
+def phase_step(root: Path, phase: str, feature: Optional[int] = None, artifacts: Optional[List[str]] = None) -> Step:
+    feature_dir = root / ".specify" / "features" / f"{feature:03d}-feature" if feature else None
+    default_artifacts, inputs = phase_defaults(root, phase, feature_dir)
+    subject = f"phase-{phase}" + (f"@feature-{feature}" if feature else "")
+    writes = default_artifacts[0] if feature and phase in ("8", "9", "10") else None
+    return Step(subject, [root / a for a in artifacts] if artifacts else default_artifacts, inputs,
+                root / ".specify" / "validations" / f"phase-{phase}-report.md", writes)
+
+
+def feature_steps(root: Path, f: int, upto: str = "11.6") -> List[Step]:
+    steps = []
+    for phase, artifacts in (("8", None), ("9", None), ("10", None),
+                             ("11", [f"src/feature-{f}", f"tests/feature-{f}"]),
+                             ("11.5", [f"tests/feature-{f}"]),
+                             ("11.6", ["tests"])):
+        if not (phase == "11.6" and f < 2):
+            steps.append(phase_step(root, phase, f, artifacts))
+        if phase == upto:
+            break
+    return steps
+
+
+def project_steps(root: Path, components: int) -> List[Step]:
+    steps = [phase_step(root, "1", artifacts=[".claude/settings.json"])]
+    steps += [phase_step(root, p) for p in ("2", "3", "4")]
+    steps.append(phase_step(root, "5", artifacts=[".claude/skills", ".claude/agents", ".claude/hooks"]))
+    steps.append(phase_step(root, "6", artifacts=[".claude/logs/test-results.log"]))
+    for i in range(components):
+        path = root / ".claude" / ("skills", "agents", "hooks")[i % 3] / f"component-{i}"
+        steps.append(Step(f"component:{path.name}", [path], [],
+                          root / ".specify" / "validations" / "components" / f"{path.name}-report.md"))
+    steps += [phase_step(root, "7"), phase_step(root, "7.5")]
+    return steps
+
+
+def final_steps(root: Path) -> List[Step]:
+    return [phase_step(root, "12", artifacts=["src", "tests"]), phase_step(root, "13", artifacts=["src", "tests"])]
+
+
+def grade(step: Step, grade_ms: float) -> str:
+    """Stand-in for the Quality Gate Teacher: read everything, score, report."""
+    digest, rejected = hashlib.sha256(), False
+    for path in step.artifacts + step.inputs:
+        targets = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for target in targets:
+            data = target.read_bytes() if target.exists() else b""
+            digest.update(data)
+            rejected |= TODO in data and path in step.artifacts
+    score = 45 if rejected else 70 + int(digest.hexdigest()[:2], 16) % 31
+    letter = next(g for floor, g in ((90, "A"), (80, "B"), (70, "C"), (60, "D"), (0, "F")) if score >= floor)
+    status = "APPROVED" if score >= 70 else "REJECTED"
+    time.sleep(grade_ms / 1000)
+    return (f"# {step.subject} Validation Report\n\n## Summary\n| Field | Value |\n|-------|-------|\n"
+            f"| Grade | {letter} |\n| Score | {score}/100 |\n| Status | {status} |\n")
+
+
+def run(steps: List[Step], grade_ms: float, cache: Optional[GradeCache], hits: Optional[list] = None) -> dict:
+    counts = {"requested": 0, "graded": 0, "lookup_s": [], "check_s": 0.0}
+    for step in steps:
+        counts["requested"] += 1
+        if step.writes is not None and not step.writes.exists():
+            doc = step.writes.stem
+            step.writes.write_text(f"# {doc}\n\n" + f"- {doc} requirement\n" * 60, encoding="utf-8")
+        if cache is not None:
+            start = time.perf_counter()
+            key, depends = cache.key(step.subject, step.artifacts, step.inputs)
+            result = cache.lookup(key, step.subject, step.report)
+            counts["lookup_s"].append(time.perf_counter() - start)
+            if result.hit:
+                if hits is not None:  # re-grade now, before later steps change the tree (not timed)
+                    start = time.perf_counter()
+                    hits.append((step.subject, result.grade, result.status, grade(step, 0)))
+                    counts["check_s"] += time.perf_counter() - start
+                continue
+        text = grade(step, grade_ms)
+        counts["graded"] += 1
+        step.report.parent.mkdir(parents=True, exist_ok=True)
+        step.report.write_text(text, encoding="utf-8")
+        if cache is not None:
+            cache.store(key, step.subject, text, depends)
+    return counts
+
+
+def fix(root: Path, n: int) -> None:
+    path = root / "src" / "feature-2" / f"module{n}.ts"
+    path.write_text(path.read_text(encoding="utf-8").replace("// TODO: fix error handling\n", ""), encoding="utf-8")
+
+
+def resume(root: Path, features: int, components: int, grade_ms: float, cache: Optional[GradeCache],
+           hits: Optional[list] = None) -> dict:
+    done_before = project_steps(root, components) + feature_steps(root, 1) + feature_steps(root, 2, upto="10")
+    implement_2 = feature_steps(root, 2, upto="11")
+    steps_total = {"requested": 0, "graded": 0, "lookup_s": [], "check_s": 0.0}
+
+    def add(counts: dict) -> None:
+        for k in steps_total:
+            steps_total[k] += counts[k]
+
+    start = time.perf_counter()
+    phase_0 = run(done_before, grade_ms, cache, hits)  # Phase 0: re-validate completed phases
+    add(phase_0)
+    for n in range(2):  # self-heal attempts 2 and 3
+        fix(root, n)
+        add(run(implement_2, grade_ms, cache, hits))
+    rest = feature_steps(root, 2)[len(implement_2):]
+    for f in range(3, features + 1):
+        rest += feature_steps(root, f)
+    add(run(rest + final_steps(root), grade_ms, cache, hits))
+    steps_total["seconds"] = time.perf_counter() - start - steps_total["check_s"]
+    steps_total["phase_0"] = (phase_0["requested"], phase_0["graded"])
+    return steps_total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=3)
+    parser.add_argument("--components", type=int, default=14)
+    parser.add_argument("--grade-ms", type=float, default=200)
+    parser.add_argument("--files", type=int, default=60, help="source files per feature in src/ and tests/")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cached_root = Path(tmp) / "cached"
+        cached_root.mkdir()
+        make_project(cached_root, args.features, args.components, args.files)
+        # First session: everything up to feature 2's rejected IMPLEMENT, through the cache
+        first = project_steps(cached_root, args.components) + feature_steps(cached_root, 1) \
+            + feature_steps(cached_root, 2, upto="11")
+        run(first, 0, GradeCache(cached_root))
+        plain_root = Path(tmp) / "plain"
+        shutil.copytree(cached_root, plain_root, symlinks=True)
+
+        plain = resume(plain_root, args.features, args.components, args.grade_ms, None)
+        hits: list = []
+        cache = GradeCache(cached_root)
+        before = cache.stats()
+        cached = resume(cached_root, args.features, args.components, args.grade_ms, cache, hits)
+        after = cache.stats()
+
+        mismatches = 0
+        requested, regraded = cached["phase_0"]
+        if regraded:
+            print(f"ERROR: Phase 0 re-graded {regraded} of {requested} unchanged phases", file=sys.stderr)
+        for subject, letter, status, fresh in hits:
+            if f"| Grade | {letter} |" not in fresh or f"| Status | {status} |" not in fresh:
+                mismatches += 1
+                print(f"ERROR: cached {subject} is {letter} {status}, fresh grading disagrees", file=sys.stderr)
+
+        cli = [sys.executable, str(HERE.parent / "grade_cache.py"), "--repo-root", str(cached_root),
+               "lookup", "--phase", "9", "--feature-dir", str(cached_root / ".specify" / "features" / "001-feature")]
+        samples = []
+        for _ in range(5):
+            start = time.perf_counter()
+            subprocess.run(cli, check=False, capture_output=True)
+            samples.append(time.perf_counter() - start)
+
+    hit_count = after["hits"] - before["hits"]
+    miss_count = after["misses"] - before["misses"]
+    print(f"Resumed COMPLEX build: {args.features} features, {args.components} components, "
+          f"{plain['requested']} gradings requested, {args.grade_ms:.0f}ms per grading")
+    print(f"  {'':<12}{'grader calls':>14}{'wall':>10}")
+    print(f"  {'no cache':<12}{plain['graded']:>14}{plain['seconds']:>9.1f}s")
+    print(f"  {'grade cache':<12}{cached['graded']:>14}{cached['seconds']:>9.1f}s   "
+          f"({hit_count} hits, {miss_count} misses, hit rate {hit_count / max(hit_count + miss_count, 1):.0%})")
+    saved = plain["graded"] - cached["graded"]
+    print(f"  saved {saved} gradings; at 30s per real evaluation that is {saved * 30 / 60:.0f} min")
+    print(f"  lookup cost: {statistics.median(cached['lookup_s']) * 1000:.1f}ms in-process (median), "
+          f"{statistics.median(samples) * 1000:.0f}ms via the CLI; "
+          f"cache {after['entries']} entries, {after['bytes'] / 1024:.1f}KB")
+    requested, regraded = cached["phase_0"]
+    print(f"  Phase 0 re-validation: {requested - regraded}/{requested} hits")
+    print(f"  cache hits re-graded fresh: {mismatches} mismatches")
+    return 1 if mismatches or regraded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Benchmark: id_allocator.py vs the bash next-number scans.
+
+Builds a git repository with ``--branches`` remote-tracking feature branches
+(packed, as after a ``git fetch``), ``--specs`` spec directories, and
+``--phrs`` prompt history records in one feature's ``history/prompts/``.
+Then it times the next feature and PHR numbers:
+
+- bash:       ``get_highest_from_branches`` + ``get_highest_from_specs``
+              from ``create-new-feature.sh``, and ``get_next_id`` from
+              ``create-phr.sh``
+- cold:       ``IdAllocator.peek`` with no counter file (full rescan)
+- warm:       ``IdAllocator.reserve`` with a warm counter (in-process)
+- cli:        ``id_allocator.py reserve`` as a process (includes interpreter
+              startup), which is what the scripts run
+- script:     ``create-phr.sh`` end to end, with the allocator and with
+              ``SPECIFY_ID_ALLOCATOR=bash``
+
+The bash and allocator numbers are checked against each other.
+
+Usage: bench_id_allocator.py [--branches 2000] [--specs 40] [--phrs 10000] [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+PY_DIR = HERE.parent
+SPECIFY_DIR = PY_DIR.parents[1]
+sys.path.insert(0, str(PY_DIR))
+
+from id_allocator import IdAllocator, feature_namespace, phr_namespace  # noqa: E402
+
+FEATURE = "001-todo-api"
+
+# Verbatim from create-new-feature.sh and create-phr.sh
+BASH_SCANS = r"""
+get_highest_from_specs() {
+    local specs_dir="$1"
+    local highest=0
+    if [ -d "$specs_dir" ]; then
+        for dir in "$specs_dir"/*; do
+            [ -d "$dir" ] || continue
+            dirname=$(basename "$dir")
+            number=$(echo "$dirname" | grep -o '^[0-9]\+' || echo "0")
+            number=$((10#$number))
+            if [ "$number" -gt "$highest" ]; then
+                highest=$number
+            fi
+        done
+    fi
+    echo "$highest"
+}
+get_highest_from_branches() {
+    local highest=0
+    branches=$(git branch -a 2>/dev/null || echo "")
+    if [ -n "$branches" ]; then
+        while IFS= read -r branch; do
+            clean_branch=$(echo "$branch" | sed 's/^[* ]*//; s|^remotes/[^/]*/||')
+            if echo "$clean_branch" | grep -q '^[0-9]\{3\}-'; then
+                number=$(echo "$clean_branch" | grep -o '^[0-9]\{3\}' || echo "0")
+                number=$((10#$number))
+                if [ "$number" -gt "$highest" ]; then
+                    highest=$number
+                fi
+            fi
+        done <<< "$branches"
+    fi
+    echo "$highest"
+}
+get_next_id() {
+  local max_id=0
+  for file in "$PROMPTS_DIR"/[0-9][0-9][0-9][0-9]-*.prompt.md; do
+    [[ -e "$file" ]] || continue
+    local base=$(basename "$file")
+    local num=${base%%-*}
+    if [[ "$num" =~ ^[0-9]{4}$ ]]; then
+      local value=$((10#$num))
+      if (( value > max_id )); then
+        max_id=$value
+      fi
+    fi
+  done
+  printf '%04d' $((max_id + 1))
+}
+"""
+
+
+def make_repo(root: Path, branches: int, specs: int, phrs: int) -> None:
+    git = ["git", "-C", str(root), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    sha = subprocess.run(git + ["rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+    # Remote feature branches, numbered up to 999 and then wrapping like
+    # a long-lived repository with many contributors
+    lines = ["# pack-refs with: peeled fully-peeled sorted"]
+    lines += sorted(f"{sha} refs/remotes/origin/{(i % 999) + 1:03d}-feature-{i}" for i in range(branches))
+    (root / ".git" / "packed-refs").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    for i in range(1, specs + 1):
+        (root / "specs" / f"{i:03d}-feature-{i}").mkdir(parents=True)
+    (root / "specs" / FEATURE).mkdir(exist_ok=True)
+    prompts = root / "history" / "prompts" / FEATURE
+    prompts.mkdir(parents=True)
+    for i in range(1, phrs + 1):
+        (prompts / f"{i:04d}-step-{i}.green.prompt.md").touch()
+    shutil.copytree(SPECIFY_DIR / "scripts", root / ".specify" / "scripts",
+                    ignore=shutil.ignore_patterns("benchmarks", "__pycache__"))
+    shutil.copytree(SPECIFY_DIR / "templates", root / ".specify" / "templates")
+
+
+def timed(fn, runs: int, before=None):
+    samples, result = [], None
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def bash(root: Path, snippet: str, env=None) -> str:
+    return subprocess.run(["bash", "-c", BASH_SCANS + snippet], cwd=root, check=True,
+                          capture_output=True, text=True, env=env).stdout.strip()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=2000)
+    parser.add_argument("--specs", type=int, default=40)
+    parser.add_argument("--phrs", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--bash-runs", type=int, default=1, help="runs for the (slow) bash scans")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_repo(root, args.branches, args.specs, args.phrs)
+        prompts = root / "history" / "prompts" / FEATURE
+        features = IdAllocator(root, feature_namespace(root))
+        phr = IdAllocator(root, phr_namespace(root, prompts))
+        forget = lambda engine: (lambda: engine.counter_path.unlink(missing_ok=True))  # noqa: E731
+        cli = [sys.executable, str(root / ".specify" / "scripts" / "python" / "id_allocator.py"), "--repo-root", str(root)]
+        rows = []
+
+        snippet = 'a=$(get_highest_from_branches); b=$(get_highest_from_specs specs); echo $(( (a > b ? a : b) + 1 ))'
+        bash_ms, bash_next = timed(lambda: int(bash(root, snippet)), args.bash_runs)
+        cold_ms, cold_next = timed(features.peek, args.runs, before=forget(features))
+        if bash_next != cold_next:
+            print(f"ERROR: bash says feature {bash_next}, allocator {cold_next}", file=sys.stderr)
+            return 1
+        counter = iter(range(10**6))
+        warm_ms, _ = timed(lambda: features.reserve(f"bench-{next(counter)}"), args.runs)
+        cli_ms, _ = timed(lambda: subprocess.run(cli + ["reserve", "feature", "--name", f"cli-{next(counter)}"],
+                                                 check=True, capture_output=True), args.runs)
+        rows.append((f"feature ({args.branches} branches, {args.specs} specs)", bash_ms, cold_ms, warm_ms, cli_ms))
+
+        env = dict(os.environ, PROMPTS_DIR=str(prompts))
+        bash_ms, bash_next = timed(lambda: int(bash(root, "get_next_id", env)), args.bash_runs)
+        cold_ms, cold_next = timed(phr.peek, args.runs, before=forget(phr))
+        if bash_next != cold_next:
+            print(f"ERROR: bash says PHR {bash_next}, allocator {cold_next}", file=sys.stderr)
+            return 1
+        warm_ms, _ = timed(lambda: phr.reserve(f"bench-{next(counter)}.green.prompt.md"), args.runs)
+        cli_ms, _ = timed(lambda: subprocess.run(cli + ["reserve", "phr", "--dir", str(prompts), "--name",
+                                                        f"cli-{next(counter)}.green.prompt.md"],
+                                                 check=True, capture_output=True), args.runs)
+        rows.append((f"phr ({args.phrs} files)", bash_ms, cold_ms, warm_ms, cli_ms))
+
+        script = ["bash", str(root / ".specify" / "scripts" / "bash" / "create-phr.sh"),
+                  "--title", "bench", "--stage", "green", "--feature", FEATURE, "--json"]
+        run = lambda env: subprocess.run(script, cwd=root, check=True, capture_output=True, env=env)  # noqa: E731
+        script_bash_ms, _ = timed(lambda: run(dict(os.environ, SPECIFY_ID_ALLOCATOR="bash")), args.bash_runs)
+        script_ms, _ = timed(lambda: run(dict(os.environ, SPECIFY_ID_ALLOCATOR="")), args.runs)
+
+    print(f"{'next number':<40}{'bash':>10}{'cold':>10}{'warm':>10}{'cli':>10}   (median ms)")
+    for label, *values in rows:
+        print(f"{label:<40}" + "".join(f"{v:>10.1f}" for v in values))
+    print(f"create-phr.sh end to end: {script_bash_ms:,.0f}ms with the bash scan, "
+          f"{script_ms:,.0f}ms with the allocator")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark: indexed log segments vs grep over unbounded .claude/logs.
+
+Writes a synthetic multi-day log set of ``--gb`` gigabytes across the six
+activity logs, twice: once left to grow unbounded, and once rotated into
+``--segment-mb`` segments as it is written, the way a scheduled
+``log_store.py rotate`` keeps up with an autonomous build. Then it times:
+
+- grep:         the workflow-validator utilization check on the raw,
+                never-rotated files (``grep -o | sort | uniq -c`` and
+                ``wc -l``)
+- rotate:       compressing and indexing every segment (one-off, amortised
+                over the build)
+- index query:  ``LogStore.total()``/``utilization`` from the indexes
+- window query: ``--since`` the middle of the run, which decompresses only
+                the straddling segment
+- tail -n 20:   from the active file and the newest segment
+
+The grep counts, including ``grep -c validated`` over lines that contain
+the word twice, are checked against the index counts.
+
+Usage: bench_log_store.py [--gb 1.0] [--segment-mb 64] [--dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from log_store import LOGS, READ_BLOCK, LogStore  # noqa: E402
+
+SKILLS = [f"skill-{i}" for i in range(40)]
+AGENTS = [f"agent-{i}" for i in range(12)]
+# Share of the total volume per log, roughly what a long build produces
+WEIGHTS = {
+    "tool-usage": 0.35,
+    "file-changes": 0.25,
+    "skill-activations": 0.2,
+    "skill-invocations": 0.1,
+    "agent-usage": 0.05,
+    "skill-enforcement": 0.05,
+}
+
+
+def line_for(name: str, rng: random.Random, ts: str) -> str:
+    if name == "tool-usage":
+        return f"[{ts}] Tool: {rng.choice(('Edit', 'Write', 'Read', 'Bash'))} | File: src/module{rng.randrange(500)}/file.ts\n"
+    if name == "file-changes":
+        return f"[{ts}] File modified: src/module{rng.randrange(500)}/component{rng.randrange(50)}.tsx\n"
+    if name == "skill-activations":
+        skill = rng.choice(SKILLS)
+        return f"[{ts}] Prompt: \"add an endpoint for orders and wire it up\" | Matched: {skill} (7)\n"
+    if name == "skill-invocations":
+        if rng.random() < 0.01:  # two matches on one line still count as one validated line
+            return f"[{ts}] Skill invoked: {rng.choice(SKILLS)} (validated, re-validated)\n"
+        return f"[{ts}] Skill invoked: {rng.choice(SKILLS)}\n"
+    if name == "agent-usage":
+        return f"[{ts}] Agent task invoked: {rng.choice(AGENTS)}\n"
+    return f"[{ts}] MANDATORY skill not used: {rng.choice(SKILLS)}\n"
+
+
+def write_slice(path: Path, name: str, size: int, rng: random.Random, clock: list) -> None:
+    with open(path, "a", encoding="utf-8") as handle:
+        written = 0
+        while written < size:
+            clock[0] += timedelta(seconds=1)
+            ts = clock[0].strftime("%Y-%m-%dT%H:%M:%S")
+            block = "".join(line_for(name, rng, ts) for _ in range(2000))
+            handle.write(block)
+            written += len(block)
+
+
+def grep_utilization(directory: Path) -> dict:
+    script = (
+        f"cd '{directory}' && "
+        "grep -oh 'Skill invoked: [^ ]*' skill-invocations.log | sort | uniq -c; "
+        "grep -oh 'Agent task invoked: [^ ]*' agent-usage.log | sort | uniq -c; "
+        "cat *.log | wc -l; "
+        "cat *.log | grep -c validated"
+    )
+    out = subprocess.run(["bash", "-c", script], check=True, capture_output=True, text=True).stdout
+    counts = {}
+    for line in out.splitlines()[:-2]:
+        n, *rest = line.split()
+        counts[rest[-1]] = int(n)
+    counts["total lines"] = int(out.splitlines()[-2].split()[0])
+    counts["validated lines"] = int(out.splitlines()[-1])
+    return counts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gb", type=float, default=1.0)
+    parser.add_argument("--segment-mb", type=int, default=64)
+    parser.add_argument("--dir", default=None, help="working directory (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = Path(args.dir) if args.dir else Path(tempfile.mkdtemp())
+    raw, managed = workdir / "raw", workdir / "managed"
+    for directory in (raw, managed):
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+    store = LogStore(managed)
+
+    total = int(args.gb * 1024 ** 3)
+    segment_bytes = args.segment_mb * 1024 * 1024
+    rng, clock = random.Random(3), [datetime(2026, 1, 1)]
+    rotate_seconds, midpoint, written = 0.0, None, 0
+    print(f"Writing {total / 1024 ** 3:.2f}GB...", flush=True)
+    while written < total:
+        name = rng.choices(list(WEIGHTS), weights=list(WEIGHTS.values()))[0]
+        path = raw / f"{name}.log"
+        before = path.stat().st_size if path.exists() else 0
+        write_slice(path, name, min(segment_bytes // 4, total - written), rng, clock)
+        written += path.stat().st_size - before
+        # the managed copy receives the same bytes, with rotation keeping up
+        with open(path, "rb") as src, open(store.active_path(name), "ab") as dst:
+            src.seek(before)
+            shutil.copyfileobj(src, dst, READ_BLOCK)
+        _, seconds = timed(lambda: store.rotate(name, max_bytes=segment_bytes))
+        rotate_seconds += seconds
+        if midpoint is None and written >= total // 2:
+            midpoint = clock[0].strftime("%Y-%m-%dT%H:%M:%S")
+
+    raw_bytes = sum(p.stat().st_size for p in raw.glob("*.log"))
+    segments = list((managed / "segments").rglob("*.log.gz"))
+    compressed = sum(p.stat().st_size for p in segments)
+
+    grep, grep_s = timed(lambda: grep_utilization(raw))
+    store.total()  # prime the active-file caches
+    totals, index_s = timed(store.total)
+    window, window_s = timed(lambda: store.total(since=midpoint))
+    tail, tail_s = timed(lambda: store.last_lines("tool-usage", 20))
+    _, raw_tail_s = timed(lambda: subprocess.run(["tail", "-n", "20", str(raw / "tool-usage.log")],
+                                                 check=True, capture_output=True))
+
+    expected = {k: v for k, v in grep.items() if k not in ("total lines", "validated lines")}
+    got = {**totals["skills"], **totals["agents"]}
+    if expected != got or grep["total lines"] != totals["lines"] or grep["validated lines"] != totals["validated"]:
+        print("ERROR: index counts differ from grep", file=sys.stderr)
+        return 1
+
+    print(f"raw logs:        {raw_bytes / 1024 ** 2:,.0f}MB in {len(LOGS)} files")
+    print(f"segments:        {len(segments)} files, {compressed / 1024 ** 2:,.1f}MB "
+          f"({raw_bytes / max(compressed, 1):.0f}x smaller)")
+    print(f"rotate+index:    {rotate_seconds:.1f}s total ({raw_bytes / 1024 ** 2 / rotate_seconds:.0f}MB/s, one-off)")
+    print(f"utilization:     grep {grep_s * 1000:,.0f}ms  vs  index {index_s * 1000:.1f}ms "
+          f"({grep_s / index_s:,.0f}x)")
+    print(f"window query:    {window_s * 1000:,.0f}ms (since {midpoint}, {window['lines']:,} lines)")
+    print(f"tail -n 20:      {tail_s * 1000:.1f}ms (raw tail {raw_tail_s * 1000:.1f}ms, {len(tail)} lines)")
+    if not args.dir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
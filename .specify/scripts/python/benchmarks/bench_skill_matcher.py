@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: compiled skill matcher vs rule-by-rule matching.
+
+Generates rule sets of each size (5 keywords and 2 intent patterns per
+skill) and times every prompt of a fixed mix:
+
+- per-rule: re-read the rules file, then test each keyword and intent
+  pattern one after another (what ``skill-activator.sh`` does in shell)
+- compiled: ``load_matcher`` (hash check, memoised compile) + ``match``,
+  i.e. the resident ``serve`` mode
+
+The load columns are one-off costs: building the table from scratch, and
+compiling from the on-disk table cache as a one-shot hook process does.
+
+Usage: bench_skill_matcher.py [--sizes 18,500,5000] [--prompts 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from skill_matcher import _COMPILED, load_matcher  # noqa: E402
+
+VERBS = ["create", "add", "build", "fix", "refactor", "test", "deploy", "review"]
+
+
+def make_rules(count: int) -> dict:
+    skills = {}
+    for i in range(count):
+        nouns = [f"topic{i}x{j}" for j in range(5)]
+        skills[f"skill-{i}"] = {
+            "priority": random.choice(["critical", "high", "medium", "low"]),
+            "promptTriggers": {
+                "keywords": nouns,
+                "intentPatterns": [
+                    f"({'|'.join(random.sample(VERBS, 3))}).*?{nouns[0]}",
+                    f"{nouns[1]}.*?(service|module|handler)",
+                ],
+            },
+        }
+    return {"version": "1.0", "skills": skills}
+
+
+def make_prompts(rules: int, n: int):
+    rng = random.Random(7)
+    prompts = []
+    for _ in range(n):
+        words = [rng.choice(VERBS), "the", "user", "profile", "service", "with", "tests"]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words)), f"topic{rng.randrange(rules)}x{rng.randrange(5)}")
+        prompts.append(" ".join(words * rng.randint(1, 4)))
+    return prompts
+
+
+def per_rule_match(rules_path: Path, prompt: str):
+    rules = json.loads(rules_path.read_text(encoding="utf-8"))
+    matched = []
+    for name, rule in rules["skills"].items():
+        triggers = rule.get("promptTriggers", {})
+        hit = any(re.search(rf"\b{re.escape(k)}\b", prompt, re.IGNORECASE) for k in triggers.get("keywords", []))
+        hit = hit or any(re.search(p, prompt, re.IGNORECASE) for p in triggers.get("intentPatterns", []))
+        if hit:
+            matched.append(name)
+    return matched
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered) * 1000, p99 * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="18,500,5000")
+    parser.add_argument("--prompts", type=int, default=400)
+    args = parser.parse_args()
+
+    random.seed(1)
+    print(f"{'rules':>6}  {'per-rule p50':>12}  {'per-rule p99':>12}  {'compiled p50':>12}  "
+          f"{'compiled p99':>12}  {'cold load':>10}  {'cached load':>11}   (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            rules_path = Path(tmp) / f"rules-{size}.json"
+            rules_path.write_text(json.dumps(make_rules(size)), encoding="utf-8")
+            cache_path = Path(tmp) / f"cache-{size}.json"
+            prompts = make_prompts(size, args.prompts)
+
+            _COMPILED.clear()
+            start = time.perf_counter()
+            load_matcher(rules_path, cache_path)
+            cold = (time.perf_counter() - start) * 1000
+            # What a one-shot hook process pays: table from the disk cache, then compile.
+            _COMPILED.clear()
+            start = time.perf_counter()
+            matcher = load_matcher(rules_path, cache_path)
+            warm_load = (time.perf_counter() - start) * 1000
+
+            compiled, baseline = [], []
+            for prompt in prompts:
+                start = time.perf_counter()
+                fast = {m.skill for m in load_matcher(rules_path, cache_path).match(prompt)}
+                compiled.append(time.perf_counter() - start)
+            # The per-rule loop is slow at large sizes; a sample is enough.
+            for prompt in prompts[: max(20, args.prompts // max(1, size // 100))]:
+                start = time.perf_counter()
+                slow = set(per_rule_match(rules_path, prompt))
+                baseline.append(time.perf_counter() - start)
+                fast = {m.skill for m in matcher.match(prompt)}
+                if slow != fast:
+                    print(f"MISMATCH for {prompt!r}: {sorted(slow ^ fast)}", file=sys.stderr)
+                    return 1
+
+            b50, b99 = percentiles(baseline)
+            c50, c99 = percentiles(compiled)
+            print(f"{size:>6}  {b50:>12.3f}  {b99:>12.3f}  {c50:>12.3f}  {c99:>12.3f}  {cold:>10.1f}  {warm_load:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
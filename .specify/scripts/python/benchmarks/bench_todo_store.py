@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark: todo_store.py vs whole-file ``todos.json`` merging.
+
+Fills a store with ``--todos`` TODOs spread over ``--sessions`` sessions
+(each session adds its share and advances a few existing items), then
+times one more session save plus the ``status``/``contributors``/``history``
+queries. The legacy path is timed on the exported document: load all of
+``todos.json``, merge, rewrite it and write a history snapshot.
+
+Usage: bench_todo_store.py [--todos 100000] [--sessions 10000] [--runs 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from todo_store import STATUS_PRIORITY, TodoStore, merge_status, now  # noqa: E402
+
+STATUSES = list(STATUS_PRIORITY)
+
+
+def session_items(rng: random.Random, session: int, per_session: int, created: int, touch: int):
+    items = [
+        {"content": f"Task {created + i}", "status": "pending", "activeForm": f"Working on task {created + i}"}
+        for i in range(per_session)
+    ]
+    for _ in range(touch if created else 0):
+        n = rng.randrange(created)
+        items.append({"content": f"Task {n}", "status": rng.choice(STATUSES), "activeForm": f"Working on task {n}"})
+    return items
+
+
+def legacy_save(json_path: Path, history_dir: Path, session: str, items) -> None:
+    """What the whole-file implementation does on every session end."""
+    document = json.loads(json_path.read_text(encoding="utf-8"))
+    by_content = {todo["content"]: todo for todo in document["todos"]}
+    stamp = now()
+    for item in items:
+        existing = by_content.get(item["content"])
+        if existing is None:
+            todo = dict(item, created_by=session, created_at=stamp, contributors=[session])
+            document["todos"].append(todo)
+            by_content[item["content"]] = todo
+            continue
+        status = merge_status(existing["status"], item["status"])
+        if status != existing["status"]:
+            existing.update(status=status, activeForm=item["activeForm"], updated_by=session, updated_at=stamp)
+        if session not in existing["contributors"]:
+            existing["contributors"].append(session)
+    document["sessions"].append(session)
+    document["last_session"] = session
+    document["last_updated"] = stamp
+    text = json.dumps(document, indent=2)
+    json_path.write_text(text, encoding="utf-8")
+    (history_dir / f"{session}.json").write_text(text, encoding="utf-8")
+
+
+def timed(fn, runs: int):
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--touch", type=int, default=5, help="existing items changed per session")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--legacy-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    per_session = max(1, args.todos // args.sessions)
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        store = TodoStore(tmp / "todos.db")
+        start = time.perf_counter()
+        created = 0
+        for s in range(args.sessions):
+            store.save(f"session-{s}", session_items(rng, s, per_session, created, args.touch))
+            created += per_session
+        fill = time.perf_counter() - start
+        print(f"fill: {created} TODOs over {args.sessions} sessions in {fill:.1f}s "
+              f"({fill / args.sessions * 1000:.2f} ms/save)")
+
+        def store_save(i):
+            store.save(f"bench-{i}", session_items(rng, 0, per_session, created + i * per_session, args.touch))
+
+        results = {
+            "save": timed(store_save, args.runs),
+            "status": timed(lambda i: store.status_counts(), args.runs),
+            "contributors": timed(lambda i: store.contributors(), max(1, args.runs // 4)),
+            "history": timed(lambda i: store.history(10), args.runs),
+            "export": timed(lambda i: store.export_document(), 1),
+            "export as-of": timed(lambda i: store.export_document(f"session-{args.sessions // 2}"), 1),
+        }
+
+        json_path, history_dir = tmp / "todos.json", tmp / "todo-history"
+        history_dir.mkdir()
+        json_path.write_text(json.dumps(store.export_document(), indent=2), encoding="utf-8")
+        json_size = json_path.stat().st_size
+        store.close()
+
+        def legacy(i):
+            legacy_save(json_path, history_dir, f"legacy-{i}",
+                        session_items(rng, 0, per_session, created + (args.runs + i) * per_session, args.touch))
+
+        results["legacy save"] = timed(legacy, args.legacy_runs)
+        db_size = sum(p.stat().st_size for p in tmp.glob("todos.db*"))
+
+        print(f"{'operation':<14} {'median ms':>10}")
+        for name, value in results.items():
+            print(f"{name:<14} {value:>10.2f}")
+        print(f"store on disk: {db_size / 1e6:.1f} MB (including all history deltas)")
+        print(f"legacy todos.json: {json_size / 1e6:.1f} MB per snapshot, "
+              f"~{json_size * args.sessions / 1e9:.1f} GB of history at {args.sessions} sessions")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark: single-pass workflow_state.py vs per-phase artifact probes.
+
+Builds a COMPLEX-mode project with N ``.specify/features/N/`` directories
+(spec, plan and a 42-task ``tasks.md`` each), generated skills, an
+``autonomous.log`` of ``--log-mb`` megabytes and a git reflog, then times:
+
+- probes:     the Phase Artifact Detection table as a shell script
+              (``[ -f ]`` per artifact, ``ls | wc -l`` for skills,
+              ``grep "validated"`` over the logs, ``grep -c "\\[X\\]"``
+              per feature)
+- scan-cold:  ``workflow_state.refresh`` with no scan cache
+- scan-warm:  the same with a warm cache and nothing changed
+- one-phase:  after one task is marked ``[X]`` and the log grows, i.e.
+              Phase 0 PRE-CHECK re-run after a phase
+- cli-warm:   ``workflow_state.py --json`` as a process (includes
+              interpreter startup)
+
+Every run checks that the scanner's task counts match the probes.
+
+Usage: bench_workflow_state.py [--sizes 1,20,200] [--runs 10] [--log-mb 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from workflow_state import refresh  # noqa: E402
+
+TASKS = (HERE / "fixtures" / "todo-api-tasks.md").read_text(encoding="utf-8")
+
+PROBES = r"""
+cd "$1"
+[ -d .specify ] && echo init
+for f in project-analysis requirements-analysis gap-analysis features; do
+  [ -f ".specify/$f.json" ] && echo "$f"
+done
+echo "skills $(ls -d .claude/skills/*/ 2>/dev/null | wc -l)"
+grep -q "validated" .claude/logs/* && echo validated
+[ -f .specify/constitution.md ] && echo constitution
+done_total=0
+for d in .specify/features/*/; do
+  [ -f "$d/spec.md" ] && [ -f "$d/plan.md" ] && [ -f "$d/tasks.md" ] || continue
+  done_total=$((done_total + $(grep -c "\[X\]" "$d/tasks.md")))
+done
+echo "done $done_total"
+grep -c "autonomous" .git/logs/HEAD
+"""
+
+
+def make_project(root: Path, features: int, log_mb: int) -> None:
+    specify = root / ".specify"
+    specify.mkdir()
+    (specify / "project-analysis.json").write_text(json.dumps({"skills": ["a", "b"]}), encoding="utf-8")
+    for name in ("requirements-analysis.json", "gap-analysis.json", "features.json"):
+        (specify / name).write_text("{}", encoding="utf-8")
+    (specify / "constitution.md").write_text("# Constitution\n", encoding="utf-8")
+    for i in range(1, features + 1):
+        feature = specify / "features" / f"{i:03d}"
+        feature.mkdir(parents=True)
+        (feature / "spec.md").write_text("# Spec\n", encoding="utf-8")
+        (feature / "plan.md").write_text("# Plan\n", encoding="utf-8")
+        (feature / "tasks.md").write_text(TASKS.replace("- [ ] T00", "- [X] T00"), encoding="utf-8")
+    for i in range(12):
+        (root / ".claude" / "skills" / f"skill-{i}").mkdir(parents=True)
+    line = "2026-01-01T00:00:00Z [phase 11] task T012 running tests, all components loaded\n"
+    (root / ".claude" / "logs").mkdir()
+    with open(root / ".claude" / "logs" / "autonomous.log", "w") as log:
+        log.write(line * (log_mb * 1024 * 1024 // len(line)))
+        log.write("2026-01-01T00:00:00Z skill express-patterns validated\n")
+    (root / ".git" / "logs").mkdir(parents=True)
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n", encoding="utf-8")
+    (root / ".git" / "logs" / "HEAD").write_text(
+        "0 1 bench <b@example.com> 1 +0000\tcommit: autonomous build complete\n", encoding="utf-8")
+
+
+def timed(fn, runs: int, before=None) -> float:
+    samples = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench(features: int, runs: int, log_mb: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, features, log_mb)
+        probes = lambda: subprocess.run(["bash", "-c", PROBES, "probes", str(root)],  # noqa: E731
+                                        check=False, capture_output=True, text=True).stdout
+
+        results = {"probes": timed(probes, runs)}
+        clear = lambda: shutil.rmtree(root / ".specify" / ".cache", ignore_errors=True)  # noqa: E731
+        results["scan-cold"] = timed(lambda: refresh(root), runs, before=clear)
+        refresh(root)
+        results["scan-warm"] = timed(lambda: refresh(root), runs)
+
+        tasks = sorted((root / ".specify" / "features").glob("*/tasks.md"))
+        counter = iter(range(10**6))
+
+        def one_phase() -> None:
+            path = tasks[next(counter) % len(tasks)]
+            text = path.read_text(encoding="utf-8")
+            flipped = text.replace("- [ ] ", "- [X] ", 1) if "- [ ] " in text else text.replace("- [X] ", "- [ ] ", 1)
+            path.write_text(flipped, encoding="utf-8")
+            with open(root / ".claude" / "logs" / "autonomous.log", "a") as log:
+                log.write("2026-01-01T00:00:01Z [phase 11] task marked complete\n")
+
+        results["one-phase"] = timed(lambda: refresh(root), runs, before=one_phase)
+        cli = [sys.executable, str(HERE.parent / "workflow_state.py"), "--json"]
+        results["cli-warm"] = timed(lambda: subprocess.run(cli, cwd=root, check=True, capture_output=True), runs)
+
+        # Restore the original counts and compare with the probes.
+        for path in tasks:
+            path.write_text(TASKS.replace("- [ ] T00", "- [X] T00"), encoding="utf-8")
+        state, _ = refresh(root)
+        scanned = sum(f["tasks_done"] for f in state["features"])
+        done = int(next(l for l in probes().splitlines() if l.startswith("done")).split()[1])
+        if scanned != done:
+            raise SystemExit(f"ERROR: scanner counted {scanned} done tasks, probes {done}")
+        return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,20,200")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--log-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    columns = ["probes", "scan-cold", "scan-warm", "one-phase", "cli-warm"]
+    print(f"{'features':>8}  " + "  ".join(f"{c:>10}" for c in columns) + "   (median ms)")
+    for size in (int(s) for s in args.sizes.split(",")):
+        results = bench(size, args.runs, args.log_mb)
+        print(f"{size:>8}  " + "  ".join(f"{results[c]:>10.2f}" for c in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Stress harness: N parallel allocators drawing numbers from one namespace.
+
+Each allocator process calls ``IdAllocator.reserve`` ``--ids`` times, with
+a name unique to that process and call. ``--chaos`` also starts a process
+that keeps deleting or corrupting the counter file and dropping
+hand-made entries into the directory. That forces the missing-counter
+and stale-source paths while the allocators are running.
+
+Afterwards the harness groups every entry in the directory by number and
+counts duplicates. It also checks that each process got exactly the
+numbers it reserved. ``--naive`` runs the same load with the scan-max-plus-
+one logic of the original scripts, for comparison.
+
+Usage: stress_id_allocator.py [--processes 32] [--ids 25] [--namespace adr|phr|feature] [--chaos] [--naive] [--dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from id_allocator import IdAllocator, namespace_for, scan  # noqa: E402
+
+SUFFIX = {"adr": ".md", "phr": ".green.prompt.md", "feature": ""}
+
+
+def make_namespace(root: Path, kind: str):
+    directory = root / "history" / "prompts" / "general" if kind == "phr" else None
+    return namespace_for(root, kind, directory)
+
+
+def naive_reserve(namespace, name: str) -> str:
+    # What the bash scripts do: scan for the highest number, add one, create
+    highest = max(scan(source) for source in namespace.sources)
+    ident = f"{highest + 1:0{namespace.width}d}"
+    path = namespace.directory / f"{ident}-{name}"
+    if namespace.make_dir:
+        path.mkdir(exist_ok=True)
+    else:
+        path.touch()
+    return ident
+
+
+def allocator(root: str, kind: str, index: int, ids: int, naive: bool, results) -> None:
+    namespace = make_namespace(Path(root), kind)
+    namespace.directory.mkdir(parents=True, exist_ok=True)
+    engine = IdAllocator(Path(root), namespace)
+    got, rescans = [], 0
+    for n in range(ids):
+        name = f"p{index}-n{n}{SUFFIX[kind]}"
+        if naive:
+            got.append(naive_reserve(namespace, name))
+        else:
+            result = engine.reserve(name)
+            got.append(result.id)
+            rescans += bool(result.rescanned)
+    results.put((index, got, rescans))
+
+
+def chaos(root: str, kind: str, stop, results) -> None:
+    namespace = make_namespace(Path(root), kind)
+    counter = IdAllocator(Path(root), namespace).counter_path
+    actions = manual = 0
+    while not stop.is_set():
+        actions += 1
+        if actions % 3 == 0:
+            try:
+                counter.unlink()
+            except FileNotFoundError:
+                pass
+        elif actions % 3 == 1:
+            try:
+                with open(counter, "r+b") as handle:
+                    handle.write(b"{torn")
+            except FileNotFoundError:
+                pass
+        else:
+            # Added by hand, outside the allocator, above the live range (and
+            # small enough to stay within the 4-digit PHR/ADR pattern)
+            manual += 1
+            number = max(scan(source) for source in namespace.sources) + 40
+            path = namespace.directory / f"{number:0{namespace.width}d}-manual-{manual}{SUFFIX[kind]}"
+            if namespace.make_dir:
+                path.mkdir(exist_ok=True)
+            else:
+                path.touch()
+        time.sleep(0.005)
+    results.put((actions, manual))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=32)
+    parser.add_argument("--ids", type=int, default=25)
+    parser.add_argument("--namespace", choices=("adr", "phr", "feature"), default="adr")
+    parser.add_argument("--chaos", action="store_true", help="delete/corrupt the counter and add entries by hand")
+    parser.add_argument("--naive", action="store_true", help="scan-max-plus-one, no allocator (baseline)")
+    parser.add_argument("--dir", default=None, help="working directory (default: a temp dir)")
+    args = parser.parse_args()
+
+    root = Path(args.dir) if args.dir else Path(tempfile.mkdtemp())
+    shutil.rmtree(root / "history", ignore_errors=True)
+    shutil.rmtree(root / "specs", ignore_errors=True)
+    shutil.rmtree(root / ".specify", ignore_errors=True)
+    namespace = make_namespace(root, args.namespace)
+    namespace.directory.mkdir(parents=True, exist_ok=True)
+
+    results, chaos_results, stop = mp.Queue(), mp.Queue(), mp.Event()
+    workers = [
+        mp.Process(target=allocator, args=(str(root), args.namespace, i, args.ids, args.naive, results))
+        for i in range(args.processes)
+    ]
+    monkey = mp.Process(target=chaos, args=(str(root), args.namespace, stop, chaos_results)) if args.chaos else None
+    if monkey:
+        monkey.start()
+    start = time.perf_counter()
+    for proc in workers:
+        proc.start()
+    returned = {}
+    rescans = 0
+    for _ in workers:
+        index, got, n = results.get()
+        returned[index] = got
+        rescans += n
+    for proc in workers:
+        proc.join()
+    elapsed = time.perf_counter() - start
+    actions = manual = 0
+    if monkey:
+        stop.set()
+        actions, manual = chaos_results.get()
+        monkey.join()
+
+    entries = [name for name in os.listdir(namespace.directory) if name[:namespace.width].isdigit()]
+    by_number = Counter(name.split("-", 1)[0] for name in entries)
+    duplicates = sum(count - 1 for count in by_number.values() if count > 1)
+    mismatched = sum(
+        not (namespace.directory / f"{ident}-p{index}-n{n}{SUFFIX[args.namespace]}").exists()
+        for index, got in returned.items() for n, ident in enumerate(got)
+    )
+    total = args.processes * args.ids
+    all_returned = Counter(ident for got in returned.values() for ident in got)
+    returned_twice = sum(count - 1 for count in all_returned.values() if count > 1)
+
+    mode = "naive scan-max-plus-one" if args.naive else "allocator (flock counter + O_EXCL claim)"
+    print(f"mode:               {mode}, namespace {namespace.key}")
+    print(f"processes x ids:    {args.processes} x {args.ids} = {total} reservations in {elapsed:.2f}s "
+          f"({total / elapsed:.0f}/s)")
+    if not args.naive:
+        print(f"rescans:            {rescans} of {total} reservations")
+    if monkey:
+        print(f"chaos:              {actions} actions ({manual} entries added by hand)")
+    print(f"numbers handed out twice: {returned_twice}")
+    print(f"duplicate entries:  {duplicates} (entries sharing a number)")
+    print(f"missing entries:    {mismatched}")
+    if not args.dir:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0 if args.naive or (duplicates == 0 and returned_twice == 0 and mismatched == 0) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
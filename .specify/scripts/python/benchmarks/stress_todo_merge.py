@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Stress harness: N parallel writers committing to one todos.json.
+
+Each writer process commits ``--saves`` times. Every commit adds one TODO
+unique to that writer and save, and advances the status of a TODO shared by
+all writers. Reader processes poll the file the whole time and count
+any read that fails to parse (a torn write).
+
+Afterwards the harness counts lost updates (unique TODOs missing from the
+final document) and checks that the version stamp equals the number of
+commits. ``--naive`` runs the same load with a plain read-merge-write and
+no concurrency control, for comparison.
+
+Usage: stress_todo_merge.py [--writers 8] [--saves 50] [--readers 2] [--naive] [--dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from todo_merge import TodoMergeEngine, merge_documents, read_document  # noqa: E402
+
+STATUSES = ("pending", "in_progress", "completed")
+
+
+def local_document(writer: int, save: int) -> dict:
+    session = f"writer-{writer}"
+    stamp = f"{time.time():.6f}"
+    todo = {"created_by": session, "created_at": stamp, "contributors": [session]}
+    return {
+        "last_updated": stamp,
+        "last_session": session,
+        "sessions": [session],
+        "project": "stress",
+        "collaboration": {"last_contributor": session},
+        "todos": [
+            dict(todo, content=f"w{writer}-s{save}", status="pending", activeForm=f"Writer {writer} save {save}"),
+            dict(todo, content="shared", status=STATUSES[min(save, 2)], activeForm=f"Shared by {writer}"),
+        ],
+    }
+
+
+def naive_commit(path: Path, local: dict) -> None:
+    try:
+        current, version = read_document(path)
+    except ValueError:
+        current, version = {"todos": [], "sessions": []}, 0
+    merged = merge_documents(current, local)
+    merged["version"] = version + 1
+    path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+
+
+def writer(path: str, index: int, saves: int, naive: bool, results) -> None:
+    engine = TodoMergeEngine(Path(path))
+    attempts = locked = 0
+    for save in range(saves):
+        if naive:
+            naive_commit(Path(path), local_document(index, save))
+            attempts += 1
+        else:
+            result = engine.commit(local_document(index, save))
+            attempts += result.attempts
+            locked += result.used_lock
+    results.put((attempts, locked))
+
+
+def reader(path: str, stop, results) -> None:
+    reads = torn = 0
+    while not stop.is_set():
+        try:
+            read_document(Path(path))
+        except ValueError:
+            torn += 1
+        reads += 1
+    results.put((reads, torn))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--saves", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--naive", action="store_true", help="no concurrency control (baseline)")
+    parser.add_argument("--dir", default=None, help="working directory (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = Path(args.dir) if args.dir else Path(tempfile.mkdtemp())
+    workdir.mkdir(parents=True, exist_ok=True)
+    path = workdir / "todos.json"
+    for stale in (path, workdir / ".todos-claims"):
+        if stale.is_dir():
+            shutil.rmtree(stale)
+        elif stale.exists():
+            stale.unlink()
+
+    writer_results, reader_results, stop = mp.Queue(), mp.Queue(), mp.Event()
+    readers = [mp.Process(target=reader, args=(str(path), stop, reader_results)) for _ in range(args.readers)]
+    writers = [
+        mp.Process(target=writer, args=(str(path), i, args.saves, args.naive, writer_results))
+        for i in range(args.writers)
+    ]
+    for proc in readers:
+        proc.start()
+    start = time.perf_counter()
+    for proc in writers:
+        proc.start()
+    for proc in writers:
+        proc.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for proc in readers:
+        proc.join()
+
+    attempts = locked = reads = torn = 0
+    for _ in writers:
+        a, l = writer_results.get()
+        attempts, locked = attempts + a, locked + l
+    for _ in readers:
+        r, t = reader_results.get()
+        reads, torn = reads + r, torn + t
+
+    document, version = read_document(path)
+    present = {todo["content"] for todo in document["todos"]}
+    expected = {f"w{w}-s{s}" for w in range(args.writers) for s in range(args.saves)}
+    lost = len(expected - present)
+    commits = args.writers * args.saves
+
+    mode = "naive read-merge-write" if args.naive else "optimistic (version stamp + claim + os.replace)"
+    print(f"mode:             {mode}")
+    print(f"writers x saves:  {args.writers} x {args.saves} = {commits} commits in {elapsed:.2f}s "
+          f"({commits / elapsed:.0f} commits/s)")
+    print(f"attempts:         {attempts} ({attempts - commits} retries, {locked} via lock fallback)")
+    print(f"final version:    {version} (expected {commits})")
+    print(f"lost updates:     {lost} of {len(expected)}")
+    print(f"reader polls:     {reads} ({torn} torn reads)")
+    if not args.dir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if args.naive or (lost == 0 and version == commits) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Common helpers shared by the Python workflow scripts.
+
+Python counterpart of ``scripts/bash/common.sh``. Everything here is
+stdlib-only so the scripts run on any ``python3`` without installing
+anything.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# .specify/scripts/python -> repository root (same fallback as common.sh)
+FALLBACK_ROOT = SCRIPT_DIR.parents[2]
+
+# Phase -> analysis document written to .specify/ by phases 2-4
+ANALYSIS_FILES = {"2": "project-analysis.json", "3": "requirements-analysis.json", "4": "gap-analysis.json"}
+# Summary rows of a validation report: | Grade | B |, | Score | 85/100 |, | Status | APPROVED |
+REPORT_FIELD_RE = re.compile(r"^\|\s*(Grade|Status|Score)\s*\|\s*([^|]+?)\s*\|", re.MULTILINE)
+
+
+def find_git(start: Optional[Path] = None) -> Optional[Tuple[Path, Path]]:
+    """Locate the enclosing git work tree without running ``git``.
+
+    Returns ``(toplevel, git_dir)`` or ``None`` when ``start`` is not inside
+    a repository. Handles linked worktrees, where ``.git`` is a file
+    containing ``gitdir: <path>``.
+    """
+    current = Path(start or os.getcwd()).resolve()
+    for candidate in (current, *current.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            try:
+                line = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                git_dir = Path(line[len("gitdir:"):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (candidate / git_dir).resolve()
+                return candidate, git_dir
+    return None
+
+
+def get_repo_root(start: Optional[Path] = None) -> Path:
+    """Repository root, falling back to the script location for non-git repos."""
+    found = find_git(start)
+    return found[0] if found else FALLBACK_ROOT
+
+
+def specify_dir(repo_root: Path) -> Path:
+    return repo_root / ".specify"
+
+
+def cache_dir(repo_root: Path) -> Path:
+    """Directory for rebuildable caches; safe to delete at any time."""
+    return specify_dir(repo_root) / ".cache"
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: os.umask can only be queried by setting it, which
+# races with other threads creating files
+UMASK = _read_umask()
+
+
+def file_mode(path: Path) -> int:
+    """Permission bits to give a rewrite of ``path``.
+
+    The existing file's mode, or what ``open()`` would create under the
+    current umask for a new one.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write ``text`` to ``path`` via a temp file and ``os.replace``.
+
+    Readers either see the old file or the new one, never a partial write.
+    The file keeps its permissions (``mkstemp`` would otherwise leave 0600).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = file_mode(path)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 2) -> None:
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False) + "\n")
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Load JSON from ``path``; ``default`` if missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return default
+
+
+def stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    """``(mtime_ns, size)`` for cache keys, or ``None`` if ``path`` is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
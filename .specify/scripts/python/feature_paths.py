@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Resident feature-path resolver.
+
+Drop-in replacement for ``get_feature_paths`` in ``scripts/bash/common.sh``.
+The bash version forks ``git rev-parse`` several times and globs ``specs/``
+on every call; this resolver reads ``.git/HEAD`` directly and keeps two
+small caches under ``.specify/.cache/``:
+
+- ``feature-index.json``: numeric prefix -> spec directory names, rebuilt
+  only when the mtime of ``specs/`` changes.
+- ``feature-paths.json``: the last resolved result, keyed by the mtimes of
+  ``.git/HEAD``, ``.git/refs/heads`` and ``specs/`` plus ``SPECIFY_FEATURE``.
+- ``feature-paths.env``: the same result in ``get_feature_paths`` format.
+  ``common.sh`` replays it while it is newer than those three paths, using
+  only bash builtins, so warm shell calls fork nothing either.
+
+A warm lookup is a handful of ``stat`` calls and one small JSON read, with
+no subprocesses. Within a single process results are memoised as well.
+
+Usage: feature_paths.py [--json] [--no-cache]
+
+OUTPUTS:
+  Shell mode (default): REPO_ROOT='...' lines, for ``eval $(...)``
+  JSON mode: {"REPO_ROOT": "...", "CURRENT_BRANCH": "...", ...}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (  # noqa: E402
+    FALLBACK_ROOT,
+    atomic_write_json,
+    atomic_write_text,
+    cache_dir,
+    find_git,
+    read_json,
+    specify_dir,
+)
+
+CACHE_VERSION = 1
+INDEX_FILE = "feature-index.json"
+PATHS_FILE = "feature-paths.json"
+ENV_FILE = "feature-paths.env"
+
+FEATURE_RE = re.compile(r"^([0-9]{3})-")
+
+
+@dataclass(frozen=True)
+class FeaturePaths:
+    """Resolved paths, named exactly like the ``get_feature_paths`` variables."""
+
+    REPO_ROOT: str
+    CURRENT_BRANCH: str
+    HAS_GIT: str
+    FEATURE_DIR: str
+    FEATURE_SPEC: str
+    IMPL_PLAN: str
+    TASKS: str
+    RESEARCH: str
+    DATA_MODEL: str
+    QUICKSTART: str
+    CONTRACTS_DIR: str
+
+    @classmethod
+    def build(cls, repo_root: str, branch: str, has_git: bool, feature_dir: str) -> "FeaturePaths":
+        return cls(
+            REPO_ROOT=repo_root,
+            CURRENT_BRANCH=branch,
+            HAS_GIT="true" if has_git else "false",
+            FEATURE_DIR=feature_dir,
+            FEATURE_SPEC=f"{feature_dir}/spec.md",
+            IMPL_PLAN=f"{feature_dir}/plan.md",
+            TASKS=f"{feature_dir}/tasks.md",
+            RESEARCH=f"{feature_dir}/research.md",
+            DATA_MODEL=f"{feature_dir}/data-model.md",
+            QUICKSTART=f"{feature_dir}/quickstart.md",
+            CONTRACTS_DIR=f"{feature_dir}/contracts",
+        )
+
+    def to_shell(self) -> str:
+        return "\n".join(f"{key}='{value}'" for key, value in asdict(self).items())
+
+    def to_env_cache(self, env_feature: str) -> str:
+        """Cache file read by ``read_cached_feature_paths`` in common.sh."""
+        return f"# SPECIFY_FEATURE={env_feature}\n{self.to_shell()}\n"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+@dataclass
+class FeatureIndex:
+    """Spec directories grouped by their three-digit prefix."""
+
+    specs_mtime_ns: Optional[int]
+    prefixes: Dict[str, List[str]]
+    latest: str
+
+    @classmethod
+    def scan(cls, specs_dir: Path, specs_mtime_ns: Optional[int]) -> "FeatureIndex":
+        prefixes: Dict[str, List[str]] = {}
+        latest, highest = "", 0
+        if specs_mtime_ns is not None:
+            with os.scandir(specs_dir) as entries:
+                names = sorted(entry.name for entry in entries if entry.is_dir())
+            # Sorted like the bash glob, so ties resolve to the same directory.
+            for name in names:
+                match = FEATURE_RE.match(name)
+                if not match:
+                    continue
+                prefixes.setdefault(match.group(1), []).append(name)
+                number = int(match.group(1), 10)
+                if number > highest:
+                    highest, latest = number, name
+        return cls(specs_mtime_ns, prefixes, latest)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["FeatureIndex"]:
+        data = read_json(path)
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return None
+        return cls(data.get("specs_mtime_ns"), data.get("prefixes", {}), data.get("latest", ""))
+
+    def save(self, path: Path) -> None:
+        atomic_write_json(path, {"version": CACHE_VERSION, **asdict(self)}, indent=None)
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _branch_exists(git_dir: Path, branch: str) -> bool:
+    """True once ``branch`` has a commit (loose or packed ref)."""
+    if (git_dir / "refs" / "heads" / branch).is_file():
+        return True
+    suffix = f" refs/heads/{branch}"
+    try:
+        with open(git_dir / "packed-refs", "r", encoding="utf-8") as handle:
+            return any(line.rstrip("\n").endswith(suffix) for line in handle)
+    except OSError:
+        return False
+
+
+def read_head_branch(git_dir: Path) -> Optional[str]:
+    """Equivalent of ``git rev-parse --abbrev-ref HEAD`` from ``.git/HEAD``.
+
+    Returns ``"HEAD"`` when detached and ``None`` on an unborn branch, where
+    git itself fails and the bash script falls back to the specs scan.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return "HEAD"
+    ref = head[len("ref:"):].strip()
+    branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    # Worktrees keep their refs in the common dir.
+    common = git_dir
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        common = (git_dir / commondir.read_text(encoding="utf-8").strip()).resolve()
+    return branch if _branch_exists(common, branch) else None
+
+
+def resolve_feature_dir(index: FeatureIndex, specs_dir: str, branch: str) -> Tuple[str, str]:
+    """Prefix lookup mirroring ``find_feature_dir_by_prefix``.
+
+    Returns ``(feature_dir, warning)``; ``warning`` is empty unless several
+    spec directories share the branch prefix.
+    """
+    match = FEATURE_RE.match(branch)
+    if not match:
+        return f"{specs_dir}/{branch}", ""
+    prefix = match.group(1)
+    matches = index.prefixes.get(prefix, [])
+    if len(matches) == 1:
+        return f"{specs_dir}/{matches[0]}", ""
+    if matches:
+        warning = (
+            f"ERROR: Multiple spec directories found with prefix '{prefix}': {' '.join(matches)}\n"
+            "Please ensure only one spec directory exists per numeric prefix."
+        )
+        return f"{specs_dir}/{branch}", warning
+    return f"{specs_dir}/{branch}", ""
+
+
+class FeaturePathResolver:
+    """Resolves feature paths for one working directory, caching aggressively."""
+
+    def __init__(self, cwd: Optional[Path] = None, use_cache: bool = True):
+        found = find_git(cwd)
+        if found:
+            self.repo_root, self.git_dir = found
+        else:
+            self.repo_root, self.git_dir = FALLBACK_ROOT, None
+        self.specs_dir = self.repo_root / "specs"
+        self.use_cache = use_cache
+        self._cache_dir = cache_dir(self.repo_root)
+        self._memo: Optional[Tuple[tuple, FeaturePaths, str]] = None
+
+    def _key(self, env_feature: str) -> tuple:
+        head = refs = None
+        if self.git_dir is not None:
+            head = _mtime_ns(self.git_dir / "HEAD")
+            refs = _mtime_ns(self.git_dir / "refs" / "heads")
+        return (str(self.repo_root), env_feature, head, refs, _mtime_ns(self.specs_dir))
+
+    def _index(self, specs_mtime_ns: Optional[int]) -> FeatureIndex:
+        index_path = self._cache_dir / INDEX_FILE
+        if self.use_cache:
+            cached = FeatureIndex.load(index_path)
+            if cached is not None and cached.specs_mtime_ns == specs_mtime_ns:
+                return cached
+        index = FeatureIndex.scan(self.specs_dir, specs_mtime_ns)
+        if self.use_cache:
+            self._try_save(lambda: index.save(index_path))
+        return index
+
+    def _try_save(self, save) -> None:
+        # Caches are an optimisation; a read-only checkout must still work.
+        # Like common.sh, only cache inside initialised projects.
+        if not specify_dir(self.repo_root).is_dir():
+            return
+        try:
+            save()
+        except OSError:
+            pass
+
+    def _compute(self, env_feature: str, specs_mtime_ns: Optional[int]) -> Tuple[FeaturePaths, str]:
+        has_git = self.git_dir is not None
+        index: Optional[FeatureIndex] = None
+
+        branch = env_feature
+        if not branch and has_git:
+            branch = read_head_branch(self.git_dir) or ""
+        if not branch:
+            index = self._index(specs_mtime_ns)
+            branch = index.latest or "main"
+
+        specs = str(self.specs_dir)
+        if FEATURE_RE.match(branch):
+            index = index or self._index(specs_mtime_ns)
+            feature_dir, warning = resolve_feature_dir(index, specs, branch)
+        else:
+            feature_dir, warning = f"{specs}/{branch}", ""
+        return FeaturePaths.build(str(self.repo_root), branch, has_git, feature_dir), warning
+
+    def resolve(self) -> Tuple[FeaturePaths, str]:
+        """Return ``(paths, warning)`` for the current state of the repo."""
+        env_feature = os.environ.get("SPECIFY_FEATURE", "")
+        key = self._key(env_feature)
+        if self._memo is not None and self._memo[0] == key:
+            return self._memo[1], self._memo[2]
+
+        paths_file = self._cache_dir / PATHS_FILE
+        if self.use_cache:
+            data = read_json(paths_file)
+            if (
+                isinstance(data, dict)
+                and data.get("version") == CACHE_VERSION
+                and tuple(data.get("key", ())) == key
+            ):
+                paths, warning = FeaturePaths(**data["paths"]), data.get("warning", "")
+                self._memo = (key, paths, warning)
+                return paths, warning
+
+        paths, warning = self._compute(env_feature, key[-1])
+        if self.use_cache:
+            payload = {"version": CACHE_VERSION, "key": list(key), "paths": asdict(paths), "warning": warning}
+            self._try_save(lambda: atomic_write_json(paths_file, payload, indent=None))
+            if not warning:
+                env_file = self._cache_dir / ENV_FILE
+                self._try_save(lambda: atomic_write_text(env_file, paths.to_env_cache(env_feature)))
+        self._memo = (key, paths, warning)
+        return paths, warning
+
+
+def get_feature_paths(cwd: Optional[Path] = None, use_cache: bool = True) -> FeaturePaths:
+    """Convenience wrapper; warnings are written to stderr like the bash version."""
+    paths, warning = FeaturePathResolver(cwd, use_cache).resolve()
+    if warning:
+        print(warning, file=sys.stderr)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resolve Spec-Driven Development feature paths.")
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write caches")
+    args = parser.parse_args(argv)
+
+    paths = get_feature_paths(use_cache=not args.no_cache)
+    print(paths.to_json() if args.json else paths.to_shell())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
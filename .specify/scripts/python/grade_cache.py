@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""Content-addressed cache for Quality Gate Teacher grades.
+
+The Quality Gate Teacher grades every phase, and component-quality-validator
+grades every generated skill, agent and hook. Self-heal retries
+(``MAX_SELF_HEAL_RETRIES``) and Phase 0 resumes grade them all again, even
+when nothing changed. This cache sits in front of those evaluations:
+
+- **Key.** A grade is stored under the SHA-256 of everything that can
+  change it:
+  - the subject (``phase-9@specs/001-auth``, ``component:.claude/skills/x``)
+  - the content hash of every artifact file
+  - the upstream inputs that exist before the phase runs: the constitution
+    for SPEC, then spec, plan and tasks as each is produced
+  - the grading rules: the workflow-validator and component-quality-validator
+    ``SKILL.md`` files, plus ``--rules-version``
+
+  File hashes are memoised by ``(mtime_ns, size)`` in
+  ``.specify/.cache/grade-hashes.json``, so a lookup only re-reads files
+  that changed.
+- **Hit.** ``lookup`` returns the stored grade, score and APPROVED/REJECTED
+  status. It writes the stored ``phase-N-report.md`` back into
+  ``.specify/validations/``, and nothing is re-evaluated.
+- **Invalidation.** When an artifact or upstream input changes, the key
+  changes and the old grade is no longer found. ``invalidate PATH`` also
+  drops every entry that was graded against ``PATH``.
+- **Eviction.** Entries are kept in
+  ``.specify/validations/grade-cache/`` and evicted least recently used
+  first, once the cache exceeds ``--max-mb`` or ``--max-entries``.
+- **Counters.** Hits, misses, stores, evictions and invalidations are kept
+  in the index (``stats``).
+
+Usage:
+  grade_cache.py lookup --phase 9 [--feature-dir specs/001-auth]   # exit 0 hit, 1 miss
+  grade_cache.py store --phase 9 [--feature-dir specs/001-auth]    # after grading
+  grade_cache.py lookup --component .claude/skills/express-patterns
+  grade_cache.py invalidate specs/001-auth/spec.md
+  grade_cache.py stats [--json]
+  grade_cache.py [--max-mb 16] [--max-entries 2000] prune
+
+``--artifact``/``--input`` replace the per-phase defaults. Phases without
+a single artifact file (5, 6, 11-13) need ``--artifact`` (e.g. ``src``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (  # noqa: E402
+    ANALYSIS_FILES,
+    REPORT_FIELD_RE,
+    atomic_write_json,
+    atomic_write_text,
+    cache_dir,
+    get_repo_root,
+    read_json,
+    specify_dir,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are not serialised
+    fcntl = None
+
+CACHE_VERSION = 1
+CACHE_DIR = "grade-cache"
+INDEX_FILE = "index.json"
+HASHES_FILE = "grade-hashes.json"
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2000
+HASH_BLOCK = 1024 * 1024
+
+# Grading rules: editing either skill regrades everything
+RULES_FILES = (
+    ".claude/skills/workflow-validator/SKILL.md",
+    ".claude/skills/component-quality-validator/SKILL.md",
+)
+CONSTITUTIONS = (".specify/memory/constitution.md", ".specify/constitution.md")
+# Phase -> artifact files it produces (relative to the repo root or, for
+# {feature}, the feature directory)
+PHASE_ARTIFACTS = {
+    **{phase: [f".specify/{name}"] for phase, name in ANALYSIS_FILES.items()},
+    "7": ["{constitution}"],
+    "7.5": [".specify/features.json"],
+    "8": ["{feature}/spec.md"],
+    "9": ["{feature}/plan.md"],
+    "10": ["{feature}/tasks.md"],
+}
+# Phase -> upstream inputs it is graded against; only files that an earlier
+# phase produced, so a phase's grade survives the phases after it
+IMPLEMENTATION_INPUTS = ["{feature}/spec.md", "{feature}/plan.md", "{feature}/tasks.md"]
+PHASE_INPUTS = {
+    "8": ["{constitution}"],
+    "9": ["{constitution}", "{feature}/spec.md"],
+    "10": ["{feature}/spec.md", "{feature}/plan.md"],
+    **{phase: IMPLEMENTATION_INPUTS for phase in ("11", "11.5", "11.6", "12", "13")},
+}
+# Never part of an artifact's content
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".cache", CACHE_DIR, ".venv", "venv", "dist", "build"}
+
+
+@dataclass
+class Lookup:
+    key: str
+    subject: str
+    hit: bool
+    grade: str = ""
+    score: Optional[int] = None
+    status: str = ""
+    report: Optional[str] = None  # report path written on a hit
+    depends: Dict[str, str] = field(default_factory=dict)  # path -> hash of artifacts and inputs
+
+
+def _parse_score(value: str) -> Optional[int]:
+    digits = value.split("/")[0].strip().rstrip("%")
+    return int(digits) if digits.isdigit() else None
+
+
+def parse_report(text: str) -> Dict[str, Any]:
+    """Grade, score and status from a ``phase-N-report.md`` summary table."""
+    fields = {key.lower(): value for key, value in REPORT_FIELD_RE.findall(text)}
+    return {
+        "grade": fields.get("grade", ""),
+        "score": _parse_score(fields.get("score", "")),
+        "status": fields.get("status", ""),
+    }
+
+
+class ContentHasher:
+    """SHA-256 of files and directory trees, memoised by ``(mtime_ns, size)``."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.path = cache_dir(repo_root) / HASHES_FILE
+        cached = read_json(self.path, {})
+        valid = isinstance(cached, dict) and cached.get("version") == CACHE_VERSION
+        self.files: Dict[str, list] = cached.get("files", {}) if valid else {}
+        self.read = 0
+        self._dirty = False
+
+    def rel(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.repo_root).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def file_hash(self, path: Path, rel: str) -> str:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return "missing"
+        cached = self.files.get(rel)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(HASH_BLOCK), b""):
+                digest.update(block)
+        self.read += 1
+        self.files[rel] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+        self._dirty = True
+        return digest.hexdigest()
+
+    def hash(self, path: Path) -> str:
+        """Hash of a file, or of every file under a directory (names included)."""
+        rel = self.rel(path)
+        if not path.is_dir():
+            return self.file_hash(path, rel)
+        digest = hashlib.sha256()
+        prefix = len(os.path.join(str(path), ""))
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                child = f"{rel}/{full[prefix:]}"
+                digest.update(f"{child}\0{self.file_hash(Path(full), child)}\n".encode("utf-8"))
+        return "tree:" + digest.hexdigest()
+
+    def save(self) -> None:
+        if self._dirty:
+            atomic_write_json(self.path, {"version": CACHE_VERSION, "files": self.files}, indent=None)
+            self._dirty = False
+
+
+def _overlaps(dependency: str, target: str) -> bool:
+    # Same path, or one is a directory containing the other
+    return dependency == target or dependency.startswith(target + "/") or target.startswith(dependency + "/")
+
+
+def constitution_path(repo_root: Path) -> Path:
+    for rel in CONSTITUTIONS:
+        if (repo_root / rel).is_file():
+            return repo_root / rel
+    return repo_root / CONSTITUTIONS[0]
+
+
+def phase_defaults(repo_root: Path, phase: str, feature_dir: Optional[Path]) -> Tuple[List[Path], List[Path]]:
+    """Default ``(artifacts, inputs)`` for a phase; artifacts may be empty."""
+    feature = feature_dir or specify_dir(repo_root)
+    constitution = constitution_path(repo_root)
+
+    def expand(template: str) -> Path:
+        if template == "{constitution}":
+            return constitution
+        if template.startswith("{feature}/"):
+            return feature / template[len("{feature}/"):]
+        return repo_root / template
+
+    artifacts = [expand(t) for t in PHASE_ARTIFACTS.get(phase, [])]
+    inputs = [expand(t) for t in PHASE_INPUTS.get(phase, [])]
+    return artifacts, [p for p in inputs if p not in artifacts]
+
+
+class GradeCache:
+    """Index plus stored reports under ``.specify/validations/grade-cache/``."""
+
+    def __init__(self, repo_root: Path, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.repo_root = repo_root
+        self.dir = specify_dir(repo_root) / "validations" / CACHE_DIR
+        self.index_path = self.dir / INDEX_FILE
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hasher = ContentHasher(repo_root)
+
+    # -- keys -----------------------------------------------------------------
+
+    def key(self, subject: str, artifacts: Iterable[Path], inputs: Iterable[Path] = (),
+            rules: Optional[Iterable[Path]] = None, rules_version: str = "") -> Tuple[str, Dict[str, str]]:
+        """Cache key, plus the hashes of the upstream paths it depends on."""
+        if rules is None:
+            rules = [self.repo_root / rel for rel in RULES_FILES]
+        hashed = {
+            kind: {self.hasher.rel(p): self.hasher.hash(p) for p in paths}
+            for kind, paths in (("artifacts", artifacts), ("inputs", inputs), ("rules", rules))
+        }
+        self.hasher.save()
+        material = json.dumps({"version": CACHE_VERSION, "subject": subject, "rules_version": rules_version,
+                               **hashed}, sort_keys=True)
+        depends = {**hashed["artifacts"], **hashed["inputs"]}
+        return hashlib.sha256(material.encode("utf-8")).hexdigest(), depends
+
+    # -- operations -----------------------------------------------------------
+
+    def lookup(self, key: str, subject: str, report_path: Optional[Path] = None) -> Lookup:
+        """Stored grade for ``key``; on a hit, restore its report to ``report_path``."""
+        with self._index() as index:
+            entry = index["entries"].get(key)
+            stored = self._report_file(key)
+            if entry is None or not stored.is_file():
+                index["entries"].pop(key, None)
+                index["stats"]["misses"] += 1
+                return Lookup(key, subject, hit=False)
+            index["stats"]["hits"] += 1
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+        restored = None
+        if report_path is not None:
+            text = stored.read_text(encoding="utf-8")
+            try:
+                current = report_path.read_text(encoding="utf-8")
+            except OSError:
+                current = None
+            if current != text:
+                atomic_write_text(report_path, text)
+            restored = str(report_path)
+        return Lookup(key, subject, True, entry["grade"], entry["score"], entry["status"], restored,
+                      entry.get("depends", {}))
+
+    def store(self, key: str, subject: str, report_text: str, depends: Dict[str, str]) -> Lookup:
+        """Record a fresh grading; evicts least recently used entries over the caps."""
+        summary = parse_report(report_text)
+        if not summary["status"]:
+            raise ValueError("report has no '| Status |' row in its summary table")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self._report_file(key), report_text)
+        now = time.time()
+        with self._index() as index:
+            index["entries"][key] = {
+                "subject": subject, **summary, "size": len(report_text.encode("utf-8")),
+                "created": now, "last_used": now, "hits": 0, "depends": depends,
+            }
+            index["stats"]["stores"] += 1
+            self._evict(index)
+        return Lookup(key, subject, False, summary["grade"], summary["score"], summary["status"], None, depends)
+
+    def invalidate(self, paths: Iterable[Path]) -> int:
+        """Drop every entry graded against one of ``paths`` (files or directories)."""
+        targets = [self.hasher.rel(p) for p in paths]
+        with self._index() as index:
+            doomed = [key for key, entry in index["entries"].items()
+                      if any(_overlaps(dep, t) for dep in entry.get("depends", {}) for t in targets)]
+            for key in doomed:
+                self._drop(index, key)
+            index["stats"]["invalidated"] += len(doomed)
+        return len(doomed)
+
+    def prune(self) -> int:
+        with self._index() as index:
+            before = index["stats"]["evictions"]
+            self._evict(index)
+            return index["stats"]["evictions"] - before
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._load()
+        entries = index["entries"]
+        lookups = index["stats"]["hits"] + index["stats"]["misses"]
+        return {
+            **index["stats"],
+            "hit_rate": round(index["stats"]["hits"] / lookups, 3) if lookups else None,
+            "entries": len(entries),
+            "bytes": sum(entry.get("size", 0) for entry in entries.values()),
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+        }
+
+    # -- storage --------------------------------------------------------------
+
+    def _report_file(self, key: str) -> Path:
+        return self.dir / "reports" / f"{key}.md"
+
+    def _evict(self, index: Dict[str, Any]) -> None:
+        entries = index["entries"]
+        total = sum(entry.get("size", 0) for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k].get("last_used", 0)):
+            if total <= self.max_bytes and len(entries) <= self.max_entries:
+                break
+            total -= entries[key].get("size", 0)
+            self._drop(index, key)
+            index["stats"]["evictions"] += 1
+
+    def _drop(self, index: Dict[str, Any], key: str) -> None:
+        index["entries"].pop(key, None)
+        try:
+            self._report_file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load(self) -> Dict[str, Any]:
+        index = read_json(self.index_path, {})
+        if not isinstance(index, dict) or index.get("version") != CACHE_VERSION:
+            index = {}
+        stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidated": 0}
+        stats.update(index.get("stats", {}))
+        return {"version": CACHE_VERSION, "entries": index.get("entries", {}), "stats": stats}
+
+    @contextmanager
+    def _index(self) -> Iterator[Dict[str, Any]]:
+        """Locked read-modify-write of ``index.json``."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                index = self._load()
+                yield index
+                atomic_write_json(self.index_path, index, indent=None)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _subject(args: argparse.Namespace, repo_root: Path, hasher: ContentHasher) -> Tuple[str, List[Path], List[Path]]:
+    paths = lambda values: [Path(v).resolve() for v in values or []]  # noqa: E731
+    if args.component:
+        component = Path(args.component).resolve()
+        subject = f"component:{hasher.rel(component)}"
+        artifacts, inputs = [component], []
+    else:
+        feature = Path(args.feature_dir).resolve() if args.feature_dir else None
+        subject = f"phase-{args.phase}" + (f"@{hasher.rel(feature)}" if feature else "")
+        artifacts, inputs = phase_defaults(repo_root, args.phase, feature)
+    if args.artifact:
+        artifacts = paths(args.artifact)
+    if args.input is not None:
+        inputs = paths(args.input)
+    if not artifacts:
+        raise ValueError(f"phase {args.phase} has no default artifact; pass --artifact (e.g. src)")
+    return subject, artifacts, inputs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cache Quality Gate Teacher grades by content hash")
+    parser.add_argument("--repo-root", default=None)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024)
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("lookup", "Return a cached grade (exit 0) or report a miss (exit 1)"),
+                       ("store", "Cache the grade in a freshly written report")):
+        cmd = sub.add_parser(name, help=text)
+        target = cmd.add_mutually_exclusive_group(required=True)
+        target.add_argument("--phase", help="Phase id, e.g. 9 or 11.5")
+        target.add_argument("--component", help="Generated skill/agent/hook path (Phase 6.5)")
+        cmd.add_argument("--feature-dir", default=None, help="Feature directory for phases 8-13 (COMPLEX mode)")
+        cmd.add_argument("--artifact", action="append", help="Graded file or directory (repeatable)")
+        cmd.add_argument("--input", action="append", help="Upstream file the grade depends on (repeatable)")
+        cmd.add_argument("--rules-version", default=os.environ.get("GRADING_RULES_VERSION", ""))
+        cmd.add_argument("--report", default=None,
+                         help="Report path (default: .specify/validations/phase-N-report.md)")
+        cmd.add_argument("--json", action="store_true")
+    invalidate = sub.add_parser("invalidate", help="Drop grades that depend on these paths")
+    invalidate.add_argument("paths", nargs="+")
+    stats = sub.add_parser("stats", help="Hit/miss counters and size")
+    stats.add_argument("--json", action="store_true")
+    sub.add_parser("prune", help="Evict down to --max-mb/--max-entries")
+    args = parser.parse_args(argv)
+
+    repo_root = Path(args.repo_root).resolve() if args.repo_root else get_repo_root()
+    cache = GradeCache(repo_root, int(args.max_mb * 1024 * 1024), args.max_entries)
+
+    if args.command == "stats":
+        result = cache.stats()
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            rate = f"{result['hit_rate']:.0%}" if result["hit_rate"] is not None else "n/a"
+            print(f"Grade cache: {result['entries']} entries, {result['bytes'] / 1024:.1f}KB "
+                  f"(cap {result['max_bytes'] / 1024 / 1024:.0f}MB / {result['max_entries']})")
+            print(f"  hits {result['hits']}  misses {result['misses']}  hit rate {rate}")
+            print(f"  stores {result['stores']}  evictions {result['evictions']}  "
+                  f"invalidated {result['invalidated']}")
+        return 0
+    if args.command == "prune":
+        print(f"✓ Evicted {cache.prune()} entries")
+        return 0
+    if args.command == "invalidate":
+        print(f"✓ Invalidated {cache.invalidate(Path(p).resolve() for p in args.paths)} entries")
+        return 0
+
+    try:
+        subject, artifacts, inputs = _subject(args, repo_root, cache.hasher)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    report = Path(args.report).resolve() if args.report else None
+    if report is None and args.phase:
+        report = specify_dir(repo_root) / "validations" / f"phase-{args.phase}-report.md"
+    key, depends = cache.key(subject, artifacts, inputs, rules_version=args.rules_version)
+
+    if args.command == "lookup":
+        result = cache.lookup(key, subject, report)
+    else:
+        if report is None or not report.is_file():
+            print(f"ERROR: report not found: {report}", file=sys.stderr)
+            return 2
+        try:
+            result = cache.store(key, subject, report.read_text(encoding="utf-8"), depends)
+        except ValueError as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            return 2
+
+    if args.json:
+        print(json.dumps({k: v for k, v in result.__dict__.items() if k != "depends"}, indent=2))
+    elif args.command == "store":
+        print(f"✓ Cached {subject}: {result.grade} {result.score} {result.status}")
+    elif result.hit:
+        print(f"✓ Cache hit {subject}: {result.grade} {result.score} {result.status}")
+    else:
+        print(f"Cache miss {subject}: grade it, then run 'grade_cache.py store'")
+    return 0 if args.command == "store" or result.hit else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""Sequence-number allocator for features, PHRs and ADRs.
+
+``create-new-feature.sh``, ``create-phr.sh`` and ``create-adr.sh`` each
+find the next number by scanning, with one or more forks per branch or
+file. Two agents that scan at the same moment also get the same number.
+This allocator keeps one counter per namespace in
+``.specify/.cache/ids/<namespace>.json``:
+
+- **Compare-and-increment.** While holding an ``fcntl.flock`` on the
+  target directory, the allocator reads the counter and claims the
+  candidate by creating the entry exclusively (``O_EXCL`` file or
+  ``mkdir``). If the name is taken, it tries the next number. It then
+  writes the counter back atomically. The caller gets a number whose file
+  or directory already exists, so no two allocators return the same one.
+- **Per-source cache.** For every place existing numbers come from
+  (``specs/``, ``refs/heads``, ``refs/remotes/*``, ``packed-refs``, a
+  prompts or ADR directory) the counter stores a stat fingerprint and the
+  highest number found. A warm allocation only calls ``stat``.
+- **Self-healing.** A missing, torn or unreadable counter is rebuilt from
+  a scan. A source whose fingerprint changed, for example after
+  ``git fetch`` or a file added by hand, is rescanned on its own. The
+  counter never goes backwards, so numbers are not reused even when the
+  newest entry is deleted. Writers that bypass the allocator (the bash
+  fallback) can still race with it, as they always could.
+
+Usage:
+  id_allocator.py reserve feature --name user-auth      # mkdir specs/NNN-user-auth
+  id_allocator.py reserve adr --name use-postgres.md     # history/adr/NNNN-use-postgres.md
+  id_allocator.py reserve phr --dir history/prompts/001-auth --name login.green.prompt.md
+  id_allocator.py peek NAMESPACE [--dir DIR]             # next number, nothing reserved
+  id_allocator.py rescan NAMESPACE [--dir DIR]           # drop the counter and rebuild it
+
+``reserve`` prints the zero-padded number (``--json`` adds the path).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_json, cache_dir, find_git, get_repo_root, read_json, stat_key  # noqa: E402
+
+try:
+    import fcntl
+except ImportError:  # Windows: allocation is not serialised
+    fcntl = None
+
+COUNTER_VERSION = 1
+
+# Same matches as the bash scanners they replace
+SPEC_RE = re.compile(r"^([0-9]+)")  # get_highest_from_specs
+BRANCH_RE = re.compile(r"^([0-9]{3})-")  # get_highest_from_branches
+PACKED_BRANCH_RE = re.compile(r"^[0-9a-f]+ refs/(?:heads|remotes/[^/\n]+)/([0-9]{3})-", re.MULTILINE)
+PHR_RE = re.compile(r"^([0-9]{4})-.*\.prompt\.md$")  # create-phr.sh get_next_id
+ADR_RE = re.compile(r"^([0-9]{4})-.*\.md$")  # create-adr.sh next_id
+
+
+@dataclass(frozen=True)
+class Source:
+    """One place existing numbers are read from.
+
+    ``kind`` is ``entries`` (names in ``path``), ``dirs`` (subdirectory
+    names only), ``remotes`` (names in every ``path/<remote>/``) or
+    ``packed-refs`` (branch lines of the file at ``path``).
+    """
+
+    name: str
+    path: Path
+    kind: str
+    pattern: "re.Pattern[str]"
+
+
+@dataclass(frozen=True)
+class Namespace:
+    key: str
+    directory: Path  # where ``reserve`` creates the entry
+    width: int
+    make_dir: bool  # reserve a directory instead of a file
+    sources: Tuple[Source, ...]
+
+
+@dataclass
+class Allocation:
+    number: int
+    id: str
+    path: Path
+    rescanned: List[str]  # sources that were (re)scanned
+
+
+def _common_git_dir(git_dir: Path) -> Path:
+    # Worktrees keep their refs in the common dir.
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        return (git_dir / commondir.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir
+
+
+def feature_namespace(repo_root: Path) -> Namespace:
+    specs = repo_root / "specs"
+    sources = [Source("specs", specs, "dirs", SPEC_RE)]
+    found = find_git(repo_root)
+    if found:
+        common = _common_git_dir(found[1])
+        sources += [
+            Source("heads", common / "refs" / "heads", "entries", BRANCH_RE),
+            Source("remotes", common / "refs" / "remotes", "remotes", BRANCH_RE),
+            Source("packed-refs", common / "packed-refs", "packed-refs", PACKED_BRANCH_RE),
+        ]
+    return Namespace("feature", specs, 3, True, tuple(sources))
+
+
+def adr_namespace(repo_root: Path, directory: Optional[Path] = None) -> Namespace:
+    directory = directory or repo_root / "history" / "adr"
+    return Namespace("adr", directory, 4, False, (Source("adr", directory, "entries", ADR_RE),))
+
+
+def phr_namespace(repo_root: Path, directory: Path) -> Namespace:
+    # One sequence per prompts directory (constitution, general, <feature>)
+    return Namespace(f"phr.{directory.name}", directory, 4, False,
+                     (Source("prompts", directory, "entries", PHR_RE),))
+
+
+def namespace_for(repo_root: Path, name: str, directory: Optional[Path] = None) -> Namespace:
+    if name == "feature":
+        return feature_namespace(repo_root)
+    if name == "adr":
+        return adr_namespace(repo_root, directory)
+    if name == "phr":
+        if directory is None:
+            raise ValueError("the phr namespace needs --dir (history/prompts/<context>)")
+        return phr_namespace(repo_root, directory)
+    raise ValueError(f"unknown namespace '{name}' (expected feature, adr or phr)")
+
+
+def _key(path: Path) -> Optional[List[int]]:
+    # Lists, not tuples, so a key compares equal after a JSON round trip
+    key = stat_key(path)
+    return list(key) if key else None
+
+
+def fingerprint(source: Source) -> List[Any]:
+    """Stat key that changes whenever the source may hold a new number."""
+    key = _key(source.path)
+    if source.kind != "remotes" or key is None:
+        return [key]
+    keys: List[Any] = [key]
+    try:
+        with os.scandir(source.path) as entries:
+            remotes = sorted(entry.path for entry in entries if entry.is_dir())
+    except OSError:
+        return keys
+    return keys + [[os.path.basename(path), _key(Path(path))] for path in remotes]
+
+
+def _max_in_dir(path: str, pattern: "re.Pattern[str]", dirs_only: bool = False) -> int:
+    highest = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                match = pattern.match(entry.name)
+                if match and (not dirs_only or entry.is_dir()):
+                    highest = max(highest, int(match.group(1)))
+    except OSError:
+        pass
+    return highest
+
+
+def scan(source: Source) -> int:
+    """Highest number in ``source``; 0 when it is missing or empty."""
+    if source.kind == "packed-refs":
+        try:
+            text = source.path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return 0
+        return max((int(n) for n in source.pattern.findall(text)), default=0)
+    if source.kind == "remotes":
+        try:
+            with os.scandir(source.path) as entries:
+                remotes = [entry.path for entry in entries if entry.is_dir()]
+        except OSError:
+            return 0
+        return max((_max_in_dir(path, source.pattern) for path in remotes), default=0)
+    return _max_in_dir(str(source.path), source.pattern, dirs_only=source.kind == "dirs")
+
+
+class IdAllocator:
+    """Allocates numbers in one namespace; safe across processes."""
+
+    def __init__(self, repo_root: Path, namespace: Namespace):
+        self.repo_root = repo_root
+        self.namespace = namespace
+        self.counter_path = cache_dir(repo_root) / "ids" / f"{namespace.key}.json"
+
+    def reserve(self, name: str) -> Allocation:
+        """Claim the next number by creating ``<directory>/<id>-<name>``."""
+        ns = self.namespace
+        ns.directory.mkdir(parents=True, exist_ok=True)
+        with self._counter() as state:
+            number, rescanned = self._refresh(state)
+            own = [source for source in ns.sources if source.path == ns.directory]
+            # Unchanged since _refresh took its key, i.e. nothing arrived mid-scan
+            settled = {source.name for source in own
+                       if fingerprint(source) == state["sources"][source.name]["key"]}
+            while True:
+                ident = f"{number:0{ns.width}d}"
+                path = ns.directory / f"{ident}-{name}"
+                if self._claim(path):
+                    break
+                number += 1  # taken outside the allocator: compare failed, try the next
+            state["next"] = number + 1
+            # Our own entry changed the directory; re-key it so the next call
+            # stays warm. If something else changed it too, keep the old key
+            # and let the next call rescan.
+            for source in own:
+                record = state["sources"][source.name]
+                record["max"] = max(record["max"], number)
+                if source.name in settled:
+                    record["key"] = fingerprint(source)
+        return Allocation(number, ident, path, rescanned)
+
+    def peek(self) -> int:
+        """Number the next ``reserve`` would try, without claiming it."""
+        with self._counter() as state:
+            return self._refresh(state)[0]
+
+    def rescan(self) -> int:
+        """Forget every cached source and rebuild the counter from a scan."""
+        with self._counter() as state:
+            state["sources"] = {}
+            return self._refresh(state)[0]
+
+    def _refresh(self, state: Dict[str, Any]) -> Tuple[int, List[str]]:
+        rescanned = []
+        floor = max(state["next"], 1)
+        for source in self.namespace.sources:
+            key = fingerprint(source)
+            record = state["sources"].get(source.name)
+            if record is None or record.get("key") != key:
+                record = {"key": key, "max": scan(source)}
+                state["sources"][source.name] = record
+                rescanned.append(source.name)
+            floor = max(floor, record["max"] + 1)
+        return floor, rescanned
+
+    def _claim(self, path: Path) -> bool:
+        try:
+            if self.namespace.make_dir:
+                os.mkdir(path)
+            else:
+                os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+        except FileExistsError:
+            return False
+        return True
+
+    @contextmanager
+    def _counter(self) -> Iterator[Dict[str, Any]]:
+        """Read-modify-write of the counter while holding the namespace lock.
+
+        The lock is a ``flock`` on the namespace directory itself, not on
+        the counter. The counter may be deleted at any time (it lives in
+        ``.specify/.cache/``), and a lock on a deleted file would no longer
+        exclude anyone.
+        """
+        fd = os.open(self.namespace.directory, os.O_RDONLY) if fcntl is not None else None
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            state = self._parse(read_json(self.counter_path))
+            yield state
+            atomic_write_json(self.counter_path, state)
+        finally:
+            if fd is not None:
+                os.close(fd)  # releases the lock
+
+    def _parse(self, state: Any) -> Dict[str, Any]:
+        if (not isinstance(state, dict) or state.get("version") != COUNTER_VERSION
+                or not isinstance(state.get("next"), int) or not isinstance(state.get("sources"), dict)):
+            return {"version": COUNTER_VERSION, "namespace": self.namespace.key, "next": 0, "sources": {}}
+        return state
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Allocate feature, PHR and ADR numbers")
+    parser.add_argument("--repo-root", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    reserve = sub.add_parser("reserve", help="Claim the next number and create its entry")
+    reserve.add_argument("namespace", choices=("feature", "adr", "phr"))
+    reserve.add_argument("--name", required=True, help="Entry name after '<id>-', e.g. login.green.prompt.md")
+    reserve.add_argument("--dir", default=None, help="Prompts directory (phr) or ADR directory (adr)")
+    reserve.add_argument("--json", action="store_true")
+    for name, text in (("peek", "Print the next number without reserving it"),
+                       ("rescan", "Rebuild the counter from a full scan")):
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("namespace", choices=("feature", "adr", "phr"))
+        cmd.add_argument("--dir", default=None)
+    args = parser.parse_args(argv)
+
+    repo_root = Path(args.repo_root).resolve() if args.repo_root else get_repo_root()
+    directory = Path(args.dir).resolve() if args.dir else None
+    try:
+        namespace = namespace_for(repo_root, args.namespace, directory)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+    allocator = IdAllocator(repo_root, namespace)
+
+    try:
+        if args.command == "reserve":
+            if "/" in args.name:
+                print("ERROR: --name must be a single path component", file=sys.stderr)
+                return 1
+            result = allocator.reserve(args.name)
+            if args.json:
+                print(json.dumps({"id": result.id, "path": str(result.path), "rescanned": result.rescanned}))
+            else:
+                print(result.id)
+        else:
+            number = allocator.peek() if args.command == "peek" else allocator.rescan()
+            print(f"{number:0{namespace.width}d}")
+    except OSError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
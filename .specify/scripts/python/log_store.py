@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""Segmented, indexed storage for the activity logs in ``.claude/logs/``.
+
+Hooks keep appending to ``agent-usage.log``, ``skill-invocations.log`` and
+the other logs with ``>>``; nothing changes for writers. This module keeps
+those files small and answers the monitoring questions without re-reading
+them:
+
+- **Rotation.** ``rotate`` renames an active log once it is larger than
+  ``--max-mb`` or its first entry is older than ``--max-age-hours``. The
+  next ``>>`` starts a fresh file. The renamed file is then streamed into
+  ``segments/<log>/<log>.<seq>.log.gz``.
+- **Summary index.** The pass that compresses a segment also counts the
+  skills, agents and tools it mentions, skipped mandatory skills, changed
+  files, ``validated`` lines and the time range. These summaries go in
+  ``segments/<log>/index.json``. The active file gets the same summary,
+  updated incrementally from the last offset. Read-only queries keep that
+  offset in memory; it is checkpointed to ``active.json`` only after a
+  catch-up of ``ACTIVE_CHECKPOINT_BYTES`` or more.
+- **Queries.** ``summary`` and ``utilization`` add up the indexes. With
+  ``--since``/``--until``, only segments that straddle the window are
+  decompressed. Retired segments (``--keep``) survive only as one summary,
+  so they count only when the window covers them completely.
+- **tail.** ``tail -f`` holds the open file, so it drains a rotated file
+  to the end before it switches to the new one.
+
+Usage:
+  log_store.py rotate [--max-mb 64] [--max-age-hours 24] [--keep N] [LOG ...]
+  log_store.py summary [--since TS] [--until TS] [--json] [LOG ...]
+  log_store.py utilization [--json]
+  log_store.py tail [-n 10] [-f] LOG
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotation is not serialised
+    fcntl = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_json, get_repo_root, read_json, stat_key  # noqa: E402
+
+LOGS = (
+    "agent-usage",
+    "skill-invocations",
+    "skill-activations",
+    "skill-enforcement",
+    "tool-usage",
+    "file-changes",
+)
+INDEX_VERSION = 1
+SEGMENTS_DIR = "segments"
+READ_BLOCK = 8 * 1024 * 1024
+HEAD_BYTES = 256
+COMPRESS_LEVEL = 6
+# Hooks append with ">>" and no lock; one that opened the log just before the
+# rename writes into the rotating file. Wait this long for it to go quiet.
+DRAIN_SECONDS = 0.05
+ACTIVE_CHECKPOINT_BYTES = 1024 * 1024
+
+# Each pattern starts with a literal, so re can skip ahead with a fast
+# substring search; one findall per kind is much faster than a single
+# alternation, which is tried at every byte.
+SKILL_RE = re.compile(rb"Skill invoked: ([\w:.@/-]+)")
+AGENT_RE = re.compile(rb"Agent task invoked(?:(?::\s*|\s+)(?:subagent_type[=:]\s*)?([\w:.-]+))?")
+TOOL_RE = re.compile(rb"Tool: (\w+)")
+MISSED_RE = re.compile(rb"skill not used: ([\w:.@/-]+)")
+TIMESTAMP_RE = re.compile(rb"^\[(\d{4}-\d\d-\d\dT[^\]]+)\]", re.MULTILINE)
+UNNAMED_AGENT = "(unnamed)"
+
+
+def logs_dir(repo_root: Path) -> Path:
+    return repo_root / ".claude" / "logs"
+
+
+# -- summaries ---------------------------------------------------------------
+
+
+def empty_summary() -> Dict[str, Any]:
+    return {"lines": 0, "bytes": 0, "first_ts": None, "last_ts": None, "validated": 0,
+            "files_changed": 0, "skills": {}, "agents": {}, "tools": {}, "missed": {}}
+
+
+def _bump(counts: Dict[str, int], key: str, n: int) -> None:
+    counts[key] = counts.get(key, 0) + n
+
+
+def summarise_block(summary: Dict[str, Any], lines: bytes) -> None:
+    """Add a block of whole lines to ``summary`` in place."""
+    if not lines:
+        return
+    summary["lines"] += lines.count(b"\n")
+    summary["bytes"] += len(lines)
+    for key, pattern in (("skills", SKILL_RE), ("tools", TOOL_RE), ("missed", MISSED_RE)):
+        for name, n in Counter(pattern.findall(lines)).items():
+            _bump(summary[key], name.decode("utf-8", "replace"), n)
+    for name, n in Counter(AGENT_RE.findall(lines)).items():
+        _bump(summary["agents"], name.decode("utf-8", "replace") if name else UNNAMED_AGENT, n)
+    summary["files_changed"] += lines.count(b"File modified: ")
+    if b"validated" in lines:  # lines, like grep -c, not occurrences
+        summary["validated"] += sum(1 for line in lines.split(b"\n") if b"validated" in line)
+    first = TIMESTAMP_RE.search(lines)
+    if first and summary["first_ts"] is None:
+        summary["first_ts"] = first.group(1).decode()
+    tail = TIMESTAMP_RE.findall(lines, max(0, len(lines) - 64 * 1024))
+    if tail:
+        summary["last_ts"] = tail[-1].decode()
+
+
+def merge_summaries(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    total = empty_summary()
+    for summary in summaries:
+        for key in ("lines", "bytes", "validated", "files_changed"):
+            total[key] += summary.get(key, 0)
+        for key in ("skills", "agents", "tools", "missed"):
+            for name, n in summary.get(key, {}).items():
+                _bump(total[key], name, n)
+        if summary.get("first_ts") and (total["first_ts"] is None or summary["first_ts"] < total["first_ts"]):
+            total["first_ts"] = summary["first_ts"]
+        if summary.get("last_ts") and (total["last_ts"] is None or summary["last_ts"] > total["last_ts"]):
+            total["last_ts"] = summary["last_ts"]
+    return total
+
+
+def _whole_lines(handle) -> Iterator[bytes]:
+    """Yield blocks that end on a line boundary; a trailing partial line is held back."""
+    carry = b""
+    while True:
+        block = handle.read(READ_BLOCK)
+        if not block:
+            return
+        block = carry + block
+        end = block.rfind(b"\n") + 1
+        carry = block[end:]
+        yield block[:end]
+
+
+def _first_at_or_after(lines: bytes, ts: str) -> int:
+    """Offset of the first line stamped ``ts`` or later (lines are in time order)."""
+    target = ts.encode()
+    lo, hi = 0, len(lines)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = lines.rfind(b"\n", 0, mid) + 1
+        match = TIMESTAMP_RE.search(lines, start)
+        if match is None:
+            hi = start
+        elif match.group(1) < target:
+            lo = lines.find(b"\n", match.start()) + 1 or len(lines)
+        else:
+            hi = start
+    return lo
+
+
+def _filter_window(lines: bytes, since: Optional[str], until: Optional[str]) -> bytes:
+    start = _first_at_or_after(lines, since) if since else 0
+    if until is None:
+        return lines[start:]
+    # "until" is inclusive: cut before the first line stamped after it
+    return lines[start:_first_at_or_after(lines, until + "\uffff")]
+
+
+def _read_tail(path: Path, count: int, block: int = 64 * 1024) -> List[bytes]:
+    """Last ``count`` lines of a plain file, reading backwards from the end."""
+    with open(path, "rb") as handle:
+        end = handle.seek(0, os.SEEK_END)
+        data = b""
+        while end > 0 and data.count(b"\n") <= count:
+            start = max(0, end - block)
+            handle.seek(start)
+            data = handle.read(end - start) + data
+            end = start
+    return data.splitlines(keepends=True)[-count:]
+
+
+# -- store -------------------------------------------------------------------
+
+
+class LogStore:
+    """Rotation, summaries and queries for one ``.claude/logs`` directory."""
+
+    def __init__(self, directory: Path, names: Iterable[str] = LOGS):
+        self.dir = Path(directory)
+        self.names = list(names)
+        self._active: Dict[str, Dict[str, Any]] = {}
+
+    def subset(self, names: Iterable[str]) -> "LogStore":
+        """A store over some of these logs that shares the in-memory offsets."""
+        view = LogStore(self.dir, names)
+        view._active = self._active
+        return view
+
+    def active_path(self, name: str) -> Path:
+        return self.dir / f"{name}.log"
+
+    def segment_dir(self, name: str) -> Path:
+        return self.dir / SEGMENTS_DIR / name
+
+    def index(self, name: str) -> Dict[str, Any]:
+        index = read_json(self.segment_dir(name) / "index.json", None)
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            index = {"version": INDEX_VERSION, "segments": [], "retired": None, "next_seq": 1}
+        return index
+
+    # rotation
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        seg_dir = self.segment_dir(name)
+        seg_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(seg_dir / ".lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def needs_rotation(self, name: str, max_bytes: int, max_age: Optional[timedelta]) -> bool:
+        key = stat_key(self.active_path(name))
+        if key is None or key[1] == 0:
+            return False
+        if key[1] >= max_bytes:
+            return True
+        if max_age is None:
+            return False
+        with open(self.active_path(name), "rb") as handle:
+            match = TIMESTAMP_RE.match(handle.readline())
+        if not match:
+            return False
+        try:
+            first = datetime.fromisoformat(match.group(1).decode().replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        now = datetime.now(first.tzinfo) if first.tzinfo else datetime.now()
+        return now - first >= max_age
+
+    def rotate(self, name: str, max_bytes: int = 64 * 1024 * 1024, max_age: Optional[timedelta] = None,
+               keep: int = 0, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Rotate ``name`` if it is due; returns the new segment's index entry."""
+        with self._lock(name):
+            pending = self.segment_dir(name) / f"{name}.rotating"
+            segment = None
+            if pending.exists():  # a previous rotation was interrupted
+                segment = self._compress(name, pending)
+            size = (stat_key(self.active_path(name)) or (0, 0))[1]
+            if (force and size) or self.needs_rotation(name, max_bytes, max_age):
+                os.rename(self.active_path(name), pending)
+                segment = self._compress(name, pending)
+            if keep:
+                self._retire(name, keep)
+            return segment
+
+    def _compress(self, name: str, pending: Path) -> Dict[str, Any]:
+        index = self.index(name)
+        seq = index["next_seq"]
+        target = self.segment_dir(name) / f"{name}.{seq:06d}.log.gz"
+        tmp = target.with_name(f".{target.name}.tmp")
+        summary = empty_summary()
+        with open(pending, "rb") as source, gzip.open(tmp, "wb", compresslevel=COMPRESS_LEVEL) as sink:
+            while True:
+                source.seek(summary["bytes"])
+                for lines in _whole_lines(source):
+                    sink.write(lines)
+                    summarise_block(summary, lines)
+                size = os.fstat(source.fileno()).st_size
+                time.sleep(DRAIN_SECONDS)
+                if os.fstat(source.fileno()).st_size == size:
+                    break
+            # a final line without a newline still belongs to this segment
+            source.seek(summary["bytes"])
+            rest = source.read()
+            if rest:
+                sink.write(rest + b"\n")
+                summarise_block(summary, rest + b"\n")
+        os.replace(tmp, target)
+        entry = {"file": target.name, "seq": seq, "compressed_bytes": target.stat().st_size, **summary}
+        index["segments"].append(entry)
+        index["next_seq"] = seq + 1
+        atomic_write_json(self.segment_dir(name) / "index.json", index)
+        pending.unlink()
+        (self.segment_dir(name) / "active.json").unlink(missing_ok=True)
+        self._active.pop(name, None)
+        return entry
+
+    def _retire(self, name: str, keep: int) -> None:
+        """Delete all but the newest ``keep`` segments, folding their counts into ``retired``."""
+        index = self.index(name)
+        if len(index["segments"]) <= keep:
+            return
+        old, index["segments"] = index["segments"][:-keep], index["segments"][-keep:]
+        retired = [index["retired"]] if index["retired"] else []
+        index["retired"] = merge_summaries(retired + old)
+        atomic_write_json(self.segment_dir(name) / "index.json", index)
+        for entry in old:
+            (self.segment_dir(name) / entry["file"]).unlink(missing_ok=True)
+
+    # summaries
+
+    def active_summary(self, name: str) -> Dict[str, Any]:
+        """Summary of the active file, reading only what was appended since last time."""
+        path = self.active_path(name)
+        cache_path = self.segment_dir(name) / "active.json"
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return empty_summary()
+        with handle:
+            head = hashlib.sha1(handle.read(HEAD_BYTES)).hexdigest()
+            size = os.fstat(handle.fileno()).st_size
+            cached = self._active.get(name) or read_json(cache_path, {}) or {}
+            if cached.get("head") == head and cached.get("offset", 0) <= size:
+                offset, summary = cached["offset"], copy.deepcopy(cached["summary"])
+                saved = cached.get("saved", cached["offset"])
+            else:
+                offset, summary, saved = 0, empty_summary(), 0
+            if offset == size:
+                return summary
+            handle.seek(offset)
+            for lines in _whole_lines(handle):
+                summarise_block(summary, lines)
+                offset += len(lines)
+        state = {"head": head, "offset": offset, "summary": summary}
+        # Checkpoint only a large catch-up, so a status pass over logs that
+        # are nearly up to date stays read-only
+        if offset - saved >= ACTIVE_CHECKPOINT_BYTES:
+            try:
+                atomic_write_json(cache_path, state, indent=None)
+                saved = offset
+            except OSError:
+                pass
+        self._active[name] = {**state, "summary": copy.deepcopy(summary), "saved": saved}
+        return summary
+
+    def summary(self, name: str, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """Counts for one log over all segments plus the active file."""
+        index_path = self.segment_dir(name) / "index.json"
+        for _ in range(3):  # retry if a rotation lands mid-query
+            before = stat_key(index_path)
+            index = self.index(name)
+            retired = index["retired"]
+            # deleted segments cannot be rescanned: count them only when wholly inside the window
+            if retired and (since is None or (retired["first_ts"] or "") >= since) and \
+                    (until is None or (retired["last_ts"] or "\uffff") <= until):
+                parts = [retired]
+            else:
+                parts = []
+            for entry in index["segments"]:
+                if (since and entry["last_ts"] and entry["last_ts"] < since) or \
+                        (until and entry["first_ts"] and entry["first_ts"] > until):
+                    continue
+                inside = (since is None or (entry["first_ts"] or "") >= since) and \
+                    (until is None or (entry["last_ts"] or "") <= until)
+                parts.append(entry if inside else self._scan_segment(name, entry, since, until))
+            active = self.active_summary(name)
+            if since or until:
+                if not ((since is None or (active["first_ts"] or "") >= since) and
+                        (until is None or (active["last_ts"] or "") <= until)):
+                    active = self._scan_file(self.active_path(name), since, until, opener=open)
+            parts.append(active)
+            if stat_key(index_path) == before:
+                break
+        return merge_summaries(parts)
+
+    def _scan_segment(self, name: str, entry: Dict[str, Any], since: Optional[str], until: Optional[str]):
+        return self._scan_file(self.segment_dir(name) / entry["file"], since, until, opener=gzip.open)
+
+    @staticmethod
+    def _scan_file(path: Path, since: Optional[str], until: Optional[str], opener) -> Dict[str, Any]:
+        summary = empty_summary()
+        try:
+            with opener(path, "rb") as handle:
+                for lines in _whole_lines(handle):
+                    summarise_block(summary, _filter_window(lines, since, until))
+        except FileNotFoundError:
+            pass
+        return summary
+
+    def total(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        return merge_summaries(self.summary(name, since, until) for name in self.names)
+
+    # tail
+
+    def last_lines(self, name: str, count: int) -> List[bytes]:
+        """The last ``count`` lines, reaching back into segments when the active file is short."""
+        if count <= 0:
+            return []
+        sources = [(self.active_path(name), open)]
+        for entry in reversed(self.index(name)["segments"]):
+            sources.append((self.segment_dir(name) / entry["file"], gzip.open))
+        lines: List[bytes] = []
+        for path, opener in sources:
+            try:
+                if opener is open:
+                    older = _read_tail(path, count - len(lines))
+                else:
+                    with gzip.open(path, "rb") as handle:
+                        older = handle.read().splitlines(keepends=True)
+            except FileNotFoundError:
+                continue
+            lines = older[-(count - len(lines)):] + lines
+            if len(lines) >= count:
+                break
+        return lines
+
+    def follow(self, name: str, interval: float = 0.25, stop=None) -> Iterator[bytes]:
+        """Yield complete new lines until ``stop()``, surviving rotations and truncation."""
+        path = self.active_path(name)
+        handle = None
+        carry = b""
+        from_start = False  # only the first file is joined at its end
+        while stop is None or not stop():
+            if handle is None:
+                try:
+                    handle = open(path, "rb")
+                except FileNotFoundError:
+                    time.sleep(interval)
+                    continue
+                if not from_start:
+                    handle.seek(0, os.SEEK_END)
+            chunk = handle.read()
+            if chunk:
+                chunk = carry + chunk
+                end = chunk.rfind(b"\n") + 1
+                carry = chunk[end:]
+                yield from chunk[:end].splitlines(keepends=True)
+                continue
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            opened = os.fstat(handle.fileno())
+            if current is None or current.st_ino != opened.st_ino:
+                if handle.tell() < opened.st_size:
+                    continue  # written to just before the rename: drain it first
+                handle.close()
+                handle, from_start = None, True
+                if carry:
+                    yield carry + b"\n"
+                    carry = b""
+                continue
+            if current.st_size < handle.tell():
+                handle.seek(0)  # truncated in place
+                continue
+            time.sleep(interval)
+        if handle is not None:
+            handle.close()
+
+
+# -- utilization -------------------------------------------------------------
+
+
+def available_components(repo_root: Path) -> Tuple[List[str], List[str]]:
+    claude = repo_root / ".claude"
+    skills = sorted(p.name for p in (claude / "skills").glob("*") if p.is_dir())
+    agents = sorted(p.stem for p in (claude / "agents").glob("*.md"))
+    return skills, agents
+
+
+def utilization(repo_root: Optional[Path] = None, store: Optional[LogStore] = None) -> Dict[str, Any]:
+    """Skills/Agents used vs available, answered from the summary indexes."""
+    root = repo_root or get_repo_root()
+    store = store or LogStore(logs_dir(root))
+    totals = store.total()
+    skills, agents = available_components(root)
+    result = {}
+    for kind, available in (("skills", skills), ("agents", agents)):
+        used = sorted(name for name in totals[kind] if name in available)
+        result[kind] = {
+            "available": len(available),
+            "used": used,
+            "unused": sorted(set(available) - set(used)),
+            "percentage": round(100 * len(used) / len(available)) if available else 0,
+            "invocations": sum(totals[kind].values()),
+        }
+    result["tools"] = totals["tools"]
+    result["missed"] = totals["missed"]
+    result["bypass"] = bool(totals["tools"]) and not totals["skills"] and not totals["agents"]
+    return result
+
+
+def _parse_size(value: str) -> int:
+    return int(float(value) * 1024 * 1024)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rotation, summary indexes and queries for .claude/logs.")
+    parser.add_argument("--dir", default=None, help="Logs directory (default: .claude/logs)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rotate = sub.add_parser("rotate", help="Rotate logs that are too large or too old")
+    rotate.add_argument("logs", nargs="*")
+    rotate.add_argument("--max-mb", type=_parse_size, default=_parse_size("64"), dest="max_bytes")
+    rotate.add_argument("--max-age-hours", type=float, default=None)
+    rotate.add_argument("--keep", type=int, default=0, help="Segments to keep per log (0 = all)")
+    rotate.add_argument("--force", action="store_true", help="Rotate every non-empty log now")
+
+    summary = sub.add_parser("summary", help="Counts per skill, agent and tool")
+    summary.add_argument("logs", nargs="*")
+    summary.add_argument("--since", default=None, help="ISO timestamp, inclusive")
+    summary.add_argument("--until", default=None, help="ISO timestamp, inclusive")
+    summary.add_argument("--json", action="store_true")
+
+    util = sub.add_parser("utilization", help="Skills/Agents used vs available")
+    util.add_argument("--json", action="store_true")
+
+    tail = sub.add_parser("tail", help="tail [-f] that follows rotations")
+    tail.add_argument("log")
+    tail.add_argument("-n", "--lines", type=int, default=10)
+    tail.add_argument("-f", "--follow", action="store_true")
+
+    args = parser.parse_args(argv)
+    root = get_repo_root()
+    directory = Path(args.dir) if args.dir else logs_dir(root)
+    names = [n[:-4] if n.endswith(".log") else n for n in getattr(args, "logs", None) or []] or LOGS
+    store = LogStore(directory, names)
+
+    if args.command == "rotate":
+        max_age = timedelta(hours=args.max_age_hours) if args.max_age_hours else None
+        for name in names:
+            entry = store.rotate(name, args.max_bytes, max_age, keep=args.keep, force=args.force)
+            if entry:
+                ratio = entry["bytes"] / entry["compressed_bytes"] if entry["compressed_bytes"] else 0
+                print(f"✓ {name}: segment {entry['seq']} ({entry['lines']} lines, "
+                      f"{entry['bytes'] / 1048576:.1f}MB → {entry['compressed_bytes'] / 1048576:.1f}MB, {ratio:.0f}x)")
+        return 0
+
+    if args.command == "summary":
+        totals = store.total(args.since, args.until)
+        if args.json:
+            print(json.dumps(totals, indent=2))
+            return 0
+        print(f"Lines: {totals['lines']}  ({totals['first_ts'] or '-'} → {totals['last_ts'] or '-'})")
+        for kind in ("skills", "agents", "tools", "missed"):
+            top = sorted(totals[kind].items(), key=lambda kv: -kv[1])[:10]
+            print(f"{kind.capitalize()}: " + (", ".join(f"{k} ({v})" for k, v in top) or "none"))
+        print(f"Files changed: {totals['files_changed']}")
+        return 0
+
+    if args.command == "utilization":
+        result = utilization(root, store)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return 0
+        for kind in ("skills", "agents"):
+            info = result[kind]
+            print(f"{kind.capitalize()} Used: {len(info['used'])}/{info['available']} ({info['percentage']}%)"
+                  + (f" - unused: {', '.join(info['unused'])}" if info["unused"] else ""))
+        if result["bypass"]:
+            print("WARNING: tools were used without any skill or agent invocation")
+        return 0
+
+    name = args.log[:-4] if args.log.endswith(".log") else args.log
+    for line in store.last_lines(name, args.lines):
+        sys.stdout.buffer.write(line)
+    sys.stdout.flush()
+    if args.follow:
+        try:
+            for line in store.follow(name):
+                sys.stdout.buffer.write(line)
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
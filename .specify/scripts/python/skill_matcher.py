@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Compiled, cached prompt matcher for ``.claude/skill-rules.json``.
+
+``skill-activator.sh`` runs on every prompt and tests each rule one after
+another. This module compiles the whole rule set once:
+
+- all keywords become a single case-insensitive alternation, so one scan
+  of the prompt finds every keyword hit (a regex-built automaton). The
+  scan finds the longest keyword at each word start, and shorter keywords
+  that are word-prefixes of it ("api" in "api gateway") are precomputed;
+- intent patterns are indexed by the longest literal they require
+  (``topic`` in ``(add|fix).*?topic``), and all of those literals go into
+  one more alternation. A pattern is only run when its literal occurs in
+  the prompt. Patterns with no required literal are grouped into combined
+  alternations of ``CHUNK_SIZE``; a chunk that finds nothing rules out all
+  of its patterns with one search. Patterns with backreferences (``\1``,
+  ``(?P=name)``, ``(?(1)...)``) are always run on their own, because a
+  combined alternation renumbers their groups.
+
+The normalised rule table is cached in ``.specify/.cache/skill-matcher.json``
+keyed by the SHA-256 of the rules file, and compiled matchers are memoised
+per hash in-process. ``serve`` keeps one matcher resident and reads prompts
+as JSON lines. It appends activations to ``skill-activations.log`` in
+batches, flushed by size, by a timer, and on exit or SIGTERM. ``match`` is
+one process per prompt, so it makes a single append per call.
+
+Expected rules format (extra keys are ignored)::
+
+    {"skills": {"api-patterns": {
+        "priority": "high", "enforcement": "suggest",
+        "promptTriggers": {"keywords": ["api", "endpoint"],
+                           "intentPatterns": ["(create|add).*?endpoint"]}}}}
+
+Usage:
+  skill_matcher.py match [--prompt TEXT] [--json]   # hook mode: JSON {"prompt": ...} on stdin
+  skill_matcher.py serve                            # one JSON request per line on stdin
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_json, cache_dir, get_repo_root, read_json  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        from re import _parser as sre_parse
+    except ImportError:  # Python < 3.11
+        import sre_parse
+
+CACHE_VERSION = 1
+CACHE_FILE = "skill-matcher.json"
+CHUNK_SIZE = 64
+MIN_LITERAL = 3
+
+PRIORITY_WEIGHT = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+KEYWORD_SCORE = 1
+INTENT_SCORE = 2
+
+
+@dataclass
+class SkillMatch:
+    skill: str
+    score: int
+    priority: str
+    enforcement: str
+    keywords: List[str] = field(default_factory=list)
+    intents: List[str] = field(default_factory=list)
+
+
+def required_literal(pattern: str) -> str:
+    """Longest literal run every match of ``pattern`` must contain, lowercased.
+
+    Only top-level literal runs count, which keeps this conservative:
+    returns ``""`` when unsure (alternation at the top level, flags, etc.).
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return ""
+    if parsed.state.flags & (re.VERBOSE | re.MULTILINE):
+        return ""
+    best, run = "", []
+    for op, arg in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    return best.lower() if len(best) >= MIN_LITERAL else ""
+
+
+def uses_group_refs(pattern: str) -> bool:
+    """True when ``pattern`` refers back to its own groups by number or name."""
+    try:
+        stack = [sre_parse.parse(pattern)]
+    except Exception:
+        return True
+    while stack:
+        node = stack.pop()
+        for item in node:
+            if isinstance(item, sre_parse.SubPattern):
+                stack.append(item)
+            elif isinstance(item, (tuple, list)):
+                if item and item[0] in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+                    return True
+                stack.append(item)
+    return False
+
+
+def _overlapping_prefixes(literals, is_boundary) -> Dict[str, List[str]]:
+    """For each literal, the shorter literals that are prefixes of it.
+
+    The combined scans report only the longest alternative at each start
+    position, so these are added back explicitly.
+    """
+    prefixes: Dict[str, List[str]] = {}
+    for literal in literals:
+        shorter = [literal[:i] for i in range(1, len(literal)) if literal[:i] in literals and is_boundary(literal, i)]
+        if shorter:
+            prefixes[literal] = shorter
+    return prefixes
+
+
+def _longest_first(literals) -> str:
+    return "|".join(re.escape(k) for k in sorted(literals, key=len, reverse=True))
+
+
+def normalise_rules(rules: dict) -> dict:
+    """Flatten a skill-rules document into the cacheable table."""
+    skills: Dict[str, dict] = {}
+    keywords: Dict[str, List[str]] = {}
+    intents: List[Tuple[str, str, str]] = []
+    for name, rule in (rules.get("skills") or {}).items():
+        if not isinstance(rule, dict):
+            continue
+        skills[name] = {
+            "priority": rule.get("priority", "medium"),
+            "enforcement": rule.get("enforcement", "suggest"),
+        }
+        triggers = rule.get("promptTriggers") or {}
+        for keyword in triggers.get("keywords") or []:
+            owners = keywords.setdefault(keyword.lower(), [])
+            if name not in owners:
+                owners.append(name)
+        for pattern in triggers.get("intentPatterns") or []:
+            try:
+                re.compile(pattern)
+            except re.error as exc:
+                print(f"WARNING: skipping invalid intent pattern for {name}: {exc}", file=sys.stderr)
+                continue
+            intents.append((pattern, name, required_literal(pattern)))
+    return {"skills": skills, "keywords": keywords, "intents": intents}
+
+
+class CompiledMatcher:
+    """Matches prompts against a normalised rule table."""
+
+    def __init__(self, table: dict):
+        self.skills: Dict[str, dict] = table["skills"]
+        self.keywords: Dict[str, List[str]] = table["keywords"]
+        # Longest first so "api gateway" wins over "api" at the same position;
+        # the lookahead lets matches overlap ("gateway" inside "api gateway").
+        alternation = _longest_first(self.keywords)
+        self.keyword_re = (
+            re.compile(rf"(?<!\w)(?=({alternation})(?!\w))", re.IGNORECASE) if alternation else None
+        )
+        self.prefixes = _overlapping_prefixes(
+            self.keywords, lambda k, i: k[i - 1].isalnum() and not (k[i].isalnum() or k[i] == "_")
+        )
+
+        # Indexed patterns are compiled on first use; most never are.
+        self._compiled: Dict[str, re.Pattern] = {}
+        self.by_literal: Dict[str, List[Tuple[str, str]]] = {}
+        unindexed, standalone = [], []
+        for pattern, skill, literal in table["intents"]:
+            if literal:
+                self.by_literal.setdefault(literal, []).append((pattern, skill))
+            elif uses_group_refs(pattern):
+                standalone.append((pattern, skill))
+            else:
+                unindexed.append((pattern, skill))
+        alternation = _longest_first(self.by_literal)
+        self.literal_re = re.compile(f"(?=({alternation}))") if alternation else None
+        self.literal_prefixes = _overlapping_prefixes(self.by_literal, lambda k, i: True)
+
+        self.chunks: List[Tuple[Optional[re.Pattern], List[Tuple[str, str]]]] = []
+        for start in range(0, len(unindexed), CHUNK_SIZE):
+            chunk = unindexed[start:start + CHUNK_SIZE]
+            try:
+                combined = re.compile("|".join(f"(?:{pattern})" for pattern, _ in chunk), re.IGNORECASE)
+            except re.error:
+                # e.g. inline global flags that are only valid at the start of a pattern
+                combined = None
+            self.chunks.append((combined, chunk))
+        if standalone:
+            self.chunks.append((None, standalone))
+
+    def match(self, prompt: str) -> List[SkillMatch]:
+        """Ranked matches: highest score first, then priority, then name."""
+        hits: Dict[str, SkillMatch] = {}
+
+        def hit(skill: str) -> SkillMatch:
+            if skill not in hits:
+                meta = self.skills.get(skill, {})
+                hits[skill] = SkillMatch(skill, 0, meta.get("priority", "medium"), meta.get("enforcement", "suggest"))
+            return hits[skill]
+
+        if self.keyword_re is not None:
+            found = set()
+            for m in self.keyword_re.finditer(prompt):
+                keyword = m.group(1).lower()
+                found.add(keyword)
+                found.update(self.prefixes.get(keyword, ()))
+            for keyword in found:
+                for skill in self.keywords.get(keyword, ()):
+                    entry = hit(skill)
+                    entry.keywords.append(keyword)
+                    entry.score += KEYWORD_SCORE
+
+        candidates = []
+        if self.literal_re is not None:
+            found = set()
+            for m in self.literal_re.finditer(prompt.lower()):
+                found.add(m.group(1))
+                found.update(self.literal_prefixes.get(m.group(1), ()))
+            for literal in found:
+                candidates.extend(self.by_literal[literal])
+        for combined, members in self.chunks:
+            if combined is None or combined.search(prompt) is not None:
+                candidates.extend(members)
+
+        for pattern, skill in candidates:
+            compiled = self._compiled.get(pattern)
+            if compiled is None:
+                compiled = self._compiled[pattern] = re.compile(pattern, re.IGNORECASE)
+            if compiled.search(prompt):
+                entry = hit(skill)
+                entry.intents.append(pattern)
+                entry.score += INTENT_SCORE
+
+        for entry in hits.values():
+            entry.keywords.sort()
+            entry.score *= PRIORITY_WEIGHT.get(entry.priority, 1)
+        return sorted(hits.values(), key=lambda m: (-m.score, -PRIORITY_WEIGHT.get(m.priority, 1), m.skill))
+
+
+_COMPILED: Dict[str, CompiledMatcher] = {}
+
+
+def load_matcher(rules_path: Path, cache_path: Optional[Path] = None) -> CompiledMatcher:
+    """Matcher for ``rules_path``, reusing the table cached for the same hash."""
+    raw = rules_path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest in _COMPILED:
+        return _COMPILED[digest]
+
+    cached = read_json(cache_path) if cache_path else None
+    if isinstance(cached, dict) and cached.get("version") == CACHE_VERSION and cached.get("hash") == digest:
+        table = cached["table"]
+    else:
+        table = normalise_rules(json.loads(raw))
+        if cache_path:
+            try:
+                atomic_write_json(cache_path, {"version": CACHE_VERSION, "hash": digest, "table": table}, indent=None)
+            except OSError:
+                pass
+    _COMPILED[digest] = matcher = CompiledMatcher(table)
+    return matcher
+
+
+class ActivationLog:
+    """Buffers activation lines and appends them in batches.
+
+    A batch is written once it holds ``batch_size`` lines, and (with
+    ``start_timer``) at most ``max_delay`` seconds after its first line.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 50, max_delay: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.pending: List[str] = []
+        self.last_flush = time.monotonic()
+        # Re-entrant: the SIGTERM handler may exit while a flush is running
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+    def record(self, prompt: str, matches: List[SkillMatch]) -> None:
+        matched = ", ".join(f"{m.skill} ({m.score})" for m in matches) or "none"
+        snippet = " ".join(prompt.split())[:120].replace('"', "'")
+        line = f"[{datetime.now().isoformat(timespec='seconds')}] Prompt: \"{snippet}\" | Matched: {matched}"
+        with self._lock:
+            self.pending.append(line)
+            if len(self.pending) >= self.batch_size or time.monotonic() - self.last_flush >= self.max_delay:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self.pending:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(self.pending) + "\n")
+            self.pending.clear()
+            self.last_flush = time.monotonic()
+
+    def start_timer(self) -> None:
+        """Flush pending lines in the background every ``max_delay`` seconds."""
+        def run() -> None:
+            while not self._stop.wait(self.max_delay):
+                try:
+                    self.flush()
+                except OSError as exc:
+                    print(f"WARNING: could not write {self.path}: {exc}", file=sys.stderr)
+
+        self._timer = threading.Thread(target=run, name="activation-log-flush", daemon=True)
+        self._timer.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+def format_matches(matches: List[SkillMatch]) -> str:
+    if not matches:
+        return ""
+    lines = ["🎯 DETECTED MATCHES:"]
+    for m in matches:
+        reasons = ", ".join(m.keywords + [f"/{p}/" for p in m.intents])
+        lines.append(f"  - {m.skill} (score {m.score}, {m.priority}, {m.enforcement}): {reasons}")
+    return "\n".join(lines)
+
+
+def _prompt_from_stdin() -> str:
+    raw = sys.stdin.read()
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return raw
+    return data.get("prompt", "") if isinstance(data, dict) else raw
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Match prompts against .claude/skill-rules.json.")
+    parser.add_argument("--rules", default=None, help="Rules file (default: .claude/skill-rules.json)")
+    parser.add_argument("--log", default=None, help="Activation log (default: .claude/logs/skill-activations.log)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    match = sub.add_parser("match", help="Match one prompt")
+    match.add_argument("--prompt", default=None)
+    match.add_argument("--json", action="store_true")
+    sub.add_parser("serve", help="Resident mode: JSON lines in, JSON lines out")
+    args = parser.parse_args(argv)
+
+    root = get_repo_root()
+    rules_path = Path(args.rules) if args.rules else root / ".claude" / "skill-rules.json"
+    if not rules_path.is_file():
+        print(f"ERROR: Rules file not found: {rules_path}", file=sys.stderr)
+        return 1
+    log = ActivationLog(Path(args.log) if args.log else root / ".claude" / "logs" / "skill-activations.log")
+    cache_path = cache_dir(root) / CACHE_FILE
+
+    try:
+        if args.command == "match":
+            prompt = args.prompt if args.prompt is not None else _prompt_from_stdin()
+            matches = load_matcher(rules_path, cache_path).match(prompt)
+            log.record(prompt, matches)
+            if args.json:
+                print(json.dumps([asdict(m) for m in matches]))
+            elif matches:
+                print(format_matches(matches))
+            return 0
+
+        # Killed between batches (SIGTERM from the harness, or a session
+        # ending), still write what is buffered: exit through ``finally``.
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        log.start_timer()
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = {"prompt": line.rstrip("\n")}
+            prompt = request.get("prompt", "") if isinstance(request, dict) else str(request)
+            # Re-hashing per request picks up edits to the rules file.
+            matches = load_matcher(rules_path, cache_path).match(prompt)
+            log.record(prompt, matches)
+            print(json.dumps([asdict(m) for m in matches]), flush=True)
+        return 0
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""Parallel executor for ``tasks.md`` (phase 11, IMPLEMENT).
+
+Parses a task list written from ``templates/tasks-template.md`` and runs it
+as a dependency graph instead of top to bottom:
+
+- **Phases.** Setup and Foundational phases block everything after them.
+  User story phases (``[USn]`` tasks or a "User Story" heading) depend only
+  on the last blocking phase, so stories run side by side. A later
+  non-story phase (Polish) waits for every story before it. Each phase ends
+  in a barrier node where its ``**Checkpoint**`` command, if any, runs.
+- **Within a phase.** Tasks run in listed order, except that a run of
+  consecutive ``[P]`` tasks forms one parallel group.
+- **Explicit dependencies.** ``(depends on T012, T013)`` adds edges.
+- **Files.** Tasks naming the same file, or a file inside a directory the
+  other names, never overlap: the later one waits for the earlier one.
+
+Ready tasks are dispatched to a bounded worker pool, longest remaining
+path first. Each worker runs a pluggable shell command and each finished
+task is flipped from ``[ ]`` to ``[X]`` with an atomic rewrite, so an
+interrupted run resumes where it stopped. The report gives the critical
+path and the parallelism actually achieved.
+
+Usage: task_scheduler.py [TASKS_MD] --command CMD [--workers N]
+                         [--checkpoint-command CMD] [--dry-run] [--json]
+
+CMD is run with ``sh -c``. ``{id}``, ``{description}``, ``{story}``,
+``{phase}`` and ``{files}`` are replaced with shell-quoted values, and the
+same values are exported as ``TASK_ID``, ``TASK_DESCRIPTION``, etc. Other
+braces are left alone. A task whose command cannot be run or whose
+checkbox cannot be written counts as failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_text  # noqa: E402
+
+TASK_RE = re.compile(r"^(\s*-\s+\[)([ xX])(\]\s+)(T\d+)\b(.*)$")
+PHASE_RE = re.compile(r"^##\s+Phase\s+([^:]+):\s*(.*)$")
+STORY_RE = re.compile(r"\[(US\d+)\]")
+PARALLEL_RE = re.compile(r"\[P\]")
+DEPENDS_RE = re.compile(r"\(depends on ([^)]*)\)", re.IGNORECASE)
+TASK_ID_RE = re.compile(r"T\d+")
+# Only these are substituted, so shell braces (${TASK_ID}, {a,b}) pass through
+PLACEHOLDER_RE = re.compile(r"\{(id|description|story|phase|files)\}")
+# Paths such as src/models/user.py, tests/contract/, .env.example, package.json
+PATH_RE = re.compile(r"(?<![\w/])(?:\.?[\w@-]+(?:\.[\w-]+)*/)+(?:[\w@.-]+)?|(?<![\w/])\.?[\w-]+\.[A-Za-z][\w]{0,9}\b")
+NOT_PATHS = {"e.g.", "i.e.", "etc."}
+
+
+@dataclass
+class Task:
+    id: str
+    description: str
+    done: bool
+    parallel: bool
+    story: str
+    phase: str
+    files: List[str]
+    depends_on: List[str]
+
+
+@dataclass
+class Phase:
+    key: str
+    title: str
+    is_story: bool = False
+    checkpoint: str = ""
+    tasks: List[str] = field(default_factory=list)
+
+    @property
+    def barrier(self) -> str:
+        return f"checkpoint:{self.key}"
+
+
+def extract_files(description: str) -> List[str]:
+    files = []
+    for match in PATH_RE.finditer(description):
+        path = match.group(0).rstrip(".,;:")
+        if path and path.lower() not in NOT_PATHS and not path.startswith("/") and path not in files:
+            files.append(path)
+    return files
+
+
+def parse_tasks(text: str) -> Tuple[List[Phase], Dict[str, Task]]:
+    phases: List[Phase] = []
+    tasks: Dict[str, Task] = {}
+    current: Optional[Phase] = None
+
+    for line in text.splitlines():
+        heading = PHASE_RE.match(line)
+        if heading:
+            current = Phase(heading.group(1).strip(), heading.group(2).strip())
+            current.is_story = "user story" in current.title.lower()
+            phases.append(current)
+            continue
+        if line.startswith("**Checkpoint**") and current is not None:
+            current.checkpoint = line.split(":", 1)[-1].strip()
+            continue
+        match = TASK_RE.match(line)
+        if not match:
+            continue
+        if current is None:
+            current = Phase("0", "Tasks")
+            phases.append(current)
+        task_id, rest = match.group(4), match.group(5)
+        story = STORY_RE.search(rest)
+        depends = DEPENDS_RE.search(rest)
+        description = STORY_RE.sub("", PARALLEL_RE.sub("", rest)).strip()
+        task = Task(
+            id=task_id,
+            description=" ".join(description.split()),
+            done=match.group(2) in "xX",
+            parallel=bool(PARALLEL_RE.search(rest)),
+            story=story.group(1) if story else "",
+            phase=current.key,
+            files=extract_files(DEPENDS_RE.sub("", description)),
+            depends_on=TASK_ID_RE.findall(depends.group(1)) if depends else [],
+        )
+        if task_id in tasks:
+            raise ValueError(f"Duplicate task id {task_id}")
+        tasks[task_id] = task
+        current.tasks.append(task_id)
+        if task.story:
+            current.is_story = True
+    return phases, tasks
+
+
+def _paths_conflict(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if a.endswith("/") and b.startswith(a):
+        return True
+    return b.endswith("/") and a.startswith(b)
+
+
+def build_graph(phases: List[Phase], tasks: Dict[str, Task]) -> Dict[str, Set[str]]:
+    """Node -> prerequisites; nodes are task ids plus one barrier per phase."""
+    deps: Dict[str, Set[str]] = {}
+    base: List[str] = []           # barrier(s) the next phase starts after
+    stories_since: List[str] = []  # story barriers since the last blocking phase
+
+    for phase in phases:
+        entry = list(base) if phase.is_story else base + stories_since
+        previous: List[str] = entry   # what the next task in sequence waits for
+        group: List[str] = []         # current run of [P] tasks
+        for task_id in phase.tasks:
+            task = tasks[task_id]
+            if task.parallel:
+                group.append(task_id)
+                deps[task_id] = set(previous)
+            else:
+                if group:
+                    previous, group = group, []
+                deps[task_id] = set(previous)
+                previous = [task_id]
+            deps[task_id].update(d for d in task.depends_on if d in tasks)
+        deps[phase.barrier] = set(previous + group) if phase.tasks else set(entry)
+
+        if phase.is_story:
+            stories_since.append(phase.barrier)
+        else:
+            base, stories_since = [phase.barrier], []
+
+    order = [task_id for phase in phases for task_id in phase.tasks]
+    for i, later in enumerate(order):
+        for earlier in order[:i]:
+            if any(_paths_conflict(a, b) for a in tasks[earlier].files for b in tasks[later].files):
+                deps[later].add(earlier)
+    return deps
+
+
+def topological_order(deps: Dict[str, Set[str]]) -> List[str]:
+    indegree = {node: len(prereqs) for node, prereqs in deps.items()}
+    dependents: Dict[str, List[str]] = {node: [] for node in deps}
+    for node, prereqs in deps.items():
+        for prereq in prereqs:
+            dependents[prereq].append(node)
+    ready = [node for node, n in indegree.items() if n == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in dependents[node]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if len(order) != len(deps):
+        cycle = sorted(node for node, n in indegree.items() if n > 0)
+        raise ValueError(f"Dependency cycle among: {', '.join(cycle)}")
+    return order
+
+
+def critical_path(deps: Dict[str, Set[str]], weights: Dict[str, float]) -> Tuple[float, List[str]]:
+    """Longest weighted path; nodes without a weight (barriers, done tasks) cost nothing."""
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+    for node in topological_order(deps):
+        best = max(deps[node], key=lambda p: finish[p], default=None)
+        finish[node] = (finish[best] if best else 0.0) + weights.get(node, 0.0)
+        via[node] = best
+    if not finish:
+        return 0.0, []
+    node: Optional[str] = max(finish, key=finish.get)
+    length, path = finish[node], []
+    while node is not None:
+        if node in weights:
+            path.append(node)
+        node = via[node]
+    return length, path[::-1]
+
+
+def mark_done(path: Path, task_id: str) -> None:
+    """Flip ``- [ ] <task_id>`` to ``- [X]`` with an atomic rewrite."""
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    for i, line in enumerate(lines):
+        match = TASK_RE.match(line.rstrip("\n"))
+        if match and match.group(4) == task_id:
+            lines[i] = f"{match.group(1)}X{match.group(3)}{match.group(4)}{match.group(5)}" + line[len(line.rstrip("\n")):]
+            break
+    atomic_write_text(path, "".join(lines))
+
+
+@dataclass
+class RunReport:
+    wall: float = 0.0
+    work: float = 0.0
+    max_concurrency: int = 0
+    completed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    durations: Dict[str, float] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    critical_length: float = 0.0
+
+    @property
+    def parallelism(self) -> float:
+        return self.work / self.wall if self.wall else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_seconds": round(self.wall, 3),
+            "work_seconds": round(self.work, 3),
+            "achieved_parallelism": round(self.parallelism, 2),
+            "max_concurrency": self.max_concurrency,
+            "critical_path": self.critical_path,
+            "critical_path_seconds": round(self.critical_length, 3),
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+
+class TaskScheduler:
+    """Runs a parsed task graph through a bounded worker pool."""
+
+    def __init__(self, tasks_path: Path, command: str, workers: int = 4,
+                 checkpoint_command: str = "", write_back: bool = True):
+        self.path = Path(tasks_path)
+        self.phases, self.tasks = parse_tasks(self.path.read_text(encoding="utf-8"))
+        self.deps = build_graph(self.phases, self.tasks)
+        topological_order(self.deps)  # fail fast on cycles
+        self.command = command
+        self.workers = max(1, workers)
+        self.checkpoint_command = checkpoint_command
+        self.write_back = write_back
+        self._write_lock = threading.Lock()
+
+    def _values(self, node: str) -> Dict[str, str]:
+        if node.startswith("checkpoint:"):
+            key = node.split(":", 1)[1]
+            phase = next(p for p in self.phases if p.key == key)
+            return {"id": node, "description": phase.checkpoint, "story": "", "phase": key, "files": ""}
+        task = self.tasks[node]
+        return {"id": task.id, "description": task.description, "story": task.story,
+                "phase": task.phase, "files": " ".join(task.files)}
+
+    def _execute(self, node: str) -> Tuple[str, bool, float]:
+        start = time.perf_counter()
+        is_barrier = node.startswith("checkpoint:")
+        template = self.checkpoint_command if is_barrier else self.command
+        ok = True
+        try:
+            if template and (not is_barrier or self._values(node)["description"]):
+                values = self._values(node)
+                command = PLACEHOLDER_RE.sub(lambda m: shlex.quote(values[m.group(1)]), template)
+                env = dict(os.environ, **{f"TASK_{k.upper()}": v for k, v in values.items()})
+                ok = subprocess.run(command, shell=True, env=env).returncode == 0
+            if ok and not is_barrier and self.write_back:
+                with self._write_lock:
+                    mark_done(self.path, node)
+        except Exception as exc:  # one task's failure, not the run's
+            print(f"ERROR: {node}: {exc}", file=sys.stderr)
+            ok = False
+        return node, ok, time.perf_counter() - start
+
+    def _priorities(self) -> Dict[str, float]:
+        """Longest remaining path (unit weights) from each node to the end."""
+        dependents: Dict[str, List[str]] = {node: [] for node in self.deps}
+        for node, prereqs in self.deps.items():
+            for prereq in prereqs:
+                dependents[prereq].append(node)
+        rank: Dict[str, float] = {}
+        for node in reversed(topological_order(self.deps)):
+            weight = 0.0 if node.startswith("checkpoint:") else 1.0
+            rank[node] = weight + max((rank[c] for c in dependents[node]), default=0.0)
+        return rank
+
+    def run(self) -> RunReport:
+        report = RunReport()
+        remaining = {node: set(prereqs) for node, prereqs in self.deps.items()}
+        dependents: Dict[str, List[str]] = {node: [] for node in self.deps}
+        for node, prereqs in self.deps.items():
+            for prereq in prereqs:
+                dependents[prereq].append(node)
+        rank = self._priorities()
+
+        ready: List[str] = []
+        blocked: Set[str] = set()
+
+        def finish(node: str) -> None:
+            for child in dependents[node]:
+                remaining[child].discard(node)
+                if not remaining[child] and child not in blocked:
+                    ready.append(child)
+
+        def block(node: str) -> None:
+            for child in dependents[node]:
+                if child not in blocked:
+                    blocked.add(child)
+                    if not child.startswith("checkpoint:"):
+                        report.skipped.append(child)
+                    block(child)
+
+        # Resume: tasks already marked [X], and barriers behind nothing but
+        # such tasks, are done before the run starts.
+        already_done: Set[str] = set()
+        for node in topological_order(self.deps):
+            if self.tasks[node].done if node in self.tasks else self.deps[node] <= already_done:
+                already_done.add(node)
+        for node in self.deps:
+            remaining[node] -= already_done
+            if node not in already_done and not remaining[node]:
+                ready.append(node)
+
+        start = time.perf_counter()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while ready or running:
+                ready.sort(key=lambda n: rank[n])
+                while ready and len(running) < self.workers:
+                    node = ready.pop()
+                    running[pool.submit(self._execute, node)] = node
+                report.max_concurrency = max(report.max_concurrency,
+                                             sum(1 for n in running.values() if n in self.tasks))
+                if not running:
+                    continue
+                settled, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in settled:
+                    node = running.pop(future)
+                    _, ok, elapsed = future.result()
+                    if node in self.tasks:
+                        report.durations[node] = elapsed
+                        report.work += elapsed
+                    if ok:
+                        if node in self.tasks:
+                            report.completed.append(node)
+                        finish(node)
+                    else:
+                        if node in self.tasks:
+                            report.failed.append(node)
+                        block(node)
+        report.wall = time.perf_counter() - start
+        report.critical_length, report.critical_path = critical_path(self.deps, report.durations)
+        return report
+
+
+def plan_waves(deps: Dict[str, Set[str]], tasks: Dict[str, Task]) -> List[List[str]]:
+    """Tasks grouped by earliest start step with unlimited workers."""
+    level: Dict[str, int] = {}
+    for node in topological_order(deps):
+        start = max((level[p] for p in deps[node]), default=0)
+        level[node] = start + (1 if node in tasks and not tasks[node].done else 0)
+    waves: Dict[int, List[str]] = {}
+    for node, step in level.items():
+        if node in tasks and not tasks[node].done:
+            waves.setdefault(step, []).append(node)
+    return [sorted(waves[step]) for step in sorted(waves)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run tasks.md as a parallel dependency graph.")
+    parser.add_argument("tasks", nargs="?", default=None, help="tasks.md (default: current feature's)")
+    parser.add_argument("--command", default="", help="Shell command run for each task")
+    parser.add_argument("--checkpoint-command", default="", help="Shell command run at each phase checkpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--dry-run", action="store_true", help="Print the parallel plan without running anything")
+    parser.add_argument("--no-write-back", action="store_true", help="Do not mark finished tasks [X]")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.tasks:
+        tasks_path = Path(args.tasks)
+    else:
+        from feature_paths import get_feature_paths
+        tasks_path = Path(get_feature_paths().TASKS)
+    if not tasks_path.is_file():
+        print(f"ERROR: tasks.md not found: {tasks_path}", file=sys.stderr)
+        print("Run /sp.tasks first to create the task list.", file=sys.stderr)
+        return 1
+
+    try:
+        if args.dry_run:
+            phases, tasks = parse_tasks(tasks_path.read_text(encoding="utf-8"))
+            deps = build_graph(phases, tasks)
+            waves = plan_waves(deps, tasks)
+            length, path = critical_path(deps, {t: 1.0 for t in tasks if not tasks[t].done})
+            pending = sum(1 for t in tasks.values() if not t.done)
+            if args.json:
+                print(json.dumps({"waves": waves, "critical_path": path, "pending": pending}))
+                return 0
+            for step, wave in enumerate(waves, 1):
+                print(f"Step {step:>2}: {' '.join(wave)}")
+            print(f"\n{pending} pending tasks in {len(waves)} steps "
+                  f"(critical path {int(length)}: {' → '.join(path)})")
+            return 0
+
+        if not args.command:
+            print("ERROR: --command is required unless --dry-run is given", file=sys.stderr)
+            return 1
+        scheduler = TaskScheduler(tasks_path, args.command, args.workers,
+                                  args.checkpoint_command, write_back=not args.no_write_back)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+
+    report = scheduler.run()
+    if args.json:
+        print(json.dumps(report.to_dict()))
+    else:
+        print(f"✓ {len(report.completed)} completed, {len(report.failed)} failed, {len(report.skipped)} skipped")
+        print(f"Wall time: {report.wall:.2f}s for {report.work:.2f}s of work "
+              f"(parallelism {report.parallelism:.2f}x, peak {report.max_concurrency} workers)")
+        print(f"Critical path ({report.critical_length:.2f}s): {' → '.join(report.critical_path)}")
+        if report.failed:
+            print(f"Failed: {', '.join(report.failed)}; skipped dependents: {', '.join(report.skipped)}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
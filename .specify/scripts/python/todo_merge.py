@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Concurrent-safe merge engine for the shared ``.specify/todos.json``.
+
+Several sessions may end at once and each one read-merge-writes the same
+file. This module makes that safe without making readers wait:
+
+- **Per-field merge (CRDT).** Every field merges by its own rule, so the
+  result does not depend on which writer wins the race:
+  ``status`` is a max-register (completed > in_progress > pending),
+  ``activeForm``/``updated_*`` are last-writer-wins keyed by
+  ``(updated_at or created_at, session)``, ``created_*`` keep the earliest
+  stamp, and ``contributors``/``sessions`` are grow-only sets.
+- **Optimistic concurrency.** The document carries a ``version`` stamp. A
+  writer merges against version N, writes a temp file, claims N+1 by
+  exclusively creating ``.specify/.todos-claims/v<N+1>``, confirms the file
+  is still at N and publishes with ``os.replace``. Losing a claim means
+  someone else committed first: re-read, re-merge, retry with backoff.
+- **Lock fallback.** After ``max_retries`` optimistic attempts a writer
+  takes ``todos.json.lock`` (``fcntl.flock``); only lock holders may break
+  a claim abandoned by a crashed writer. A claim records its owner's PID
+  and host. It is broken once it is older than ``STALE_CLAIM_SECONDS``
+  and its owner is gone, so a slow writer keeps its claim. Past
+  ``ABANDONED_CLAIM_SECONDS`` it is broken regardless, for an owner that
+  is stuck or on another host, or whose PID was reused.
+- **Lock-free readers.** ``os.replace`` is atomic, so ``read_document``
+  always sees a complete file and never takes a lock.
+
+Usage:
+  todo_merge.py commit --input FILE   # merge a local todos.json-shaped document
+  todo_merge.py show                  # lock-free read
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: optimistic path only
+    fcntl = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import file_mode, get_repo_root, specify_dir  # noqa: E402
+
+STATUS_PRIORITY = {"pending": 0, "in_progress": 1, "completed": 2}
+
+CLAIMS_DIR = ".todos-claims"
+STALE_CLAIM_SECONDS = 10.0
+ABANDONED_CLAIM_SECONDS = 300.0
+KEEP_CLAIMS = 256
+
+
+# -- per-field merge ---------------------------------------------------------
+
+
+def _write_stamp(todo: Dict[str, Any]) -> Tuple[str, str, str]:
+    # activeForm is the final tie-break so equal stamps still merge deterministically
+    return (
+        todo.get("updated_at") or todo.get("created_at") or "",
+        todo.get("updated_by") or todo.get("created_by") or "",
+        todo.get("activeForm") or "",
+    )
+
+
+def _union(first: List[str], second: List[str]) -> List[str]:
+    """Grow-only set union, keeping first-seen order."""
+    seen = dict.fromkeys(first)
+    seen.update(dict.fromkeys(second))
+    return list(seen)
+
+
+def merge_todo(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Join two replicas of the same TODO (same ``content``).
+
+    Commutative, associative and idempotent, so concurrent writers converge
+    whatever order their merges land in.
+    """
+    newer, older = (b, a) if _write_stamp(b) > _write_stamp(a) else (a, b)
+    merged = dict(older)
+    merged.update(newer)
+
+    status_a, status_b = a.get("status", "pending"), b.get("status", "pending")
+    rank = STATUS_PRIORITY.get
+    merged["status"] = status_a if (rank(status_a, -1), status_a) >= (rank(status_b, -1), status_b) else status_b
+
+    created = [(t["created_at"], t.get("created_by") or "") for t in (a, b) if t.get("created_at")]
+    if created:
+        merged["created_at"], merged["created_by"] = min(created)
+
+    merged["contributors"] = _union(a.get("contributors", []), b.get("contributors", []))
+    return merged
+
+
+def merge_documents(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Join two ``todos.json`` documents; the ``version`` stamp is left to the caller."""
+    todos: Dict[str, Dict[str, Any]] = {}
+    for todo in base.get("todos", []) + incoming.get("todos", []):
+        content = todo.get("content")
+        if not content:
+            continue
+        todos[content] = merge_todo(todos[content], todo) if content in todos else dict(todo)
+
+    sessions = _union(base.get("sessions", []), incoming.get("sessions", []))
+    last = max((base, incoming), key=lambda d: (d.get("last_updated") or "", d.get("last_session") or ""))
+    collaboration = dict(last.get("collaboration") or {})
+    collaboration["total_sessions"] = len(sessions)
+    return {
+        "last_updated": last.get("last_updated", ""),
+        "last_session": last.get("last_session", ""),
+        "sessions": sessions,
+        "project": base.get("project") or incoming.get("project", ""),
+        "collaboration": collaboration,
+        "todos": list(todos.values()),
+    }
+
+
+# -- storage -----------------------------------------------------------------
+
+
+class CorruptDocumentError(ValueError):
+    """``todos.json`` exists but is not a readable document."""
+
+
+def read_document(path: Path) -> Tuple[Dict[str, Any], int]:
+    """Lock-free read: ``(document, version)``; an empty document if missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            document = json.load(handle)
+    except FileNotFoundError:
+        return {"sessions": [], "todos": []}, 0
+    except ValueError as exc:  # publishes are atomic, so this is not a torn write
+        raise CorruptDocumentError(f"{path} is not valid JSON: {exc}") from exc
+    try:
+        return document, int(document.get("version", 0))
+    except (AttributeError, TypeError, ValueError):
+        raise CorruptDocumentError(f"{path} is not a todos.json document") from None
+
+
+def _owner_alive(marker: Path) -> bool:
+    """Whether the process that wrote ``marker`` is known to be running."""
+    try:
+        pid, host = marker.read_text(encoding="utf-8").split()
+        pid = int(pid)
+    except (OSError, ValueError):
+        return False  # claimed by an older writer, or not written yet
+    if host != socket.gethostname() or os.name == "nt":
+        return False  # cannot check; age alone decides
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+@dataclass
+class CommitResult:
+    version: int
+    attempts: int
+    used_lock: bool
+
+
+class TodoMergeEngine:
+    """Optimistic, multi-writer commits to one ``todos.json``."""
+
+    def __init__(self, path: Path, max_retries: int = 8, backoff: float = 0.005):
+        self.path = Path(path)
+        self.claims = self.path.parent / CLAIMS_DIR
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def read(self) -> Tuple[Dict[str, Any], int]:
+        return read_document(self.path)
+
+    def commit(self, local: Dict[str, Any]) -> CommitResult:
+        """Merge ``local`` into the shared document; retries until it lands."""
+        self.claims.mkdir(parents=True, exist_ok=True)
+        for attempt in range(1, self.max_retries + 1):
+            version = self._try_commit(local, break_stale=False)
+            if version is not None:
+                return CommitResult(version, attempt, used_lock=False)
+            time.sleep(random.uniform(0, self.backoff * (2 ** min(attempt, 6))))
+
+        attempts = self.max_retries
+        with self._lock():
+            while True:
+                attempts += 1
+                version = self._try_commit(local, break_stale=True)
+                if version is not None:
+                    return CommitResult(version, attempts, used_lock=True)
+                time.sleep(random.uniform(0, self.backoff))
+
+    def _try_commit(self, local: Dict[str, Any], break_stale: bool) -> Optional[int]:
+        current, version = self.read()
+        merged = merge_documents(current, local)
+        if version and merged == {key: value for key, value in current.items() if key != "version"}:
+            return version  # nothing new to publish
+        merged["version"] = version + 1
+        tmp = self._write_temp(merged)
+        try:
+            if not self._claim(version + 1, break_stale):
+                return None
+            # Someone may have published N+1 and had its claim pruned, or we
+            # read a file that moved on since; only publish on top of N.
+            if self.read()[1] != version:
+                return None
+            os.replace(tmp, self.path)
+            tmp = None
+            self._prune(version + 1)
+            return version + 1
+        finally:
+            if tmp is not None:
+                os.unlink(tmp)
+
+    def _write_temp(self, document: Dict[str, Any]) -> str:
+        mode = file_mode(self.path)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(document, handle, indent=2, ensure_ascii=False)
+            handle.write("\n")
+        os.chmod(tmp, mode)
+        return tmp
+
+    def _claim(self, version: int, break_stale: bool) -> bool:
+        marker = self.claims / f"v{version}"
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(f"{os.getpid()} {socket.gethostname()}\n")
+            return True
+        if not break_stale or self.read()[1] >= version:
+            return False
+        try:
+            age = time.time() - marker.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if age < STALE_CLAIM_SECONDS or (age < ABANDONED_CLAIM_SECONDS and _owner_alive(marker)):
+            return False
+        # Abandoned by a crashed writer; only lock holders get here.
+        marker.unlink(missing_ok=True)
+        return self._claim(version, break_stale=False)
+
+    def _prune(self, version: int) -> None:
+        if version % 64:
+            return
+        for marker in self.claims.glob("v*"):
+            try:
+                if int(marker.name[1:]) <= version - KEEP_CLAIMS:
+                    marker.unlink(missing_ok=True)
+            except ValueError:
+                continue
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def default_path(repo_root: Optional[Path] = None) -> Path:
+    return specify_dir(repo_root or get_repo_root()) / "todos.json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent-safe merge for .specify/todos.json.")
+    parser.add_argument("--file", default=None, help="Shared document (default: .specify/todos.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    commit = sub.add_parser("commit", help="Merge a local todos.json-shaped document")
+    commit.add_argument("--input", required=True)
+    sub.add_parser("show", help="Print the shared document (never blocks)")
+    args = parser.parse_args(argv)
+
+    engine = TodoMergeEngine(Path(args.file) if args.file else default_path())
+    try:
+        if args.command == "show":
+            document, _ = engine.read()
+            print(json.dumps(document, indent=2, ensure_ascii=False))
+            return 0
+        local = json.loads(Path(args.input).read_text(encoding="utf-8"))
+        result = engine.commit(local)
+    except (OSError, ValueError) as exc:  # includes CorruptDocumentError
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+    suffix = " (lock fallback)" if result.used_lock else ""
+    print(f"✓ Committed version {result.version} after {result.attempts} attempt(s){suffix}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""Indexed, incremental TODO store for session recovery.
+
+Replaces the load-merge-rewrite cycle on ``.specify/todos.json`` and the
+full snapshots in ``.specify/todo-history/`` with a SQLite database in WAL
+mode (``.specify/todos.db``):
+
+- ``todos``: one row per TODO, keyed by the SHA-1 of its ``content``
+- ``contributors``: (todo, session) pairs, indexed both ways
+- ``changes``: append-only log of what each save changed; this is the
+  history, stored as deltas instead of snapshots
+
+A save only looks up the incoming items by key and writes the ones whose
+state hash differs, so its cost is O(changed items) rather than O(store).
+``status``, ``contributors`` and ``history`` are answered from indexes.
+``export`` still produces the ``todos.example.json`` schema, optionally
+as of an earlier session.
+
+Fields merge independently, with the same rules as ``todo_merge.py``:
+``status`` by priority (completed > in_progress > pending), ``activeForm``
+last-writer-wins, and every saving session is recorded as a contributor.
+``sync`` exchanges state with the shared ``todos.json`` through that
+module's optimistic multi-writer commit.
+
+Usage:
+  todo_store.py save [--session ID] [--input FILE]   # JSON list or {"todos": [...]}
+  todo_store.py status | contributors | history [--limit N]
+  todo_store.py export [--output FILE] [--as-of SESSION]
+  todo_store.py import [FILE]                        # migrate a todos.json
+  todo_store.py sync [--file FILE]                   # merge with shared todos.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import atomic_write_json, get_repo_root, read_json, specify_dir  # noqa: E402
+from todo_merge import STATUS_PRIORITY, CorruptDocumentError, TodoMergeEngine  # noqa: E402
+
+DB_FILE = "todos.db"
+JSON_FILE = "todos.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    id          TEXT NOT NULL UNIQUE,
+    first_saved TEXT NOT NULL,
+    last_saved  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todos (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    key         TEXT NOT NULL UNIQUE,
+    content     TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    active_form TEXT NOT NULL DEFAULT '',
+    created_by  TEXT NOT NULL,
+    created_at  TEXT NOT NULL,
+    updated_by  TEXT,
+    updated_at  TEXT,
+    state_hash  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_todos_status ON todos(status);
+CREATE TABLE IF NOT EXISTS contributors (
+    todo_seq    INTEGER NOT NULL,
+    session_seq INTEGER NOT NULL,
+    PRIMARY KEY (todo_seq, session_seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_contributors_session ON contributors(session_seq);
+CREATE TABLE IF NOT EXISTS changes (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_seq INTEGER NOT NULL,
+    saved_at    TEXT NOT NULL,
+    todo_seq    INTEGER NOT NULL,
+    op          TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    active_form TEXT NOT NULL,
+    state_hash  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_session ON changes(session_seq);
+CREATE INDEX IF NOT EXISTS idx_changes_todo ON changes(todo_seq, id);
+"""
+
+
+def now() -> str:
+    return datetime.now().isoformat(timespec="microseconds")
+
+
+def todo_key(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def state_hash(status: str, active_form: str) -> str:
+    return hashlib.sha1(f"{status}\0{active_form}".encode("utf-8")).hexdigest()
+
+
+def default_session_id() -> str:
+    return os.environ.get("CLAUDE_SESSION_ID") or f"session-{datetime.now():%Y%m%d-%H%M%S}"
+
+
+def merge_status(current: str, incoming: str) -> str:
+    """Status priority: completed > in_progress > pending."""
+    if STATUS_PRIORITY.get(incoming, -1) >= STATUS_PRIORITY.get(current, -1):
+        return incoming
+    return current
+
+
+class TodoStore:
+    """SQLite-backed TODO store; one instance per process."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def open_default(cls, repo_root: Optional[Path] = None) -> "TodoStore":
+        """Open ``.specify/todos.db``, migrating ``todos.json`` on first use."""
+        root = repo_root or get_repo_root()
+        base = specify_dir(root)
+        fresh = not (base / DB_FILE).exists()
+        store = cls(base / DB_FILE)
+        legacy = base / JSON_FILE
+        if fresh and legacy.exists():
+            store.import_document(read_json(legacy, {}))
+        if store.get_meta("project") is None:
+            store.set_meta("project", root.name)
+        return store
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "TodoStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- metadata ---------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT INTO meta(key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _session_seq(self, session: str, saved_at: str, saving: bool = True) -> int:
+        # Only a session's own save moves its last_saved; importing a
+        # document that lists it (``sync``) just makes sure it exists.
+        conflict = "DO UPDATE SET last_saved = excluded.last_saved" if saving else "DO NOTHING"
+        self.conn.execute(
+            f"INSERT INTO sessions(id, first_saved, last_saved) VALUES (?, ?, ?) ON CONFLICT(id) {conflict}",
+            (session, saved_at, saved_at),
+        )
+        return self.conn.execute("SELECT seq FROM sessions WHERE id = ?", (session,)).fetchone()["seq"]
+
+    # -- writes -----------------------------------------------------------
+
+    def save(self, session: str, items: Iterable[Dict[str, Any]], saved_at: Optional[str] = None) -> Dict[str, int]:
+        """Merge one session's TODO list; returns counts of what changed."""
+        saved_at = saved_at or now()
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            sess = self._session_seq(session, saved_at)
+            for item in items:
+                content = item.get("content", "")
+                if not content:
+                    continue
+                status = item.get("status", "pending")
+                active_form = item.get("activeForm", "")
+                self._merge_item(sess, session, saved_at, content, status, active_form, stats)
+            self.set_meta("last_updated", saved_at)
+            self.set_meta("last_session", session)
+            self.set_meta("last_contributor", session)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return stats
+
+    def _merge_item(self, sess, session, saved_at, content, status, active_form, stats, created=None) -> None:
+        conn = self.conn
+        key = todo_key(content)
+        row = conn.execute(
+            "SELECT seq, status, active_form, state_hash, COALESCE(updated_at, created_at) AS stamp "
+            "FROM todos WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None:
+            digest = state_hash(status, active_form)
+            created_by, created_at = created or (session, saved_at)
+            seq = conn.execute(
+                "INSERT INTO todos(key, content, status, active_form, created_by, created_at, state_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, content, status, active_form, created_by, created_at, digest),
+            ).lastrowid
+            conn.execute("INSERT INTO contributors VALUES (?, ?)", (seq, sess))
+            self._log(sess, saved_at, seq, "add", status, active_form, digest)
+            stats["added"] += 1
+            return
+
+        seq = row["seq"]
+        new_status = merge_status(row["status"], status)
+        new_form = active_form if active_form and saved_at >= row["stamp"] else row["active_form"]
+        digest = state_hash(new_status, new_form)
+        joined = conn.execute("INSERT OR IGNORE INTO contributors VALUES (?, ?)", (seq, sess)).rowcount
+
+        if digest != row["state_hash"]:
+            conn.execute(
+                "UPDATE todos SET status = ?, active_form = ?, updated_by = ?, updated_at = ?, state_hash = ? "
+                "WHERE seq = ?",
+                (new_status, new_form, session, saved_at, digest, seq),
+            )
+            self._log(sess, saved_at, seq, "update", new_status, new_form, digest)
+            stats["updated"] += 1
+        elif joined:
+            # No state change, but the contributor list grew; keep history exact.
+            self._log(sess, saved_at, seq, "touch", new_status, new_form, digest)
+            stats["unchanged"] += 1
+        else:
+            stats["unchanged"] += 1
+
+    def _log(self, sess, saved_at, seq, op, status, active_form, digest) -> None:
+        self.conn.execute(
+            "INSERT INTO changes(session_seq, saved_at, todo_seq, op, status, active_form, state_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (sess, saved_at, seq, op, status, active_form, digest),
+        )
+
+    def import_document(self, document: Dict[str, Any]) -> Dict[str, int]:
+        """Load a ``todos.json`` document (the legacy format) into the store."""
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+        todos = document.get("todos", []) if isinstance(document, dict) else []
+        if not todos:
+            return stats
+        if document.get("project") and self.get_meta("project") is None:
+            self.set_meta("project", document["project"])
+        fallback = document.get("last_session") or "imported"
+        stamp = document.get("last_updated") or now()
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for session in document.get("sessions", []):
+                self._session_seq(session, stamp, saving=False)
+            for item in todos:
+                contributors = item.get("contributors") or [item.get("created_by") or fallback]
+                created = (item.get("created_by") or contributors[0], item.get("created_at") or stamp)
+                for session in contributors:
+                    sess = self._session_seq(session, stamp, saving=False)
+                    self._merge_item(
+                        sess, session, item.get("updated_at") or created[1], item.get("content", ""),
+                        item.get("status", "pending"), item.get("activeForm", ""), stats, created,
+                    )
+                if item.get("updated_by") and item.get("content"):
+                    conn.execute(
+                        "UPDATE todos SET updated_by = ?, updated_at = ? WHERE key = ?",
+                        (item["updated_by"], item.get("updated_at") or stamp, todo_key(item["content"])),
+                    )
+            self.set_meta("last_updated", stamp)
+            self.set_meta("last_session", fallback)
+            last_contributor = (document.get("collaboration") or {}).get("last_contributor")
+            self.set_meta("last_contributor", last_contributor or fallback)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return stats
+
+    # -- reads ------------------------------------------------------------
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUS_PRIORITY}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM todos GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def in_progress(self, limit: int = 20) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT content, active_form FROM todos WHERE status = 'in_progress' ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+
+    def contributors(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT s.id, s.first_saved, s.last_saved, "
+            "  (SELECT COUNT(*) FROM contributors c WHERE c.session_seq = s.seq) AS touched "
+            "FROM sessions s ORDER BY s.seq"
+        )
+        return [dict(row) for row in rows]
+
+    def history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent sessions with the size of their delta."""
+        rows = self.conn.execute(
+            "SELECT s.id, s.last_saved, "
+            "  SUM(c.op = 'add') AS added, SUM(c.op = 'update') AS updated, SUM(c.op = 'touch') AS touched "
+            "FROM (SELECT seq, id, last_saved FROM sessions ORDER BY seq DESC LIMIT ?) s "
+            "LEFT JOIN changes c ON c.session_seq = s.seq "
+            "GROUP BY s.seq ORDER BY s.seq DESC",
+            (limit,),
+        )
+        return [{k: (row[k] or 0) if k in ("added", "updated", "touched") else row[k] for k in row.keys()}
+                for row in rows]
+
+    def export_document(self, as_of: Optional[str] = None) -> Dict[str, Any]:
+        """Render the ``todos.example.json`` schema, optionally as of a session."""
+        conn = self.conn
+        sessions = [row["id"] for row in conn.execute("SELECT id FROM sessions ORDER BY seq")]
+        cutoff = None
+        last_updated = self.get_meta("last_updated") or now()
+        if as_of is not None:
+            session = conn.execute("SELECT seq, last_saved FROM sessions WHERE id = ?", (as_of,)).fetchone()
+            if session is None:
+                raise KeyError(f"Unknown session: {as_of}")
+            # The session's last change; a save that changed nothing (or saved
+            # an empty list) logs none, so use the last change before it.
+            row = conn.execute(
+                "SELECT MAX(id) AS id, MAX(saved_at) AS saved_at FROM changes WHERE session_seq = ?",
+                (session["seq"],),
+            ).fetchone()
+            if row["id"] is not None:
+                cutoff, last_updated = row["id"], row["saved_at"]
+            else:
+                previous = conn.execute(
+                    "SELECT MAX(id) FROM changes WHERE session_seq < ?", (session["seq"],)
+                ).fetchone()[0]
+                cutoff, last_updated = previous or 0, session["last_saved"]
+            sessions = sessions[: sessions.index(as_of) + 1]
+
+        names = {row["seq"]: row["id"] for row in conn.execute("SELECT seq, id FROM sessions")}
+        if cutoff is None:
+            membership = conn.execute("SELECT todo_seq, session_seq FROM contributors ORDER BY todo_seq, session_seq")
+        else:
+            membership = conn.execute(
+                "SELECT DISTINCT todo_seq, session_seq FROM changes WHERE id <= ? ORDER BY todo_seq, session_seq",
+                (cutoff,),
+            )
+        contributors: Dict[int, List[str]] = {}
+        for todo_seq, session_seq in membership:
+            contributors.setdefault(todo_seq, []).append(names[session_seq])
+
+        if cutoff is None:
+            rows = conn.execute("SELECT * FROM todos ORDER BY seq")
+        else:
+            # Each TODO's last state-changing entry at or before the cutoff
+            rows = conn.execute(
+                "SELECT t.seq, t.content, t.created_by, t.created_at, c.status, c.active_form, "
+                "  CASE WHEN c.op = 'update' THEN s.id END AS updated_by, "
+                "  CASE WHEN c.op = 'update' THEN c.saved_at END AS updated_at "
+                "FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY todo_seq ORDER BY id DESC) AS rn "
+                "      FROM changes WHERE id <= ? AND op != 'touch') c "
+                "JOIN todos t ON t.seq = c.todo_seq "
+                "JOIN sessions s ON s.seq = c.session_seq "
+                "WHERE c.rn = 1 ORDER BY t.seq",
+                (cutoff,),
+            )
+
+        todos = []
+        for row in rows:
+            item = {
+                "content": row["content"],
+                "status": row["status"],
+                "activeForm": row["active_form"],
+                "created_by": row["created_by"],
+                "created_at": row["created_at"],
+            }
+            if row["updated_by"]:
+                item["updated_by"] = row["updated_by"]
+                item["updated_at"] = row["updated_at"]
+            item["contributors"] = contributors.get(row["seq"], [])
+            todos.append(item)
+
+        last_session = as_of or self.get_meta("last_session") or (sessions[-1] if sessions else "")
+        last_contributor = as_of or self.get_meta("last_contributor") or last_session
+        return {
+            "last_updated": last_updated,
+            "last_session": last_session,
+            "sessions": sessions,
+            "project": self.get_meta("project") or "",
+            "collaboration": {"total_sessions": len(sessions), "last_contributor": last_contributor},
+            "todos": todos,
+        }
+
+
+def _load_items(source: Optional[str]) -> List[Dict[str, Any]]:
+    raw = sys.stdin.read() if source in (None, "-") else Path(source).read_text(encoding="utf-8")
+    data = json.loads(raw) if raw.strip() else []
+    if isinstance(data, dict):
+        data = data.get("todos", [])
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON list of TODOs or an object with a 'todos' list")
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Indexed TODO store for session recovery.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save = sub.add_parser("save", help="Merge a session's TODO list")
+    save.add_argument("--session", default=None, help="Session id (default: $CLAUDE_SESSION_ID)")
+    save.add_argument("--input", default="-", help="JSON file with TODOs (default: stdin)")
+
+    sub.add_parser("status", help="Show TODO counts and in-progress items")
+    sub.add_parser("contributors", help="Show sessions and how many TODOs each touched")
+    history = sub.add_parser("history", help="Show recent per-session deltas")
+    history.add_argument("--limit", type=int, default=10)
+
+    export = sub.add_parser("export", help="Write the todos.json schema")
+    export.add_argument("--output", default="-", help="File to write (default: stdout)")
+    export.add_argument("--as-of", default=None, help="Reconstruct the state after this session")
+
+    imp = sub.add_parser("import", help="Merge a legacy todos.json into the store")
+    imp.add_argument("file", nargs="?", default=None)
+
+    sync = sub.add_parser("sync", help="Merge with the shared todos.json (safe with concurrent writers)")
+    sync.add_argument("--file", default=None, help="Shared document (default: .specify/todos.json)")
+
+    args = parser.parse_args(argv)
+
+    with TodoStore.open_default() as store:
+        if args.command == "save":
+            try:
+                items = _load_items(args.input)
+            except (OSError, ValueError) as exc:
+                print(f"ERROR: {exc}", file=sys.stderr)
+                return 1
+            session = args.session or default_session_id()
+            stats = store.save(session, items)
+            print(f"✓ Saved session {session}: {stats['added']} added, "
+                  f"{stats['updated']} updated, {stats['unchanged']} unchanged")
+
+        elif args.command == "status":
+            counts = store.status_counts()
+            total = sum(counts.values())
+            print(f"TODOs: {total} total")
+            for status in ("completed", "in_progress", "pending"):
+                print(f"  {status:<12} {counts.get(status, 0)}")
+            for row in store.in_progress():
+                print(f"  → {row['content']}")
+
+        elif args.command == "contributors":
+            for row in store.contributors():
+                print(f"{row['id']}: {row['touched']} TODOs (first {row['first_saved']}, last {row['last_saved']})")
+
+        elif args.command == "history":
+            for row in store.history(args.limit):
+                print(f"{row['last_saved']}  {row['id']}: +{row['added']} ~{row['updated']} "
+                      f"({row['touched']} re-confirmed)")
+
+        elif args.command == "export":
+            try:
+                document = store.export_document(args.as_of)
+            except KeyError as exc:
+                print(f"ERROR: {exc.args[0]}", file=sys.stderr)
+                return 1
+            if args.output == "-":
+                print(json.dumps(document, indent=2, ensure_ascii=False))
+            else:
+                atomic_write_json(Path(args.output), document)
+
+        elif args.command == "import":
+            source = Path(args.file) if args.file else specify_dir(get_repo_root()) / JSON_FILE
+            document = read_json(source)
+            if document is None:
+                print(f"ERROR: Could not read {source}", file=sys.stderr)
+                return 1
+            stats = store.import_document(document)
+            print(f"✓ Imported {source}: {stats['added']} added, {stats['updated']} updated")
+
+        elif args.command == "sync":
+            shared = Path(args.file) if args.file else specify_dir(get_repo_root()) / JSON_FILE
+            try:
+                result = TodoMergeEngine(shared).commit(store.export_document())
+                merged, _ = TodoMergeEngine(shared).read()
+            except CorruptDocumentError as exc:
+                print(f"ERROR: {exc}", file=sys.stderr)
+                return 1
+            stats = store.import_document(merged)
+            print(f"✓ Synced {shared} at version {result.version}: "
+                  f"{stats['added']} added, {stats['updated']} updated from other sessions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""Single-pass workflow state scanner for ``/q-status`` and workflow-validator.
+
+Replaces the per-phase probes of the "Phase Artifact Detection" table
+(``[ -f .specify/*.json ]``, skill counts, ``grep "validated" logs``,
+``grep -c "\\[X\\]" tasks.md`` per feature) with one walk over
+``.specify/``, ``specs/``, ``.claude/logs/`` and ``.claude/skills/``:
+
+- Every file the table cares about is stat-ed once. Its extracted facts
+  (task counts, report grade, log matches, ...) are cached in
+  ``.specify/.cache/workflow-scan.json`` keyed by ``(mtime_ns, size)``, so
+  a re-check after one phase re-reads only the files that phase touched.
+- The git reflog is append-only: when it grows, only the new bytes are
+  searched. ``validated`` log lines are counted from the ``log_store.py``
+  summaries, which are incremental in the same way and cover rotated
+  segments.
+- The result is a structured snapshot written to
+  ``.specify/workflow-state.json``: every phase with its evidence, the
+  current phase, violations (skipped phases, features out of order) and
+  per-feature progress for COMPLEX mode. Skills/Agents utilization comes
+  from the ``log_store.py`` summary indexes.
+
+Usage: workflow_state.py [--json] [--no-cache] [--validate]
+
+OUTPUTS:
+  Text mode (default): the /q-status report
+  JSON mode: the workflow-state.json snapshot
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (  # noqa: E402
+    ANALYSIS_FILES,
+    REPORT_FIELD_RE,
+    atomic_write_json,
+    cache_dir,
+    find_git,
+    get_repo_root,
+    read_json,
+    specify_dir,
+)
+from log_store import LOGS, SEGMENTS_DIR, LogStore, logs_dir, utilization  # noqa: E402
+
+CACHE_VERSION = 1
+CACHE_FILE = "workflow-scan.json"
+STATE_FILE = "workflow-state.json"
+
+# (id, name) in workflow order, as in the Phase Artifact Detection table
+PHASES: List[Tuple[str, str]] = [
+    ("1", "INIT"),
+    ("2", "ANALYZE PROJECT"),
+    ("3", "ANALYZE REQUIREMENTS"),
+    ("4", "GAP ANALYSIS"),
+    ("5", "GENERATE"),
+    ("6", "TEST"),
+    ("7", "CONSTITUTION"),
+    ("7.5", "FEATURE BREAKDOWN"),
+    ("8", "SPEC"),
+    ("9", "PLAN"),
+    ("10", "TASKS"),
+    ("11", "IMPLEMENT"),
+    ("11.5", "FEATURE QA"),
+    ("11.6", "INTER-FEATURE"),
+    ("12", "INTEGRATION QA"),
+    ("13", "DELIVER"),
+]
+FEATURE_DOCS = ("spec.md", "plan.md", "tasks.md")
+REPORTED_PHASES = ("11.5", "11.6", "12")
+TOP_LEVEL_ARTIFACTS = {*ANALYSIS_FILES.values(), "constitution.md", "features.json", *FEATURE_DOCS}
+
+TASK_LINE_RE = re.compile(rb"^\s*-\s+\[([ xX])\]", re.MULTILINE)
+REPORT_NAME_RE = re.compile(r"^phase-([0-9.]+)-report\.md$")
+# Directories under .specify/ that never hold phase artifacts
+SKIP_DIRS = {".cache", "scripts", "templates", "todo-history", ".todos-claims"}
+HEAD_BYTES = 256
+READ_BLOCK = 8 * 1024 * 1024
+
+
+# -- fact extractors ----------------------------------------------------------
+#
+# Each takes the file path and the previous facts (or None) and returns
+# fresh facts. Only called when the file's (mtime_ns, size) changed.
+
+
+def _tasks_facts(path: Path, _previous: Optional[dict]) -> dict:
+    marks = TASK_LINE_RE.findall(path.read_bytes())
+    done = sum(1 for mark in marks if mark != b" ")
+    return {"total": len(marks), "done": done}
+
+
+def _report_facts(path: Path, _previous: Optional[dict]) -> dict:
+    text = path.read_text(encoding="utf-8", errors="replace")
+    return {key.lower(): value for key, value in REPORT_FIELD_RE.findall(text)}
+
+
+def _skill_baseline(path: Path, _previous: Optional[dict]) -> dict:
+    """Existing skill count recorded by ANALYZE PROJECT, if any."""
+    document = read_json(path, {}) or {}
+    candidates = [document.get(key) for key in ("skill_count", "skills", "existing_skills")]
+    existing = document.get("existing") or document.get("inventory") or {}
+    if isinstance(existing, dict):
+        candidates.append(existing.get("skills"))
+    for value in candidates:
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int):
+            return {"skills": value}
+        if isinstance(value, (list, dict)):
+            return {"skills": len(value)}
+    return {"skills": None}
+
+
+def _append_only_search(needle: bytes, line_filter: bytes) -> Callable[[Path, Optional[dict]], dict]:
+    """Count complete lines containing ``needle`` and ``line_filter``, reading only bytes appended since last time."""
+
+    def extract(path: Path, previous: Optional[dict]) -> dict:
+        with open(path, "rb") as handle:
+            head = hashlib.sha1(handle.read(HEAD_BYTES)).hexdigest()
+            size = os.fstat(handle.fileno()).st_size
+            offset, matches = 0, 0
+            if previous and previous.get("head") == head and previous.get("offset", 0) <= size:
+                offset, matches = previous["offset"], previous["matches"]
+            handle.seek(offset)
+            carry = b""
+            while True:
+                block = handle.read(READ_BLOCK)
+                if not block:
+                    break
+                block = carry + block
+                end = block.rfind(b"\n") + 1  # whole lines only; the rest waits
+                lines, carry = block[:end], block[end:]
+                offset += end
+                if needle in lines:
+                    matches += sum(1 for line in lines.split(b"\n") if needle in line and line_filter in line)
+        return {"head": head, "offset": offset, "matches": matches}
+
+    return extract
+
+
+_reflog_facts = _append_only_search(b"autonomous", line_filter=b"\tcommit")
+
+
+# -- scan ---------------------------------------------------------------------
+
+
+@dataclass
+class ScanStats:
+    files: int = 0
+    read: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Scan:
+    """Raw result of one walk: relative path -> facts, plus counts."""
+
+    facts: Dict[str, dict] = field(default_factory=dict)
+    dirs: Dict[str, List[str]] = field(default_factory=dict)
+    stats: ScanStats = field(default_factory=ScanStats)
+
+
+def _entries(path: str | Path) -> List[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
+def _files(repo_root: Path) -> Iterator[Tuple[str, os.DirEntry, Callable]]:
+    """Yield ``(relpath, entry, extractor)`` for every file that decides state."""
+    specify = specify_dir(repo_root)
+    prefix = len(os.path.join(str(repo_root), ""))
+    rel = lambda entry: entry.path[prefix:]  # noqa: E731
+
+    for entry in _entries(specify):
+        if entry.is_file():
+            if entry.name == "tasks.md":
+                yield rel(entry), entry, _tasks_facts
+            elif entry.name == ANALYSIS_FILES["2"]:
+                yield rel(entry), entry, _skill_baseline
+            elif entry.name in TOP_LEVEL_ARTIFACTS:
+                yield rel(entry), entry, None
+        elif entry.is_dir() and entry.name not in SKIP_DIRS:
+            if entry.name == "validations":
+                for report in _entries(entry.path):
+                    if REPORT_NAME_RE.match(report.name):
+                        yield rel(report), report, _report_facts
+            elif entry.name == "memory":
+                for doc in _entries(entry.path):
+                    if doc.name == "constitution.md":
+                        yield rel(doc), doc, None
+            elif entry.name == "features":
+                for feature in _entries(entry.path):
+                    if feature.is_dir():
+                        yield from _feature_files(feature.path, rel)
+
+    for feature in _entries(repo_root / "specs"):
+        if feature.is_dir():
+            yield from _feature_files(feature.path, rel)
+
+    found = find_git(repo_root)
+    if found:
+        reflog = found[1] / "logs" / "HEAD"
+        try:
+            entry = next(e for e in _entries(reflog.parent) if e.name == "HEAD")
+            yield ".git/logs/HEAD", entry, _reflog_facts
+        except StopIteration:
+            pass
+
+
+def _feature_files(feature: str, rel: Callable) -> Iterator[Tuple[str, os.DirEntry, Callable]]:
+    for doc in _entries(feature):
+        if doc.name in FEATURE_DOCS and doc.is_file():
+            yield rel(doc), doc, _tasks_facts if doc.name == "tasks.md" else None
+
+
+def scan(repo_root: Path, use_cache: bool = True) -> Scan:
+    """Walk the artifact directories once, re-reading only changed files."""
+    start = time.perf_counter()
+    cache_path = cache_dir(repo_root) / CACHE_FILE
+    cached = read_json(cache_path, {}) if use_cache else {}
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        cached = {}
+    previous: Dict[str, dict] = cached.get("files", {})
+
+    result = Scan()
+    entries: Dict[str, dict] = {}
+    for relpath, entry, extract in _files(repo_root):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        key = [st.st_mtime_ns, st.st_size]
+        old = previous.get(relpath)
+        if old and old.get("key") == key:
+            facts = old.get("facts", {})
+        elif extract is None:
+            facts = {}
+        else:
+            try:
+                facts = extract(Path(entry.path), old.get("facts") if old else None)
+            except OSError:
+                continue
+            result.stats.read += 1
+        entries[relpath] = {"key": key, "facts": facts}
+        result.facts[relpath] = facts
+    result.stats.files = len(entries)
+
+    skills = repo_root / ".claude" / "skills"
+    result.dirs["skills"] = [e.name for e in _entries(skills) if e.is_dir()]
+
+    if use_cache and (result.stats.read or entries.keys() != previous.keys()):
+        atomic_write_json(cache_path, {"version": CACHE_VERSION, "files": entries}, indent=None)
+    result.stats.seconds = time.perf_counter() - start
+    return result
+
+
+# -- state --------------------------------------------------------------------
+
+
+def _feature_progress(scan_result: Scan) -> List[dict]:
+    """Per-feature documents and task counts, in directory order."""
+    features: Dict[str, dict] = {}
+    for relpath, facts in scan_result.facts.items():
+        directory, name = os.path.split(relpath)
+        if name not in FEATURE_DOCS or directory in (".specify",):
+            continue
+        feature = features.setdefault(directory, {"name": os.path.basename(directory), "dir": directory})
+        feature[name.split(".")[0]] = True
+        if name == "tasks.md":
+            feature["tasks_total"], feature["tasks_done"] = facts.get("total", 0), facts.get("done", 0)
+
+    simple = [f".specify/{doc}" for doc in FEATURE_DOCS if f".specify/{doc}" in scan_result.facts]
+    if simple:
+        feature = {"name": "project", "dir": ".specify"}
+        for relpath in simple:
+            feature[os.path.basename(relpath).split(".")[0]] = True
+        tasks = scan_result.facts.get(".specify/tasks.md")
+        if tasks is not None:
+            feature["tasks_total"], feature["tasks_done"] = tasks.get("total", 0), tasks.get("done", 0)
+        features = {".specify": feature, **features}
+
+    ordered = []
+    for feature in features.values():
+        for doc in ("spec", "plan", "tasks"):
+            feature.setdefault(doc, False)
+        total, done = feature.setdefault("tasks_total", 0), feature.setdefault("tasks_done", 0)
+        if not feature["spec"]:
+            feature["phase"] = "8"
+        elif not feature["plan"]:
+            feature["phase"] = "9"
+        elif not feature["tasks"]:
+            feature["phase"] = "10"
+        elif total == 0 or done < total:
+            feature["phase"] = "11"
+        else:
+            feature["phase"] = "complete"
+        ordered.append(feature)
+    return ordered
+
+
+def _has(scan_result: Scan, relpath: str) -> bool:
+    return relpath in scan_result.facts
+
+
+def activity_logs(repo_root: Path) -> LogStore:
+    """Every log in ``.claude/logs``, active or rotated into segments."""
+    directory = logs_dir(repo_root)
+    names = {e.name[:-4] for e in _entries(directory) if e.is_file() and e.name.endswith(".log")}
+    names.update(e.name for e in _entries(directory / SEGMENTS_DIR) if e.is_dir())
+    return LogStore(directory, sorted(names))
+
+
+def build_state(repo_root: Path, scan_result: Scan, logs: Optional[LogStore] = None) -> Dict[str, Any]:
+    """Turn raw scan facts into the workflow-state.json snapshot."""
+    facts = scan_result.facts
+    features = _feature_progress(scan_result)
+    complex_mode = _has(scan_result, ".specify/features.json") or any(
+        f["dir"].startswith(".specify/features/") for f in features
+    )
+    reports = {}
+    for relpath, report in facts.items():
+        match = REPORT_NAME_RE.match(os.path.basename(relpath))
+        if match and relpath.startswith(".specify/validations/"):
+            reports[match.group(1)] = report
+
+    baseline = facts.get(f".specify/{ANALYSIS_FILES['2']}", {}).get("skills")
+    skills = len(scan_result.dirs.get("skills", []))
+    validated = (logs or activity_logs(repo_root)).total()["validated"]
+    delivered = facts.get(".git/logs/HEAD", {}).get("matches", 0)
+    constitution = next((p for p in (".specify/constitution.md", ".specify/memory/constitution.md")
+                         if _has(scan_result, p)), None)
+    unfinished = [f for f in features if f["phase"] != "complete"]
+
+    checks: Dict[str, Tuple[bool, str]] = {
+        "1": (specify_dir(repo_root).is_dir(), ".specify/ directory"),
+        "5": (skills > (baseline or 0), f"{skills} skills (baseline {baseline if baseline is not None else 0})"),
+        "6": (validated > 0, f"{validated} 'validated' log lines"),
+        "7": (constitution is not None, constitution or "constitution.md missing"),
+        "7.5": (_has(scan_result, ".specify/features.json"), ".specify/features.json"),
+        "13": (delivered > 0, f"{delivered} 'autonomous' commits"),
+    }
+    for phase_id, name in ANALYSIS_FILES.items():
+        checks[phase_id] = (_has(scan_result, f".specify/{name}"), f".specify/{name}")
+    for phase_id, doc in (("8", "spec"), ("9", "plan"), ("10", "tasks")):
+        have = sum(1 for f in features if f[doc])
+        checks[phase_id] = (bool(features) and have == len(features), f"{doc}.md in {have}/{len(features)} features")
+    done = sum(f["tasks_done"] for f in features)
+    total = sum(f["tasks_total"] for f in features)
+    checks["11"] = (bool(features) and not unfinished, f"{done}/{total} tasks [X]")
+    for phase_id in REPORTED_PHASES:
+        status = reports.get(phase_id, {}).get("status", "")
+        checks[phase_id] = (status.upper().startswith("APPROVED"),
+                            f"phase-{phase_id}-report.md {status or 'missing'}")
+
+    phases = []
+    for phase_id, name in PHASES:
+        applicable = not (phase_id == "7.5" and not complex_mode) and \
+            not (phase_id == "11.6" and (not complex_mode or len(features) < 2))
+        complete, evidence = checks[phase_id]
+        entry = {"id": phase_id, "name": name, "applicable": applicable,
+                 "complete": complete and applicable, "evidence": evidence}
+        if phase_id in reports:
+            entry["report"] = reports[phase_id]
+        phases.append(entry)
+
+    relevant = [p for p in phases if p["applicable"]]
+    current = next((p for p in relevant if not p["complete"]), None)
+    last_done = max((i for i, p in enumerate(relevant) if p["complete"]), default=-1)
+    violations = [
+        f"Phase {p['id']} ({p['name']}) skipped: {p['evidence']}"
+        for p in relevant[:last_done] if not p["complete"]
+    ]
+    for feature in features:
+        present = [doc for doc in ("spec", "plan", "tasks") if feature[doc]]
+        if present:
+            upto = ("spec", "plan", "tasks").index(present[-1])
+            missing = [f"{doc}.md" for doc in ("spec", "plan", "tasks")[:upto] if not feature[doc]]
+            if missing:
+                violations.append(f"Feature {feature['name']} skipped {', '.join(missing)}")
+    # COMPLEX mode builds features one at a time; SIMPLE-mode specs/ features are independent
+    for earlier, later in zip(features, features[1:]) if complex_mode else ():
+        if earlier["phase"] != "complete" and later["spec"]:
+            violations.append(f"Feature {later['name']} started before {earlier['name']} finished IMPLEMENT")
+    if complex_mode and current and current["id"] in ("8", "9", "10", "11") and unfinished:
+        current = dict(current, feature=unfinished[0]["name"],
+                       id=unfinished[0]["phase"],
+                       name=dict(PHASES)[unfinished[0]["phase"]])
+
+    return {
+        "mode": "COMPLEX" if complex_mode else "SIMPLE",
+        "current_phase": current["id"] if current else None,
+        "current_phase_name": current["name"] if current else "COMPLETE",
+        "current_feature": current.get("feature") if current else None,
+        "phases": phases,
+        "violations": violations,
+        "features": features,
+    }
+
+
+def refresh(repo_root: Optional[Path] = None, use_cache: bool = True) -> Tuple[Dict[str, Any], ScanStats]:
+    """Scan, rebuild the snapshot and rewrite workflow-state.json if it changed."""
+    root = repo_root or get_repo_root()
+    scan_result = scan(root, use_cache=use_cache)
+    logs = activity_logs(root)
+    state = build_state(root, scan_result, logs)
+    state["utilization"] = utilization(root, logs.subset(LOGS))
+    state_path = specify_dir(root) / STATE_FILE
+    existing = read_json(state_path, {}) or {}
+    if {k: v for k, v in existing.items() if k != "generated_at"} != state:
+        state = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **state}
+        if specify_dir(root).is_dir():
+            atomic_write_json(state_path, state)
+    else:
+        state = existing
+    return state, scan_result.stats
+
+
+def format_status(state: Dict[str, Any]) -> str:
+    width = 64
+    rule = "═" * width
+    row = lambda text: f"║  {text:<{width - 2}}║"  # noqa: E731
+    lines = [f"╔{rule}╗", f"║{'WORKFLOW STATUS REPORT':^{width}}║", f"╠{rule}╣"]
+    current = state.get("current_phase")
+    for phase in state["phases"]:
+        if not phase["applicable"]:
+            continue
+        mark = "✓" if phase["complete"] else " "
+        label = f"{phase['id']}. {phase['name']}"
+        if phase["id"] == current:
+            lines.append(row(f"[→] {label:<32}← CURRENT"))
+        else:
+            lines.append(row(f"[{mark}] {label}"))
+    lines.append(f"╠{rule}╣")
+    for feature in state["features"]:
+        progress = f"{feature['tasks_done']}/{feature['tasks_total']} tasks"
+        lines.append(row(f"{feature['name'][:30]:<30} {feature['phase']:<9} {progress}"))
+    for kind in ("skills", "agents"):
+        info = state.get("utilization", {}).get(kind)
+        if info and info["available"]:
+            lines.append(row(f"{kind.capitalize()} used: {len(info['used'])}/{info['available']} "
+                             f"({info['percentage']}%)"))
+    violations = state["violations"]
+    lines.append(row(f"Violations: {len(violations) if violations else 'NONE'}"))
+    for violation in violations:
+        lines.append(row(f"  - {violation[:width - 6]}"))
+    lines.append(f"╚{rule}╝")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scan phase artifacts and write .specify/workflow-state.json.")
+    parser.add_argument("--json", action="store_true", help="Print the snapshot as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Re-read every artifact")
+    parser.add_argument("--validate", action="store_true", help="Exit 1 if there are violations")
+    args = parser.parse_args(argv)
+
+    state, stats = refresh(use_cache=not args.no_cache)
+    if args.json:
+        print(json.dumps(state, indent=2, ensure_ascii=False))
+    else:
+        print(format_status(state))
+        print(f"Scanned {stats.files} files ({stats.read} re-read) in {stats.seconds * 1000:.1f}ms")
+    return 1 if args.validate and state["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())